@@ -0,0 +1,138 @@
+import os
+import secrets
+import tempfile
+from typing import Iterator
+import pandas as pd
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+from app.utils.exports import open_export
+from app.utils.model_store import (
+    SCORING_CHUNK_ROWS,
+    load_model,
+    pin_models,
+    score_frame,
+    segment_names,
+)
+
+API_KEY_ENV_VAR = "CLIENT_SEGMENT_API_KEY"
+# Set to 1 to serve /api/score without a key, e.g. behind an authenticating proxy.
+ANONYMOUS_ENV_VAR = "CLIENT_SEGMENT_API_ALLOW_ANONYMOUS"
+# Request bodies larger than this are spooled to disk while they upload.
+SCORING_SPOOL_BYTES = 64 * 1024 * 1024
+# Larger request bodies are refused with 413.
+SCORING_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+
+async def export_dataset(request: Request):
+    """Streams a dataset staged by AppState as chunked CSV or Parquet."""
+    # The dataset may have been spilled to disk; read it off the event loop.
+    export = await run_in_threadpool(open_export, request.path_params["token"])
+    if export is None:
+        return PlainTextResponse("Export not found or expired.", status_code=404)
+    filename, media_type, stream = export
+    return StreamingResponse(
+        stream,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def _read_chunks(body, fmt: str, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(body).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(body, chunksize=chunk_rows)
+
+
+def _score_stream(
+    model: dict, body, fmt: str, id_column: str | None
+) -> Iterator[bytes]:
+    names = segment_names(model)
+    offset = 0
+    try:
+        for i, chunk in enumerate(_read_chunks(body, fmt, SCORING_CHUNK_ROWS)):
+            scored = score_frame(model, chunk, names)
+            if id_column:
+                scored.insert(0, id_column, chunk[id_column].to_numpy())
+            else:
+                scored.insert(0, "row", range(offset, offset + len(chunk)))
+            offset += len(chunk)
+            yield scored.to_csv(index=False, header=i == 0).encode("utf-8")
+    finally:
+        body.close()
+
+
+async def score_customers(request: Request):
+    """Assigns a streamed CSV or Parquet body of customers to saved segments.
+
+    Query parameters: `model` (version, defaults to the latest), `format`
+    (`csv` or `parquet`, default from the content type) and `id_column` (a
+    column echoed back for joining; row numbers are returned otherwise).
+    The response is CSV with the id, `cluster` and `segment_name` columns,
+    produced one chunk at a time.
+    """
+    api_key = os.environ.get(API_KEY_ENV_VAR)
+    if not api_key:
+        if os.environ.get(ANONYMOUS_ENV_VAR) != "1":
+            return PlainTextResponse(
+                f"Scoring is disabled until {API_KEY_ENV_VAR} is set.",
+                status_code=503,
+            )
+    elif not secrets.compare_digest(request.headers.get("x-api-key", ""), api_key):
+        return PlainTextResponse("Invalid API key.", status_code=401)
+    fmt = request.query_params.get("format") or (
+        "parquet" if "parquet" in request.headers.get("content-type", "") else "csv"
+    )
+    if fmt not in ("csv", "parquet"):
+        return PlainTextResponse(f"Unsupported format: {fmt}", status_code=400)
+    try:
+        model = load_model(request.query_params.get("model"))
+    except (OSError, ValueError) as e:
+        return PlainTextResponse(str(e), status_code=404)
+    if request.query_params.get("model"):
+        # Clients that name a version rely on it, so it is never pruned.
+        pin_models(f"api-{model['version']}", [model["version"]])
+    too_large = PlainTextResponse(
+        f"Request body exceeds {SCORING_MAX_BYTES} bytes.", status_code=413
+    )
+    if int(request.headers.get("content-length") or 0) > SCORING_MAX_BYTES:
+        return too_large
+    body = tempfile.SpooledTemporaryFile(max_size=SCORING_SPOOL_BYTES)
+    size = 0
+    async for data in request.stream():
+        size += len(data)
+        if size > SCORING_MAX_BYTES:
+            body.close()
+            return too_large
+        # Writes past the spool size hit the disk; keep them off the event loop.
+        await run_in_threadpool(body.write, data)
+    body.seek(0)
+    id_column = request.query_params.get("id_column")
+    try:
+        first = next(_read_chunks(body, fmt, 1))
+        if id_column and id_column not in first.columns:
+            raise KeyError(f"id_column '{id_column}' is not in the input.")
+        score_frame(model, first)
+    except Exception as e:
+        body.close()
+        return PlainTextResponse(f"Cannot score input: {e}", status_code=400)
+    body.seek(0)
+    return StreamingResponse(
+        _score_stream(model, body, fmt, id_column),
+        media_type="text/csv; charset=utf-8",
+        headers={"X-Model-Version": model["version"]},
+    )
+
+
+api = Starlette(
+    routes=[
+        Route("/api/export/{token}", export_dataset),
+        Route("/api/score", score_customers, methods=["POST"]),
+    ]
+)
@@ -1,5 +1,6 @@
 import reflex as rx
 from app.state import AppState
+from app.api import api
 from app.components.navbar import navbar
 from app.pages.home import home_page
 from app.pages.data_cleaning import data_cleaning_page
@@ -7,6 +8,7 @@ from app.pages.pca_analysis import pca_analysis_page
 from app.pages.clustering import clustering_page
 from app.pages.customer_profiles import customer_profiles_page
 from app.pages.insights import insights_page
+from app.pages.diagnostics import diagnostics_page
 
 
 def sidebar_link(text: str, href: str, icon: str) -> rx.Component:
@@ -34,6 +36,7 @@ def sidebar() -> rx.Component:
             sidebar_link("Clustering", "/clustering", "git-branch"),
             sidebar_link("Customer Profiles", "/customer-profiles", "users"),
             sidebar_link("Insights", "/insights", "lightbulb"),
+            sidebar_link("Diagnostics", "/diagnostics", "activity"),
             class_name="flex flex-col gap-1 p-2",
         ),
         class_name="w-64 h-full bg-white border-r border-gray-200 fixed top-0 left-0",
@@ -54,6 +57,7 @@ def template(page: rx.Component) -> rx.Component:
 
 app = rx.App(
     theme=rx.theme(appearance="light"),
+    api_transformer=api,
     head_components=[
         rx.el.link(rel="preconnect", href="https://fonts.googleapis.com"),
         rx.el.link(rel="preconnect", href="https://fonts.gstatic.com", crossorigin=""),
@@ -63,9 +67,18 @@ app = rx.App(
         ),
     ],
 )
-app.add_page(template(home_page()), route="/")
-app.add_page(template(data_cleaning_page()), route="/data-cleaning")
-app.add_page(template(pca_analysis_page()), route="/pca-analysis")
-app.add_page(template(clustering_page()), route="/clustering")
-app.add_page(template(customer_profiles_page()), route="/customer-profiles")
-app.add_page(template(insights_page()), route="/insights")
\ No newline at end of file
+# Every page first checks that the session's datasets were not dropped.
+on_load = AppState.check_session_data
+app.add_page(template(home_page()), route="/", on_load=on_load)
+app.add_page(template(data_cleaning_page()), route="/data-cleaning", on_load=on_load)
+app.add_page(template(pca_analysis_page()), route="/pca-analysis", on_load=on_load)
+app.add_page(template(clustering_page()), route="/clustering", on_load=on_load)
+app.add_page(
+    template(customer_profiles_page()), route="/customer-profiles", on_load=on_load
+)
+app.add_page(template(insights_page()), route="/insights", on_load=on_load)
+app.add_page(
+    template(diagnostics_page()),
+    route="/diagnostics",
+    on_load=[on_load, AppState.refresh_profile_captures],
+)
\ No newline at end of file
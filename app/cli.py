@@ -0,0 +1,103 @@
+import argparse
+import json
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from app.pipeline import process_file
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Run the segmentation pipeline on CSV files without the web app."
+    )
+    parser.add_argument("inputs", nargs="+", type=Path, help="Customer CSV files.")
+    parser.add_argument(
+        "-o", "--output", type=Path, default=Path("segmentation_output")
+    )
+    parser.add_argument("-k", "--clusters", type=int, default=3)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes (default: one per file, at most one per CPU).",
+    )
+    parser.add_argument(
+        "--format", choices=["csv", "parquet"], default="csv", dest="fmt"
+    )
+    parser.add_argument(
+        "--categorical",
+        choices=["onehot", "frequency"],
+        default=None,
+        help="Encode categorical columns into the PCA input (ignored by default).",
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=0,
+        help="Run K-Means as map-reduce over this many local worker processes.",
+    )
+    parser.add_argument(
+        "--kmeans-worker",
+        action="append",
+        dest="kmeans_workers",
+        metavar="HOST:PORT",
+        help="TCP shard worker (python -m app.kmeans_worker); repeat for more shards.",
+    )
+    parser.add_argument(
+        "--shard-dir",
+        type=Path,
+        default=None,
+        help="Directory the TCP shard workers also mount; shards are written there "
+        "and memory-mapped by the workers instead of sent over the network.",
+    )
+    parser.add_argument(
+        "--skip-elbow",
+        action="store_true",
+        help="Skip the k=2..10 elbow scan, whose silhouette cost is quadratic in rows.",
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
+    missing = [str(p) for p in args.inputs if not p.is_file()]
+    if missing:
+        parser.error(f"Input files not found: {', '.join(missing)}")
+    stems = [p.stem for p in args.inputs]
+    if len(set(stems)) != len(stems):
+        parser.error("Input files must have distinct names.")
+
+    workers = min(args.workers or os.cpu_count() or 1, len(args.inputs))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(
+                process_file,
+                path,
+                args.output,
+                args.clusters,
+                not args.skip_elbow,
+                args.fmt,
+                args.categorical,
+                args.shards,
+                args.kmeans_workers,
+                args.shard_dir,
+            )
+            for path in args.inputs
+        ]
+        summaries = [future.result() for future in futures]
+
+    for summary in summaries:
+        if summary["status"] == "ok":
+            logging.info(
+                f"{summary['input']}: {summary['rows']} rows, "
+                f"{len(summary['segments'])} segments"
+            )
+        else:
+            logging.error(f"{summary['input']}: {summary['error']}")
+    args.output.mkdir(parents=True, exist_ok=True)
+    (args.output / "run_summary.json").write_text(json.dumps(summaries, indent=2))
+    return 0 if all(s["status"] == "ok" for s in summaries) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
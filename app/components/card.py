@@ -41,6 +41,53 @@ CLUSTER_BORDER_COLORS = [
     "border-violet-500",
     "border-amber-500",
 ]
+# Rows that density clustering leaves outside every segment (negative ids).
+NOISE_COLOR = "#9CA3AF"
+NOISE_TEXT_COLOR = "text-gray-500"
+NOISE_BG_COLOR = "bg-gray-100"
+NOISE_BORDER_COLOR = "border-gray-400"
+
+
+def cluster_style(
+    palette: list[str], noise: str, cluster_id: rx.Var[int]
+) -> rx.Var:
+    """Palette entry of a cluster id, cycling past the palette; noise gets its own."""
+    return rx.cond(
+        cluster_id < 0, noise, rx.Var.create(palette)[cluster_id % len(palette)]
+    )
+
+
+def segment_title(cluster_id: rx.Var[int]) -> rx.Var:
+    return rx.cond(cluster_id < 0, "Noise", f"Customer {cluster_id}")
+
+
+def stage_badge(label: str, status: rx.Var[str]) -> rx.Component:
+    """Shows whether a stage's results match its current inputs and parameters."""
+    return rx.match(
+        status,
+        (
+            "fresh",
+            rx.el.span(
+                label,
+                ": up to date",
+                class_name="px-2 py-1 text-xs font-semibold text-emerald-700 bg-emerald-100 rounded-md",
+            ),
+        ),
+        (
+            "stale",
+            rx.el.span(
+                label,
+                ": stale",
+                title="Inputs or parameters changed since this stage ran.",
+                class_name="px-2 py-1 text-xs font-semibold text-amber-700 bg-amber-100 rounded-md",
+            ),
+        ),
+        rx.el.span(
+            label,
+            ": not run",
+            class_name="px-2 py-1 text-xs font-semibold text-gray-500 bg-gray-100 rounded-md",
+        ),
+    )
 
 
 def profile_metric(
@@ -64,13 +111,15 @@ def profile_metric(
 
 def cluster_profile_card(profile: rx.Var[dict[str, str | int | float]]) -> rx.Component:
     cluster_id = profile["cluster_id"].to(int)
-    text_color = rx.Var.create(CLUSTER_TEXT_COLORS)[cluster_id]
-    bg_color = rx.Var.create(CLUSTER_BG_COLORS)[cluster_id]
-    border_color = rx.Var.create(CLUSTER_BORDER_COLORS)[cluster_id]
+    text_color = cluster_style(CLUSTER_TEXT_COLORS, NOISE_TEXT_COLOR, cluster_id)
+    bg_color = cluster_style(CLUSTER_BG_COLORS, NOISE_BG_COLOR, cluster_id)
+    border_color = cluster_style(
+        CLUSTER_BORDER_COLORS, NOISE_BORDER_COLOR, cluster_id
+    )
     return rx.el.div(
         rx.el.div(
             rx.el.h3(
-                f"Customer {profile['cluster_id']}",
+                segment_title(cluster_id),
                 class_name=f"text-2xl font-bold {text_color}",
             ),
             rx.el.div(
@@ -1,6 +1,12 @@
 import reflex as rx
+from reflex.vars.base import Var
 from app.state import AppState
-from app.components.card import CLUSTER_COLORS
+from app.components.card import (
+    CLUSTER_COLORS,
+    NOISE_COLOR,
+    cluster_style,
+    segment_title,
+)
 
 TOOLTIP_PROPS = {
     "content_style": {
@@ -65,7 +71,17 @@ def variance_chart(data: rx.Var[list[dict]]) -> rx.Component:
     )
 
 
-def scatter_chart(data: rx.Var[list[dict]], x_key: str, y_key: str) -> rx.Component:
+def columnar_rows(data: rx.Var, keys: list[str]) -> rx.Var[list[dict]]:
+    """Rebuilds chart points in the browser from a columnar `{key: [values]}` var."""
+    fields = ", ".join(f"{key}: ({data}).{key}[i]" for key in keys)
+    return Var(
+        _js_expr=f"((({data}) || {{}}).{keys[0]} || []).map((_, i) => ({{{fields}}}))",
+        _var_type=list[dict],
+        _var_data=data._get_all_var_data(),
+    )
+
+
+def scatter_chart(data: rx.Var[dict], x_key: str, y_key: str) -> rx.Component:
     return rx.recharts.scatter_chart(
         rx.recharts.cartesian_grid(stroke_dasharray="3 3"),
         rx.recharts.graphing_tooltip(
@@ -77,7 +93,9 @@ def scatter_chart(data: rx.Var[list[dict]], x_key: str, y_key: str) -> rx.Compon
         rx.recharts.y_axis(
             type_="number", data_key=y_key, name="PC2", tick_line=False, axis_line=False
         ),
-        rx.recharts.scatter(name="Customers", data=data, fill="#6366F1"),
+        rx.recharts.scatter(
+            name="Customers", data=columnar_rows(data, [x_key, y_key]), fill="#6366F1"
+        ),
         height=400,
         width="100%",
         margin={"top": 20, "right": 20, "bottom": 20, "left": 20},
@@ -101,6 +119,12 @@ def elbow_chart(data: rx.Var[list[dict]]) -> rx.Component:
             name="Silhouette Score",
             stroke="#82ca9d",
         ),
+        rx.recharts.line(
+            data_key="knn_consistency",
+            y_axis_id="right",
+            name="kNN Consistency",
+            stroke="#F59E0B",
+        ),
         data=data,
         height=400,
         width="100%",
@@ -134,9 +158,8 @@ def pie_chart(data: rx.Var[list[dict]], name_key: str, value_key: str) -> rx.Com
 
 
 def colored_scatter_chart(
-    data: rx.Var[dict[int, list[dict]]], num_clusters: rx.Var[int]
+    data: rx.Var[dict[int, dict]], num_clusters: rx.Var[int]
 ) -> rx.Component:
-    color_map = rx.Var.create(CLUSTER_COLORS)
     return rx.recharts.scatter_chart(
         rx.recharts.cartesian_grid(stroke_dasharray="3 3"),
         rx.recharts.graphing_tooltip(**TOOLTIP_PROPS),
@@ -150,9 +173,9 @@ def colored_scatter_chart(
         rx.foreach(
             data.keys(),
             lambda i: rx.recharts.scatter(
-                name=f"Customer {i}",
-                data=data[i],
-                fill=color_map[i.to(int) % len(CLUSTER_COLORS)],
+                name=segment_title(i.to(int)),
+                data=columnar_rows(data[i], ["PC1", "PC2"]),
+                fill=cluster_style(CLUSTER_COLORS, NOISE_COLOR, i.to(int)),
             ),
         ),
         height=500,
@@ -13,6 +13,17 @@ def navbar() -> rx.Component:
                     AppState.current_stage,
                     class_name="px-2 py-1 text-xs font-semibold text-indigo-700 bg-indigo-100 rounded-md",
                 ),
+                rx.cond(
+                    AppState.stale_stage_count > 0,
+                    rx.el.button(
+                        "Recompute ",
+                        AppState.stale_stage_count.to_string(),
+                        " Stale Stages",
+                        on_click=AppState.recompute_stale_stages,
+                        class_name="px-3 py-1 text-xs font-medium text-amber-700 bg-amber-100 rounded-md hover:bg-amber-200 transition-colors ml-4",
+                    ),
+                    rx.el.div(),
+                ),
                 rx.cond(
                     AppState.raw_data.length() > 0,
                     rx.el.button(
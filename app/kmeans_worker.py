@@ -0,0 +1,25 @@
+import argparse
+import logging
+import sys
+from app.utils.distributed_kmeans import DEFAULT_WORKER_PORT, serve, worker_key
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Serve K-Means shards to a coordinator over TCP."
+    )
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=DEFAULT_WORKER_PORT)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    try:
+        authkey = worker_key()
+    except ValueError as e:
+        parser.error(str(e))
+    logging.info(f"K-Means shard worker listening on {args.host}:{args.port}")
+    serve(args.host, args.port, authkey)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,35 @@
 import reflex as rx
 from app.state import AppState
 from app.components.charts import elbow_chart, colored_scatter_chart
-from app.components.card import metric_card
+from app.components.card import metric_card, stage_badge
+
+
+def k_recommendation_banner() -> rx.Component:
+    return rx.cond(
+        AppState.k_recommendation.contains("k"),
+        rx.el.div(
+            rx.icon("sparkles", class_name="w-5 h-5 text-indigo-500"),
+            rx.el.p(
+                "Recommended k = ",
+                rx.el.span(
+                    AppState.k_recommendation["k"].to_string(),
+                    class_name="font-semibold",
+                ),
+                " (confidence ",
+                AppState.k_recommendation["confidence_pct"].to_string(),
+                "%). Knee: k=",
+                AppState.k_recommendation["knee_k"].to_string(),
+                ", gap statistic: k=",
+                AppState.k_recommendation["gap_k"].to_string(),
+                ", best silhouette: k=",
+                AppState.k_recommendation["silhouette_k"].to_string(),
+                ".",
+                class_name="text-sm text-gray-700",
+            ),
+            class_name="flex items-center gap-3 p-3 mb-4 bg-indigo-50 border border-indigo-200 rounded-lg",
+        ),
+        rx.el.div(),
+    )
 
 
 def cluster_selection_card() -> rx.Component:
@@ -14,16 +42,81 @@ def cluster_selection_card() -> rx.Component:
             rx.el.div(
                 rx.el.p("Select k:", class_name="font-medium text-gray-700"),
                 rx.el.input(
-                    default_value=AppState.num_clusters.to_string(),
+                    value=AppState.num_clusters.to_string(),
                     on_change=AppState.set_num_clusters,
                     type="number",
                     min=2,
-                    max=10,
+                    max=AppState.k_max,
                     class_name="w-20 px-2 py-1 border border-gray-300 rounded-md",
                 ),
+                rx.el.p("Range:", class_name="font-medium text-gray-700"),
+                rx.el.input(
+                    default_value=AppState.k_min.to_string(),
+                    on_change=AppState.set_k_min,
+                    type="number",
+                    min=2,
+                    class_name="w-16 px-2 py-1 border border-gray-300 rounded-md",
+                ),
+                rx.el.span("to", class_name="text-gray-500"),
+                rx.el.input(
+                    default_value=AppState.k_max.to_string(),
+                    on_change=AppState.set_k_max,
+                    type="number",
+                    min=3,
+                    class_name="w-16 px-2 py-1 border border-gray-300 rounded-md",
+                ),
+                rx.el.p("Fit sample:", class_name="font-medium text-gray-700"),
+                rx.el.input(
+                    default_value=AppState.clustering_sample_size.to_string(),
+                    on_change=AppState.set_clustering_sample_size,
+                    type="number",
+                    min=0,
+                    step=10000,
+                    title="Rows used to fit K-Means; the rest are assigned to the nearest centroid. 0 uses all rows.",
+                    class_name="w-28 px-2 py-1 border border-gray-300 rounded-md",
+                ),
+                rx.el.label(
+                    rx.el.input(
+                        type="checkbox",
+                        checked=AppState.incremental_mode,
+                        on_change=AppState.toggle_incremental_mode,
+                        class_name="mr-2",
+                    ),
+                    "Warm-start from previous model",
+                    class_name="flex items-center text-sm text-gray-700",
+                ),
+                rx.cond(
+                    AppState.incremental_mode,
+                    rx.el.select(
+                        rx.el.option("This session's last model", value=""),
+                        rx.foreach(
+                            AppState.saved_model_versions,
+                            lambda version: rx.el.option(version, value=version),
+                        ),
+                        value=AppState.warm_start_model,
+                        on_change=AppState.set_warm_start_model,
+                        class_name="px-2 py-1 border border-gray-300 rounded-md text-sm",
+                    ),
+                    rx.fragment(),
+                ),
+                rx.el.p("Min cluster size:", class_name="font-medium text-gray-700"),
+                rx.el.input(
+                    default_value=AppState.density_min_cluster_size.to_string(),
+                    on_change=AppState.set_density_min_cluster_size,
+                    type="number",
+                    min=0,
+                    title="Smallest segment HDBSCAN may form. 0 uses 1% of the rows.",
+                    class_name="w-24 px-2 py-1 border border-gray-300 rounded-md",
+                ),
                 class_name="flex items-center gap-4",
             ),
             rx.el.div(
+                rx.el.button(
+                    "Recommend k",
+                    on_click=AppState.recommend_num_clusters,
+                    is_loading=AppState.current_stage == "Recommending k...",
+                    class_name="px-4 py-2 bg-gray-200 text-gray-800 font-semibold rounded-lg shadow-sm hover:bg-gray-300 transition-colors",
+                ),
                 rx.el.button(
                     "Compute Elbow Method",
                     on_click=AppState.compute_elbow_method,
@@ -36,10 +129,18 @@ def cluster_selection_card() -> rx.Component:
                     is_loading=AppState.current_stage == "Clustering...",
                     class_name="px-4 py-2 bg-indigo-600 text-white font-semibold rounded-lg shadow-sm hover:bg-indigo-700 transition-colors",
                 ),
+                rx.el.button(
+                    "Run HDBSCAN",
+                    on_click=AppState.run_density_clustering,
+                    is_loading=AppState.current_stage == "Density Clustering...",
+                    title="Density-based segments; customers in sparse regions are left as noise.",
+                    class_name="px-4 py-2 bg-indigo-600 text-white font-semibold rounded-lg shadow-sm hover:bg-indigo-700 transition-colors",
+                ),
                 class_name="flex gap-4",
             ),
-            class_name="flex items-center justify-between mb-6",
+            class_name="flex flex-wrap items-center justify-between gap-4 mb-6",
         ),
+        k_recommendation_banner(),
         rx.cond(
             AppState.elbow_data.length() > 0,
             elbow_chart(data=AppState.elbow_data),
@@ -55,11 +156,131 @@ def cluster_selection_card() -> rx.Component:
         class_name="bg-white p-6 rounded-xl shadow-sm border border-gray-200 mb-8",
     )
 
+def sampling_summary() -> rx.Component:
+    return rx.cond(
+        AppState.sampling_report.contains("sample_size"),
+        rx.el.p(
+            "Fitted on a stratified sample of ",
+            AppState.sampling_report["sample_size"].to_string(),
+            " rows. Mean squared distance to centroid: ",
+            AppState.sampling_report["sample_inertia"].to(float).to_string(),
+            " on the sample vs ",
+            AppState.sampling_report["full_inertia"].to(float).to_string(),
+            " on all rows.",
+            class_name="text-sm text-gray-500 mt-2",
+        ),
+        rx.el.div(),
+    )
+
+
+def preview_summary() -> rx.Component:
+    return rx.cond(
+        AppState.clustering_preview_rows > 0,
+        rx.el.p(
+            "Preview from a ",
+            AppState.clustering_preview_rows.to_string(),
+            "-row sample; the full-resolution result is on its way.",
+            class_name="text-sm text-amber-600 mt-2",
+        ),
+        rx.el.div(),
+    )
+
+
+def density_summary() -> rx.Component:
+    return rx.cond(
+        AppState.density_report.contains("n_clusters"),
+        rx.el.p(
+            "HDBSCAN found ",
+            AppState.density_report["n_clusters"].to_string(),
+            " segments with at least ",
+            AppState.density_report["min_cluster_size"].to_string(),
+            " customers each; ",
+            AppState.density_report["noise_pct"].to(float).to_string(),
+            "% of customers are noise (shown in grey). Spanning tree: ",
+            AppState.density_report["method"].to_string(),
+            ".",
+            class_name="text-sm text-gray-500 mt-2",
+        ),
+        rx.el.div(),
+    )
+
+
+def drift_row(row: rx.Var[dict]) -> rx.Component:
+    return rx.el.tr(
+        rx.el.td(
+            "Segment ", row["cluster_id"].to_string(),
+            class_name="px-4 py-2 text-sm text-gray-700",
+        ),
+        rx.el.td(
+            row["previous_share"].to_string(), "%",
+            class_name="px-4 py-2 text-sm text-gray-700",
+        ),
+        rx.el.td(
+            row["share"].to_string(), "%",
+            class_name="px-4 py-2 text-sm text-gray-700",
+        ),
+        rx.el.td(
+            rx.cond(
+                row["centroid_shift"].to(float) >= 0,
+                row["centroid_shift"].to_string(),
+                "-",
+            ),
+            class_name="px-4 py-2 text-sm text-gray-700",
+        ),
+        rx.el.td(
+            row["status"].to_string(), class_name="px-4 py-2 text-sm text-gray-700"
+        ),
+        class_name="border-t border-gray-200",
+    )
+
+
+def segment_drift_table() -> rx.Component:
+    return rx.cond(
+        AppState.segment_drift_data.length() > 0,
+        rx.el.div(
+            rx.el.h4(
+                "Segment Drift",
+                class_name="text-lg font-semibold text-gray-800",
+            ),
+            rx.el.p(
+                "Compared with model ",
+                rx.el.span(AppState.previous_model_version, class_name="font-mono"),
+                " (converged in ",
+                AppState.incremental_iterations.to_string(),
+                " iterations). Centroid shift is measured in PCA units.",
+                class_name="text-sm text-gray-500 mb-3",
+            ),
+            rx.el.table(
+                rx.el.thead(
+                    rx.el.tr(
+                        rx.foreach(
+                            [
+                                "Segment",
+                                "Previous Share",
+                                "Share",
+                                "Centroid Shift",
+                                "Status",
+                            ],
+                            lambda col: rx.el.th(
+                                col,
+                                class_name="px-4 py-2 text-left text-sm font-semibold text-gray-600 bg-gray-50",
+                            ),
+                        )
+                    )
+                ),
+                rx.el.tbody(rx.foreach(AppState.segment_drift_data, drift_row)),
+                class_name="w-full border border-gray-200 rounded-lg",
+            ),
+            class_name="mt-6 overflow-x-auto",
+        ),
+        rx.el.div(),
+    )
 
 
 def clustering_results() -> rx.Component:
     return rx.cond(
-        AppState.clustered_data.length() > 0,
+        (AppState.num_clustered_rows > 0)
+        | (AppState.clustering_preview_rows > 0),
         rx.el.div(
             rx.el.h3(
                 "2. Clustering Results",
@@ -68,14 +289,28 @@ def clustering_results() -> rx.Component:
             colored_scatter_chart(
                 data=AppState.cluster_scatter_data, num_clusters=AppState.num_clusters
             ),
+            preview_summary(),
+            sampling_summary(),
+            density_summary(),
             rx.el.div(
+                rx.cond(
+                    (AppState.model_version != "")
+                    & (AppState.segmentation_method == "K-Means"),
+                    rx.el.p(
+                        "Model saved as version ",
+                        rx.el.span(AppState.model_version, class_name="font-mono"),
+                        class_name="text-sm text-gray-500",
+                    ),
+                    rx.el.div(),
+                ),
                 rx.el.button(
                     "View Customer Profiles",
                     on_click=AppState.generate_profiles,
                     class_name="px-6 py-3 bg-indigo-600 text-white font-semibold rounded-lg shadow-sm hover:bg-indigo-700 transition-colors",
                 ),
-                class_name="flex justify-end mt-4",
+                class_name="flex items-center justify-between mt-4",
             ),
+            segment_drift_table(),
             class_name="bg-white p-6 rounded-xl shadow-sm border border-gray-200",
         ),
         rx.el.div(),
@@ -84,6 +319,198 @@ def clustering_results() -> rx.Component:
 
 
 
+def table_header(columns: list[str]) -> rx.Component:
+    return rx.el.thead(
+        rx.el.tr(
+            rx.foreach(
+                columns,
+                lambda col: rx.el.th(
+                    col,
+                    class_name="px-4 py-2 text-left text-sm font-semibold text-gray-600 bg-gray-50",
+                ),
+            )
+        )
+    )
+
+
+def comparison_row(row: rx.Var[dict]) -> rx.Component:
+    return rx.el.tr(
+        rx.cond(
+            row.contains("algorithm"),
+            rx.fragment(
+                rx.el.td(
+                    row["algorithm"].to_string(),
+                    " (k=",
+                    row["k"].to_string(),
+                    ")",
+                    class_name="px-4 py-2 text-sm text-gray-700",
+                ),
+                rx.el.td(
+                    "Silhouette ", row["silhouette"].to_string(),
+                    ", kNN consistency ", row["knn_consistency"].to_string(),
+                    rx.cond(
+                        row["noise_pct"].to(float) > 0,
+                        ", noise " + row["noise_pct"].to_string() + "%",
+                        "",
+                    ),
+                    class_name="px-4 py-2 text-sm text-gray-700",
+                ),
+            ),
+            rx.fragment(
+                rx.el.td(
+                    row["metric"].to_string(),
+                    class_name="px-4 py-2 text-sm text-gray-700",
+                ),
+                rx.el.td(
+                    row["value"].to_string(),
+                    class_name="px-4 py-2 text-sm text-gray-700",
+                ),
+            ),
+        ),
+        class_name="border-t border-gray-200",
+    )
+
+
+def stability_method_row(row: rx.Var[dict]) -> rx.Component:
+    return rx.el.tr(
+        rx.el.td(row["method"].to_string(), class_name="px-4 py-2 text-sm text-gray-700"),
+        rx.el.td(
+            row["ari_mean"].to_string(),
+            " ± ",
+            row["ari_std"].to_string(),
+            class_name="px-4 py-2 text-sm text-gray-700",
+        ),
+        class_name="border-t border-gray-200",
+    )
+
+
+def stability_cluster_row(row: rx.Var[dict]) -> rx.Component:
+    return rx.el.tr(
+        rx.el.td(
+            "Segment ", row["cluster_id"].to_string(),
+            class_name="px-4 py-2 text-sm text-gray-700",
+        ),
+        rx.el.td(
+            row["kmeans_jaccard"].to_string(),
+            class_name="px-4 py-2 text-sm text-gray-700",
+        ),
+        rx.el.td(
+            rx.cond(
+                row.contains("hierarchical_jaccard"),
+                row["hierarchical_jaccard"].to_string(),
+                "-",
+            ),
+            class_name="px-4 py-2 text-sm text-gray-700",
+        ),
+        class_name="border-t border-gray-200",
+    )
+
+
+def stability_card() -> rx.Component:
+    return rx.cond(
+        AppState.num_clustered_rows > 0,
+        rx.el.div(
+            rx.el.div(
+                rx.el.h3(
+                    "3. Algorithm Comparison & Stability",
+                    class_name="text-xl font-semibold text-gray-800",
+                ),
+                rx.el.div(
+                    rx.el.button(
+                        "Run Hierarchical Clustering",
+                        on_click=AppState.run_hierarchical_clustering,
+                        is_loading=AppState.current_stage == "Hierarchical Clustering...",
+                        class_name="px-4 py-2 bg-gray-200 text-gray-800 font-semibold rounded-lg shadow-sm hover:bg-gray-300 transition-colors",
+                    ),
+                    rx.el.button(
+                        "Run Stability Analysis",
+                        on_click=AppState.run_stability_analysis,
+                        is_loading=AppState.current_stage == "Stability Analysis...",
+                        class_name="px-4 py-2 bg-indigo-600 text-white font-semibold rounded-lg shadow-sm hover:bg-indigo-700 transition-colors",
+                    ),
+                    class_name="flex gap-4",
+                ),
+                class_name="flex items-center justify-between mb-6",
+            ),
+            rx.el.div(
+                rx.el.div(
+                    rx.el.h4(
+                        "Comparison", class_name="text-lg font-semibold text-gray-800 mb-3"
+                    ),
+                    rx.cond(
+                        AppState.cluster_comparison_data.length() > 0,
+                        rx.el.table(
+                            table_header(["Algorithm", "Score"]),
+                            rx.el.tbody(
+                                rx.foreach(
+                                    AppState.cluster_comparison_data, comparison_row
+                                )
+                            ),
+                            class_name="w-full border border-gray-200 rounded-lg",
+                        ),
+                        rx.el.p(
+                            "Run hierarchical clustering or HDBSCAN to compare it with K-Means.",
+                            class_name="text-sm text-gray-500",
+                        ),
+                    ),
+                ),
+                rx.el.div(
+                    rx.el.h4(
+                        "Bootstrap Stability",
+                        class_name="text-lg font-semibold text-gray-800 mb-3",
+                    ),
+                    rx.cond(
+                        AppState.stability_methods.length() > 0,
+                        rx.el.div(
+                            rx.el.p(
+                                AppState.stability_progress,
+                                class_name="text-sm text-gray-500 mb-2",
+                            ),
+                            rx.el.table(
+                                table_header(["Agreement", "Mean ARI"]),
+                                rx.el.tbody(
+                                    rx.foreach(
+                                        AppState.stability_methods,
+                                        stability_method_row,
+                                    )
+                                ),
+                                class_name="w-full border border-gray-200 rounded-lg mb-4",
+                            ),
+                            rx.el.table(
+                                table_header(
+                                    ["Segment", "K-Means Jaccard", "Hierarchical Jaccard"]
+                                ),
+                                rx.el.tbody(
+                                    rx.foreach(
+                                        AppState.stability_clusters,
+                                        stability_cluster_row,
+                                    )
+                                ),
+                                class_name="w-full border border-gray-200 rounded-lg",
+                            ),
+                            rx.el.p(
+                                "Segments with a mean Jaccard below 0.6 are unstable; above 0.75 they are well supported.",
+                                class_name="text-xs text-gray-400 mt-2",
+                            ),
+                        ),
+                        rx.el.p(
+                            rx.cond(
+                                AppState.stability_progress != "",
+                                AppState.stability_progress,
+                                "Re-cluster bootstrap resamples to check that each segment is reproducible.",
+                            ),
+                            class_name="text-sm text-gray-500",
+                        ),
+                    ),
+                ),
+                class_name="grid grid-cols-1 lg:grid-cols-2 gap-8",
+            ),
+            class_name="bg-white p-6 rounded-xl shadow-sm border border-gray-200",
+        ),
+        rx.el.div(),
+    )
+
+
 def clustering_page() -> rx.Component:
     return rx.el.div(
         rx.el.h2(
@@ -91,13 +518,21 @@ def clustering_page() -> rx.Component:
         ),
         rx.el.p(
             "Determine the optimal number of clusters and segment customers.",
-            class_name="text-gray-600 mb-8",
+            class_name="text-gray-600 mb-4",
+        ),
+        rx.el.div(
+            stage_badge("Elbow", AppState.stage_badges["elbow"]),
+            stage_badge("K-Means", AppState.stage_badges["clustering"]),
+            stage_badge("Hierarchical", AppState.stage_badges["hierarchical"]),
+            stage_badge("HDBSCAN", AppState.stage_badges["density"]),
+            class_name="flex flex-wrap gap-2 mb-8",
         ),
         rx.cond(
-            AppState.pca_data.length() > 0,
+            AppState.pca_row_count > 0,
             rx.el.div(
                 cluster_selection_card(),
                 clustering_results(),
+                stability_card(),
                 class_name="space-y-8"
             ),
             rx.el.div(
@@ -1,11 +1,19 @@
 import reflex as rx
-from app.state import AppState
+from app.state import ALL_SEGMENTS, AppState
+from app.components.datatable import data_table
 from app.components.card import (
     cluster_profile_card,
     CLUSTER_TEXT_COLORS,
     CLUSTER_BG_COLORS,
     CLUSTER_COLORS,
     CLUSTER_BORDER_COLORS,
+    NOISE_BG_COLOR,
+    NOISE_BORDER_COLOR,
+    NOISE_COLOR,
+    NOISE_TEXT_COLOR,
+    cluster_style,
+    segment_title,
+    stage_badge,
 )
 
 
@@ -13,16 +21,18 @@ def profile_filters() -> rx.Component:
     def filter_button(profile: rx.Var[dict]) -> rx.Component:
         cluster_id = profile["cluster_id"].to(int)
         is_active = AppState.selected_cluster_filter == cluster_id
-        color = rx.Var.create(CLUSTER_COLORS)[cluster_id]
-        text_color = rx.Var.create(CLUSTER_TEXT_COLORS)[cluster_id]
-        bg_color = rx.Var.create(CLUSTER_BG_COLORS)[cluster_id]
-        border_color = rx.Var.create(CLUSTER_BORDER_COLORS)[cluster_id]
+        color = cluster_style(CLUSTER_COLORS, NOISE_COLOR, cluster_id)
+        text_color = cluster_style(CLUSTER_TEXT_COLORS, NOISE_TEXT_COLOR, cluster_id)
+        bg_color = cluster_style(CLUSTER_BG_COLORS, NOISE_BG_COLOR, cluster_id)
+        border_color = cluster_style(
+            CLUSTER_BORDER_COLORS, NOISE_BORDER_COLOR, cluster_id
+        )
         return rx.el.button(
             rx.el.div(
                 class_name=f"w-6 h-6 rounded-full", style={"background_color": color}
             ),
             rx.el.span(
-                f"Customer {profile['cluster_id']}",
+                segment_title(cluster_id),
                 class_name="text-lg font-bold text-gray-800 mx-auto",
             ),
             rx.el.span(
@@ -50,9 +60,9 @@ def profile_filters() -> rx.Component:
                     AppState.total_customers_in_profiles.to_string(),
                     class_name="text-sm font-semibold px-3 py-1.5 rounded-full bg-gray-200 text-gray-700",
                 ),
-                on_click=lambda: AppState.filter_by_cluster(-1),
+                on_click=lambda: AppState.filter_by_cluster(ALL_SEGMENTS),
                 class_name=rx.cond(
-                    AppState.selected_cluster_filter == -1,
+                    AppState.selected_cluster_filter == ALL_SEGMENTS,
                     "flex items-center w-full text-left p-4 rounded-xl transition-all duration-300 transform shadow-lg bg-gray-100 border-2 border-gray-400",
                     "flex items-center w-full text-left p-4 rounded-xl transition-all duration-300 bg-white border-2 border-gray-200 shadow-sm hover:shadow-md",
                 ),
@@ -65,6 +75,101 @@ def profile_filters() -> rx.Component:
     )
 
 
+def segment_drilldown() -> rx.Component:
+    return rx.cond(
+        AppState.selected_cluster_filter != ALL_SEGMENTS,
+        rx.el.div(
+            rx.el.div(
+                rx.el.h3(
+                    "Customers in ",
+                    segment_title(AppState.selected_cluster_filter),
+                    class_name="text-2xl font-bold text-gray-800",
+                ),
+                rx.el.div(
+                    rx.el.select(
+                        rx.el.option("File order", value=""),
+                        rx.foreach(
+                            AppState.cleaned_data_columns,
+                            lambda col: rx.el.option(col, value=col),
+                        ),
+                        value=AppState.drilldown_sort,
+                        on_change=AppState.set_drilldown_sort,
+                        class_name="px-2 py-1 border border-gray-300 rounded-md text-sm",
+                    ),
+                    rx.el.button(
+                        rx.cond(AppState.drilldown_descending, "Descending", "Ascending"),
+                        on_click=AppState.toggle_drilldown_order,
+                        class_name="px-3 py-1 text-sm font-medium text-gray-700 bg-gray-100 rounded-md hover:bg-gray-200",
+                    ),
+                    rx.el.button(
+                        rx.icon("file-down", class_name="w-4 h-4 mr-1"),
+                        "CSV",
+                        on_click=AppState.export_segment("csv"),
+                        class_name="flex items-center px-3 py-1 text-sm font-medium text-gray-700 bg-gray-100 rounded-md hover:bg-gray-200",
+                    ),
+                    rx.el.button(
+                        rx.icon("file-down", class_name="w-4 h-4 mr-1"),
+                        "Parquet",
+                        on_click=AppState.export_segment("parquet"),
+                        class_name="flex items-center px-3 py-1 text-sm font-medium text-gray-700 bg-gray-100 rounded-md hover:bg-gray-200",
+                    ),
+                    class_name="flex items-center gap-3",
+                ),
+                class_name="flex flex-wrap items-center justify-between gap-4 mb-4",
+            ),
+            rx.cond(
+                AppState.selected_representatives.length() > 0,
+                rx.el.div(
+                    rx.el.h4(
+                        "Typical and Borderline Customers",
+                        class_name="text-lg font-semibold text-gray-800",
+                    ),
+                    rx.el.p(
+                        "Typical customers sit closest to the segment centre. Borderline "
+                        "customers are nearly as close to another segment (ambiguity "
+                        "near 1.0).",
+                        class_name="text-sm text-gray-500 mb-3",
+                    ),
+                    data_table(
+                        AppState.selected_representatives,
+                        AppState.representative_columns,
+                    ),
+                    class_name="mb-8",
+                ),
+                rx.el.div(),
+            ),
+            data_table(AppState.drilldown_rows, AppState.drilldown_columns),
+            rx.el.div(
+                rx.el.button(
+                    "Previous",
+                    on_click=AppState.change_drilldown_page(-1),
+                    disabled=AppState.drilldown_page == 0,
+                    class_name="px-3 py-1 text-sm font-medium text-gray-700 bg-gray-100 rounded-md hover:bg-gray-200 disabled:opacity-50",
+                ),
+                rx.el.span(
+                    "Page ",
+                    (AppState.drilldown_page + 1).to_string(),
+                    " of ",
+                    AppState.drilldown_page_count.to_string(),
+                    " (",
+                    AppState.drilldown_total.to_string(),
+                    " customers)",
+                    class_name="text-sm text-gray-600",
+                ),
+                rx.el.button(
+                    "Next",
+                    on_click=AppState.change_drilldown_page(1),
+                    disabled=AppState.drilldown_page + 1 >= AppState.drilldown_page_count,
+                    class_name="px-3 py-1 text-sm font-medium text-gray-700 bg-gray-100 rounded-md hover:bg-gray-200 disabled:opacity-50",
+                ),
+                class_name="flex items-center justify-end gap-4 mt-4",
+            ),
+            class_name="mt-12",
+        ),
+        rx.el.div(),
+    )
+
+
 def customer_profiles_page() -> rx.Component:
     return rx.el.div(
         rx.el.div(
@@ -76,6 +181,10 @@ def customer_profiles_page() -> rx.Component:
                 "Detailed breakdown of each customer segment based on their characteristics.",
                 class_name="text-lg text-gray-600 mt-2",
             ),
+            rx.el.div(
+                stage_badge("Profiles", AppState.stage_badges["profiles"]),
+                class_name="flex flex-wrap gap-2 mt-4",
+            ),
             class_name="mb-10",
         ),
         rx.cond(
@@ -89,6 +198,7 @@ def customer_profiles_page() -> rx.Component:
                     ),
                     class_name="grid grid-cols-1 xl:grid-cols-2 gap-10",
                 ),
+                segment_drilldown(),
                 rx.el.div(
                     rx.el.button(
                         rx.icon("download", class_name="w-5 h-5 mr-2"),
@@ -96,6 +206,18 @@ def customer_profiles_page() -> rx.Component:
                         on_click=AppState.download_cluster_summary,
                         class_name="flex items-center px-8 py-4 bg-gray-200 text-gray-800 font-semibold rounded-xl shadow-md hover:bg-gray-300 transition-all text-lg",
                     ),
+                    rx.el.button(
+                        rx.icon("file-down", class_name="w-5 h-5 mr-2"),
+                        "Export Segments (CSV)",
+                        on_click=AppState.export_dataset("clustered", "csv"),
+                        class_name="flex items-center px-8 py-4 bg-gray-200 text-gray-800 font-semibold rounded-xl shadow-md hover:bg-gray-300 transition-all text-lg",
+                    ),
+                    rx.el.button(
+                        rx.icon("file-down", class_name="w-5 h-5 mr-2"),
+                        "Export Segments (Parquet)",
+                        on_click=AppState.export_dataset("clustered", "parquet"),
+                        class_name="flex items-center px-8 py-4 bg-gray-200 text-gray-800 font-semibold rounded-xl shadow-md hover:bg-gray-300 transition-all text-lg",
+                    ),
                     rx.el.button(
                         "Generate Marketing Insights",
                         rx.icon("arrow-right", class_name="w-5 h-5 ml-2"),
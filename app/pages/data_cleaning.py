@@ -1,6 +1,6 @@
 import reflex as rx
 from app.state import AppState
-from app.components.card import metric_card
+from app.components.card import metric_card, stage_badge
 from app.components.datatable import data_table
 
 
@@ -11,10 +11,14 @@ def data_cleaning_page() -> rx.Component:
         ),
         rx.el.p(
             "The raw data has been processed. Here is a summary of the cleaning operations.",
-            class_name="text-gray-600 mb-8",
+            class_name="text-gray-600 mb-4",
+        ),
+        rx.el.div(
+            stage_badge("Cleaning", AppState.stage_badges["cleaning"]),
+            class_name="flex flex-wrap gap-2 mb-8",
         ),
         rx.cond(
-            AppState.cleaned_data.length() > 0,
+            AppState.cleaned_data_preview.length() > 0,
             rx.el.div(
                 rx.el.div(
                     metric_card(
@@ -69,6 +73,32 @@ def data_cleaning_page() -> rx.Component:
                             on_click=AppState.download_cleaning_log,
                             class_name="flex items-center px-4 py-2 bg-gray-200 text-gray-800 font-semibold rounded-lg shadow-sm hover:bg-gray-300 transition-colors",
                         ),
+                        rx.el.button(
+                            rx.icon("file-down", class_name="w-4 h-4 mr-2"),
+                            "Export Cleaned Data",
+                            on_click=AppState.export_dataset("cleaned", "csv"),
+                            class_name="flex items-center px-4 py-2 bg-gray-200 text-gray-800 font-semibold rounded-lg shadow-sm hover:bg-gray-300 transition-colors",
+                        ),
+                        rx.cond(
+                            AppState.categorical_columns.length() > 0,
+                            rx.el.div(
+                                rx.el.span(
+                                    AppState.categorical_columns.length().to_string(),
+                                    " categorical columns:",
+                                    class_name="text-sm text-gray-600",
+                                ),
+                                rx.el.select(
+                                    rx.el.option("Ignore", value="none"),
+                                    rx.el.option("One-hot (FAMD)", value="onehot"),
+                                    rx.el.option("Frequency", value="frequency"),
+                                    value=AppState.categorical_encoding,
+                                    on_change=AppState.set_categorical_encoding,
+                                    class_name="px-2 py-1 border border-gray-300 rounded-md text-sm",
+                                ),
+                                class_name="flex items-center gap-2",
+                            ),
+                            rx.fragment(),
+                        ),
                         rx.el.button(
                             "Run PCA Analysis",
                             rx.icon("arrow-right", class_name="w-4 h-4 ml-2"),
@@ -76,7 +106,7 @@ def data_cleaning_page() -> rx.Component:
                             is_loading=AppState.current_stage == "PCA Analysis...",
                             class_name="flex items-center px-4 py-2 bg-indigo-600 text-white font-semibold rounded-lg shadow-sm hover:bg-indigo-700 transition-colors",
                         ),
-                        class_name="flex justify-end gap-4",
+                        class_name="flex items-center justify-end gap-4",
                     ),
                     class_name="bg-white p-6 rounded-xl shadow-sm border border-gray-200 mb-8",
                 ),
@@ -85,7 +115,7 @@ def data_cleaning_page() -> rx.Component:
                     class_name="text-xl font-semibold text-gray-800 mb-4",
                 ),
                 data_table(
-                    data=AppState.cleaned_data[:100],
+                    data=AppState.cleaned_data_preview,
                     columns=AppState.cleaned_data_columns,
                 ),
                 class_name="space-y-8",
@@ -0,0 +1,283 @@
+import reflex as rx
+from app.state import AppState
+from app.components.card import metric_card
+
+
+def capture_row(capture: rx.Var[dict]) -> rx.Component:
+    return rx.el.tr(
+        rx.el.td(
+            capture["created"].to_string(), class_name="px-4 py-2 text-sm text-gray-700"
+        ),
+        rx.el.td(
+            capture["stage"].to_string(), class_name="px-4 py-2 text-sm text-gray-700"
+        ),
+        rx.el.td(
+            capture["duration_s"].to_string(),
+            " s",
+            class_name="px-4 py-2 text-sm text-gray-700",
+        ),
+        rx.el.td(
+            capture["total_calls"].to_string(),
+            class_name="px-4 py-2 text-sm text-gray-700",
+        ),
+        rx.el.td(
+            capture["samples"].to_string(), class_name="px-4 py-2 text-sm text-gray-700"
+        ),
+        rx.el.td(
+            rx.el.div(
+                rx.el.button(
+                    "pstats",
+                    on_click=AppState.download_profile_capture(
+                        capture["name"].to(str), ".pstats"
+                    ),
+                    class_name="px-3 py-1 text-xs font-medium text-gray-700 bg-gray-100 rounded-md hover:bg-gray-200 transition-colors",
+                ),
+                rx.el.button(
+                    "flamegraph stacks",
+                    on_click=AppState.download_profile_capture(
+                        capture["name"].to(str), ".folded"
+                    ),
+                    class_name="px-3 py-1 text-xs font-medium text-gray-700 bg-gray-100 rounded-md hover:bg-gray-200 transition-colors",
+                ),
+                class_name="flex gap-2",
+            ),
+            class_name="px-4 py-2",
+        ),
+        class_name="border-t border-gray-200 hover:bg-gray-50",
+    )
+
+
+def profiling_card() -> rx.Component:
+    return rx.el.div(
+        rx.el.div(
+            rx.el.div(
+                rx.el.h3(
+                    "Pipeline Profiling",
+                    class_name="text-xl font-semibold text-gray-800",
+                ),
+                rx.el.p(
+                    "When enabled, each pipeline step of this session is profiled. Set CLIENT_SEGMENT_PROFILE=1 to profile every session.",
+                    class_name="text-sm text-gray-500 mt-1",
+                ),
+            ),
+            rx.el.div(
+                rx.el.button(
+                    rx.cond(
+                        AppState.profiling_enabled,
+                        "Disable Profiling",
+                        "Enable Profiling",
+                    ),
+                    on_click=AppState.toggle_profiling,
+                    class_name=rx.cond(
+                        AppState.profiling_enabled,
+                        "px-4 py-2 bg-red-600 text-white font-semibold rounded-lg shadow-sm hover:bg-red-700 transition-colors",
+                        "px-4 py-2 bg-indigo-600 text-white font-semibold rounded-lg shadow-sm hover:bg-indigo-700 transition-colors",
+                    ),
+                ),
+                rx.el.button(
+                    rx.icon("refresh-cw", class_name="w-4 h-4"),
+                    on_click=AppState.refresh_profile_captures,
+                    class_name="px-3 py-2 bg-gray-200 text-gray-800 rounded-lg shadow-sm hover:bg-gray-300 transition-colors",
+                ),
+                class_name="flex gap-2",
+            ),
+            class_name="flex items-center justify-between mb-6",
+        ),
+        rx.cond(
+            AppState.profile_captures.length() > 0,
+            rx.el.div(
+                rx.el.table(
+                    rx.el.thead(
+                        rx.el.tr(
+                            rx.foreach(
+                                [
+                                    "Captured",
+                                    "Stage",
+                                    "Duration",
+                                    "Calls",
+                                    "Samples",
+                                    "Download",
+                                ],
+                                lambda col: rx.el.th(
+                                    col,
+                                    class_name="px-4 py-2 text-left text-sm font-semibold text-gray-600 bg-gray-50",
+                                ),
+                            )
+                        )
+                    ),
+                    rx.el.tbody(rx.foreach(AppState.profile_captures, capture_row)),
+                    class_name="w-full",
+                ),
+                class_name="overflow-x-auto bg-white border border-gray-200 rounded-xl shadow-sm",
+            ),
+            rx.el.div(
+                rx.icon("activity", class_name="w-12 h-12 text-gray-300"),
+                rx.el.p(
+                    "No profile captures yet. Enable profiling and run a pipeline step.",
+                    class_name="text-gray-500",
+                ),
+                class_name="flex flex-col items-center justify-center h-48 bg-gray-50 rounded-lg",
+            ),
+        ),
+        class_name="bg-white p-6 rounded-xl shadow-sm border border-gray-200 mb-8",
+    )
+
+
+def table_header(columns: list[str]) -> rx.Component:
+    return rx.el.thead(
+        rx.el.tr(
+            rx.foreach(
+                columns,
+                lambda col: rx.el.th(
+                    col,
+                    class_name="px-4 py-2 text-left text-sm font-semibold text-gray-600 bg-gray-50",
+                ),
+            )
+        )
+    )
+
+
+def dataset_row(dataset: rx.Var[dict]) -> rx.Component:
+    return rx.el.tr(
+        rx.el.td(
+            dataset["name"].to_string(), class_name="px-4 py-2 text-sm text-gray-700"
+        ),
+        rx.el.td(
+            dataset["size_mb"].to_string(),
+            " MB",
+            class_name="px-4 py-2 text-sm text-gray-700",
+        ),
+        rx.el.td(
+            dataset["location"].to_string(),
+            class_name="px-4 py-2 text-sm text-gray-700",
+        ),
+        class_name="border-t border-gray-200 hover:bg-gray-50",
+    )
+
+
+def session_row(session: rx.Var[dict]) -> rx.Component:
+    return rx.el.tr(
+        rx.el.td(
+            session["session"].to_string(),
+            class_name="px-4 py-2 text-sm font-mono text-gray-700",
+        ),
+        rx.el.td(
+            session["memory_mb"].to_string(),
+            " MB",
+            class_name="px-4 py-2 text-sm text-gray-700",
+        ),
+        rx.el.td(
+            session["disk_mb"].to_string(),
+            " MB",
+            class_name="px-4 py-2 text-sm text-gray-700",
+        ),
+        rx.el.td(
+            session["idle_min"].to_string(),
+            " min",
+            class_name="px-4 py-2 text-sm text-gray-700",
+        ),
+        class_name="border-t border-gray-200 hover:bg-gray-50",
+    )
+
+
+def memory_card() -> rx.Component:
+    return rx.el.div(
+        rx.el.div(
+            rx.el.div(
+                rx.el.h3(
+                    "Session Memory",
+                    class_name="text-xl font-semibold text-gray-800",
+                ),
+                rx.el.p(
+                    "Datasets beyond the per-session budget, or of sessions idle longer than CLIENT_SEGMENT_SESSION_IDLE_S, are moved to disk and reloaded on the next step that needs them.",
+                    class_name="text-sm text-gray-500 mt-1",
+                ),
+            ),
+            rx.el.button(
+                rx.icon("refresh-cw", class_name="w-4 h-4"),
+                on_click=AppState.refresh_memory_footprint,
+                class_name="px-3 py-2 bg-gray-200 text-gray-800 rounded-lg shadow-sm hover:bg-gray-300 transition-colors",
+            ),
+            class_name="flex items-center justify-between mb-6",
+        ),
+        rx.cond(
+            AppState.memory_footprint.contains("memory_mb"),
+            rx.el.div(
+                rx.el.div(
+                    metric_card(
+                        "Datasets in Memory (MB)",
+                        AppState.memory_footprint["memory_mb"],
+                        "database",
+                        "text-indigo-600",
+                    ),
+                    metric_card(
+                        "Datasets on Disk (MB)",
+                        AppState.memory_footprint["disk_mb"],
+                        "hard-drive",
+                        "text-emerald-600",
+                    ),
+                    metric_card(
+                        "Chart Series (MB)",
+                        AppState.memory_footprint["chart_mb"],
+                        "chart-scatter",
+                        "text-violet-600",
+                    ),
+                    metric_card(
+                        "Session Budget (MB)",
+                        AppState.memory_footprint["session_budget_mb"],
+                        "gauge",
+                        "text-amber-600",
+                    ),
+                    class_name="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-4 gap-4 mb-6",
+                ),
+                rx.el.div(
+                    rx.el.table(
+                        table_header(["Dataset", "Size", "Location"]),
+                        rx.el.tbody(rx.foreach(AppState.memory_datasets, dataset_row)),
+                        class_name="w-full",
+                    ),
+                    class_name="overflow-x-auto bg-white border border-gray-200 rounded-xl shadow-sm mb-6",
+                ),
+                rx.el.p(
+                    AppState.memory_footprint["sessions"].to_string(),
+                    " sessions hold ",
+                    AppState.memory_footprint["total_memory_mb"].to_string(),
+                    " MB in memory and ",
+                    AppState.memory_footprint["total_disk_mb"].to_string(),
+                    " MB on disk (budget ",
+                    AppState.memory_footprint["total_budget_mb"].to_string(),
+                    " MB).",
+                    class_name="text-sm text-gray-600 mb-2",
+                ),
+                rx.el.div(
+                    rx.el.table(
+                        table_header(["Session", "Memory", "Disk", "Idle"]),
+                        rx.el.tbody(rx.foreach(AppState.memory_sessions, session_row)),
+                        class_name="w-full",
+                    ),
+                    class_name="overflow-x-auto bg-white border border-gray-200 rounded-xl shadow-sm",
+                ),
+            ),
+            rx.el.div(
+                rx.icon("database", class_name="w-12 h-12 text-gray-300"),
+                rx.el.p(
+                    "Refresh to see the memory held by this session's datasets.",
+                    class_name="text-gray-500",
+                ),
+                class_name="flex flex-col items-center justify-center h-48 bg-gray-50 rounded-lg",
+            ),
+        ),
+        class_name="bg-white p-6 rounded-xl shadow-sm border border-gray-200 mb-8",
+    )
+
+
+def diagnostics_page() -> rx.Component:
+    return rx.el.div(
+        rx.el.h2("Diagnostics", class_name="text-3xl font-bold text-gray-800 mb-2"),
+        rx.el.p(
+            "Profile pipeline steps, download captures for flamegraph analysis and inspect session memory.",
+            class_name="text-gray-600 mb-8",
+        ),
+        profiling_card(),
+        memory_card(),
+    )
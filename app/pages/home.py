@@ -9,11 +9,11 @@ def upload_area() -> rx.Component:
             rx.el.div(
                 rx.icon("cloud_upload", class_name="w-12 h-12 text-gray-400"),
                 rx.el.h3(
-                    "Upload CSV File",
+                    "Upload CSV Files",
                     class_name="mt-4 text-lg font-semibold text-gray-800",
                 ),
                 rx.el.p(
-                    "Drag and drop or click to select a file.",
+                    "Drag and drop or click to select one or more files. Regional extracts with the same columns are merged.",
                     class_name="mt-1 text-sm text-gray-500",
                 ),
                 rx.el.p("Max file size: 5MB", class_name="text-xs text-gray-400 mt-2"),
@@ -22,6 +22,7 @@ def upload_area() -> rx.Component:
             class_name="flex items-center justify-center w-full h-64 p-6 border-2 border-dashed border-gray-300 rounded-xl cursor-pointer hover:bg-gray-50 transition-colors",
         ),
         id="upload_csv",
+        multiple=True,
         on_drop=AppState.handle_upload(rx.upload_files(upload_id="upload_csv")),
         border="none",
         padding="0",
@@ -29,6 +30,26 @@ def upload_area() -> rx.Component:
     )
 
 
+def upload_counts() -> rx.Component:
+    return rx.cond(
+        AppState.upload_row_counts.length() > 1,
+        rx.el.div(
+            rx.foreach(
+                AppState.upload_row_counts,
+                lambda entry: rx.el.span(
+                    entry["file"].to_string(),
+                    ": ",
+                    entry["rows"].to_string(),
+                    " rows",
+                    class_name="px-2 py-1 text-xs text-gray-700 bg-gray-100 rounded-md",
+                ),
+            ),
+            class_name="flex flex-wrap gap-2 mb-4",
+        ),
+        rx.el.div(),
+    )
+
+
 def home_page() -> rx.Component:
     """Landing page with file upload."""
     return rx.el.div(
@@ -57,7 +78,11 @@ def home_page() -> rx.Component:
                             ),
                             rx.el.div(
                                 rx.el.p(
-                                    "File Uploaded:",
+                                    rx.cond(
+                                        AppState.uploaded_files.length() > 1,
+                                        "Files Uploaded:",
+                                        "File Uploaded:",
+                                    ),
                                     class_name="font-semibold text-gray-800",
                                 ),
                                 rx.el.p(
@@ -81,6 +106,7 @@ def home_page() -> rx.Component:
                             ),
                             class_name="flex items-center gap-4 w-full p-4 bg-green-50 border border-green-200 rounded-xl mb-4",
                         ),
+                        upload_counts(),
                         data_table(
                             data=AppState.raw_data, columns=AppState.raw_data_columns
                         ),
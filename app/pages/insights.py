@@ -1,6 +1,6 @@
 import reflex as rx
 from app.state import AppState
-from app.components.card import metric_card, insight_card
+from app.components.card import metric_card, insight_card, stage_badge
 from app.components.charts import pie_chart
 
 
@@ -64,7 +64,11 @@ def insights_page() -> rx.Component:
         ),
         rx.el.p(
             "Actionable recommendations for each customer segment.",
-            class_name="text-gray-600 mb-8",
+            class_name="text-gray-600 mb-4",
+        ),
+        rx.el.div(
+            stage_badge("Insights", AppState.stage_badges["insights"]),
+            class_name="flex flex-wrap gap-2 mb-8",
         ),
         rx.cond(
             AppState.insights_data.length() > 0,
@@ -1,6 +1,7 @@
 import reflex as rx
 from app.state import AppState
 from app.components.charts import variance_chart, scatter_chart
+from app.components.card import stage_badge
 from app.components.datatable import data_table
 
 
@@ -11,10 +12,14 @@ def pca_analysis_page() -> rx.Component:
         ),
         rx.el.p(
             "Principal Component Analysis has been performed to reduce dimensionality.",
-            class_name="text-gray-600 mb-8",
+            class_name="text-gray-600 mb-4",
+        ),
+        rx.el.div(
+            stage_badge("PCA", AppState.stage_badges["pca"]),
+            class_name="flex flex-wrap gap-2 mb-8",
         ),
         rx.cond(
-            AppState.pca_data.length() > 0,
+            AppState.pca_row_count > 0,
             rx.el.div(
                 rx.el.div(
                     rx.el.div(
@@ -53,13 +58,19 @@ def pca_analysis_page() -> rx.Component:
                     class_name="bg-white p-6 rounded-xl shadow-sm border border-gray-200 mb-8",
                 ),
                 rx.el.div(
+                    rx.el.button(
+                        rx.icon("file-down", class_name="mr-2 w-4 h-4"),
+                        "Export PCA Scores",
+                        on_click=AppState.export_dataset("pca", "csv"),
+                        class_name="flex items-center px-6 py-3 bg-gray-200 text-gray-800 font-semibold rounded-lg shadow-sm hover:bg-gray-300 transition-colors",
+                    ),
                     rx.el.button(
                         "Go to Clustering",
                         rx.icon("arrow-right", class_name="ml-2 w-4 h-4"),
                         on_click=rx.redirect("/clustering"),
                         class_name="flex items-center px-6 py-3 bg-indigo-600 text-white font-semibold rounded-lg shadow-sm hover:bg-indigo-700 transition-colors",
                     ),
-                    class_name="flex justify-end",
+                    class_name="flex justify-end gap-4",
                 ),
                 class_name="space-y-8",
             ),
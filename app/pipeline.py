@@ -0,0 +1,166 @@
+import json
+import logging
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from app.utils.cleaning_pipeline import clean_data
+from app.utils.pca_utils import perform_pca
+from app.utils.encoding import detect_categorical_columns
+from app.utils.clustering_utils import (
+    compute_elbow_data,
+    perform_clustering,
+    generate_cluster_profiles,
+    compute_centroids,
+    resolve_column_roles,
+)
+from app.utils.distributed_kmeans import TcpTransport, perform_distributed_clustering
+from app.utils.insights_utils import generate_marketing_insights, insights_to_frame
+from app.utils.exports import iter_frame_chunks, iter_csv_bytes, iter_parquet_bytes
+from app.utils.model_store import build_model, save_model, segment_names
+
+
+def run_pipeline(
+    df: pd.DataFrame,
+    k: int = 3,
+    elbow: bool = True,
+    categorical: str | None = None,
+    shards: int = 0,
+    kmeans_workers: list[str] | None = None,
+    shard_dir: str | Path | None = None,
+) -> dict:
+    """Runs clean → PCA → elbow → cluster → profile → insights on one dataset.
+
+    This is the same sequence of app/utils calls the UI makes through
+    AppState, without a Reflex server. With `shards` or `kmeans_workers`
+    ("host:port" of app.kmeans_worker processes), K-Means runs as sharded
+    map-reduce instead of in this process. The shards are memory-mapped
+    from .npy files by local workers, and by TCP workers when `shard_dir`
+    is a directory they share with this process.
+    """
+    resolve_column_roles(df)  # fail fast on files missing a required column
+    cleaned_df, log, summary, params = clean_data(df, return_params=True)
+    if categorical:
+        pca = perform_pca(
+            cleaned_df, detect_categorical_columns(cleaned_df), categorical
+        )
+    else:
+        pca = perform_pca(cleaned_df)
+    pca_df = pd.DataFrame(
+        pca["pca_result"],
+        columns=[f"PC{i + 1}" for i in range(pca["pca_result"].shape[1])],
+    )
+    elbow_data = compute_elbow_data(pca_df) if elbow else []
+    if kmeans_workers:
+        with TcpTransport(kmeans_workers) as transport:
+            labels = perform_distributed_clustering(
+                pca_df, k, transport, shard_dir=shard_dir
+            )["labels"]
+    elif shards:
+        labels = perform_distributed_clustering(pca_df, k, n_shards=shards)["labels"]
+    else:
+        labels = perform_clustering(pca_df, k)
+    profiles = generate_cluster_profiles(cleaned_df, labels)
+    insights = generate_marketing_insights(profiles)
+    model = build_model(
+        pca,
+        compute_centroids(pca_df, labels),
+        resolve_column_roles(cleaned_df),
+        profiles,
+        params,
+    )
+    return {
+        "cleaned": cleaned_df,
+        "cleaning_log": log,
+        "cleaning_summary": summary,
+        "pca": pca,
+        "pca_df": pca_df,
+        "elbow": elbow_data,
+        "labels": labels,
+        "profiles": profiles,
+        "insights": insights,
+        "model": model,
+    }
+
+
+def write_artifacts(result: dict, output_dir: str | Path, fmt: str = "csv") -> dict:
+    """Writes the artifacts of one pipeline run and returns their paths by name."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    paths = {
+        "cleaning_log": output_dir / "cleaning_log.txt",
+        "profiles": output_dir / "cluster_summary.csv",
+        "insights": output_dir / "marketing_insights_report.csv",
+        "labelled": output_dir / f"segmented_customers.{fmt}",
+    }
+    paths["cleaning_log"].write_text("\n".join(result["cleaning_log"]))
+    pd.DataFrame(result["profiles"]).to_csv(paths["profiles"], index=False)
+    insights_to_frame(result["insights"]).to_csv(paths["insights"], index=False)
+    if result["elbow"]:
+        paths["elbow"] = output_dir / "elbow.csv"
+        pd.DataFrame(result["elbow"]).to_csv(paths["elbow"], index=False)
+    labels = np.asarray(result["labels"])
+    chunks = iter_frame_chunks(
+        result["cleaned"],
+        {"cluster": labels, "segment_name": segment_names(result["model"])[labels]},
+    )
+    stream = iter_parquet_bytes(chunks) if fmt == "parquet" else iter_csv_bytes(chunks)
+    with open(paths["labelled"], "wb") as f:
+        for block in stream:
+            f.write(block)
+    version = save_model(result["model"], output_dir / "model")
+    paths["model"] = output_dir / "model" / f"{version}.npz"
+    return paths
+
+
+def process_file(
+    path: str | Path,
+    output_dir: str | Path,
+    k: int = 3,
+    elbow: bool = True,
+    fmt: str = "csv",
+    categorical: str | None = None,
+    shards: int = 0,
+    kmeans_workers: list[str] | None = None,
+    shard_dir: str | Path | None = None,
+) -> dict:
+    """Runs the pipeline on one CSV file and writes its artifacts.
+
+    Meant to be called in a worker process; failures are reported in the
+    returned summary instead of raised.
+    """
+    path = Path(path)
+    output_dir = Path(output_dir) / path.stem
+    try:
+        result = run_pipeline(
+            pd.read_csv(path),
+            k=k,
+            elbow=elbow,
+            categorical=categorical,
+            shards=shards,
+            kmeans_workers=kmeans_workers,
+            shard_dir=shard_dir,
+        )
+        paths = write_artifacts(result, output_dir, fmt)
+        summary = {
+            "input": str(path),
+            "status": "ok",
+            "rows": len(result["cleaned"]),
+            "k": int(k),
+            # Several clusters can share a segment name, so list them by id.
+            "segments": [
+                {
+                    "cluster_id": int(insight["cluster_id"]),
+                    "segment_name": insight["segment_name"],
+                    "size": int(insight["size"]),
+                }
+                for insight in result["insights"]
+            ],
+            "model_version": result["model"]["version"],
+            "artifacts": {name: str(p) for name, p in paths.items()},
+        }
+    except Exception as e:
+        logging.exception(f"Pipeline failed for {path}: {e}")
+        summary = {"input": str(path), "status": "failed", "error": str(e)}
+    output_dir.mkdir(parents=True, exist_ok=True)
+    (output_dir / "run_summary.json").write_text(json.dumps(summary, indent=2))
+    return summary
@@ -1,20 +1,105 @@
 import reflex as rx
+from reflex.config import get_config
 from typing import Any
 import pandas as pd
-import io
+import asyncio
+import secrets
 import logging
 import numpy as np
 from app.utils.cleaning_pipeline import clean_data
 from app.utils.pca_utils import perform_pca
+from app.utils.encoding import detect_categorical_columns
 from app.utils.clustering_utils import (
-    compute_elbow_data,
+    iter_elbow_data,
     perform_clustering,
+    preview_clustering,
+    perform_incremental_clustering,
+    perform_sampled_clustering,
+    segment_drift,
     perform_hierarchical_clustering,
     compute_dendrogram_data,
     generate_cluster_profiles,
+    compute_centroids,
+    centroid_distances,
+    representative_customers,
+    perform_density_clustering,
+    resolve_column_roles,
+    silhouette,
+    NOISE_LABEL,
+    PREVIEW_SAMPLE_ROWS,
+)
+from app.utils.knn_graph import knn_consistency, knn_graph
+from app.utils.model_store import (
+    build_model,
+    save_model,
+    load_model,
+    list_models,
+    pin_models,
+    project_centroids,
+)
+from app.utils.insights_utils import generate_marketing_insights, insights_to_frame
+from app.utils.exports import ExportLoader, register_export
+from app.utils.ingest import parse_uploads, merge_uploads
+from app.utils.stability import iter_bootstrap_stability
+from app.utils.k_selection import recommend_k
+from app.utils.profiling import profiled, list_captures, read_capture
+from app.utils.dtypes import compact_frame, label_array
+from app.utils.derived import DerivedCache, dataset_key, derived
+from app.utils.session_store import (
+    SPILL_TTL_S,
+    dataset_version,
+    drop_session,
+    get_dataset,
+    has_session,
+    put_dataset,
+    series_bytes,
+    store_footprint,
+)
+from app.utils.segment_index import (
+    DRILLDOWN_PAGE_SIZE,
+    build_segment_index,
+    segment_members,
+    segment_page,
+)
+from app.utils.stage_graph import (
+    STAGE_PARAMS,
+    source_fingerprint,
+    stage_fingerprint,
+    stage_status,
+    stale_stages,
+    upstream,
+)
+from app.utils.wire_format import (
+    columnar_series,
+    columnar_series_by_label,
+    fingerprint,
+    round_records,
+)
+
+# Profile filter value that shows every segment; -1 is the noise label.
+ALL_SEGMENTS = -2
+# Handler that recomputes each stage of app/utils/stage_graph.py. Profiles
+# are produced by the segmentation handler that ran last.
+STAGE_HANDLERS = {
+    "cleaning": "run_cleaning",
+    "pca": "run_pca",
+    "elbow": "compute_elbow_method",
+    "clustering": "run_clustering",
+    "hierarchical": "run_hierarchical_clustering",
+    "density": "run_density_clustering",
+    "insights": "generate_insights",
+}
+# Vars the stage parameters are read from; warm_start_version resolves
+# from warm_start_model and model_version.
+STAGE_VARS = [
+    *(name for name in STAGE_PARAMS if name != "warm_start_version"),
+    "warm_start_model",
+    "model_version",
+]
+DATA_DROPPED_MESSAGE = (
+    "This session's data was deleted after a long period without use. "
+    "Please upload your file again."
 )
-from app.utils.insights_utils import generate_marketing_insights
-from sklearn.metrics import silhouette_score, adjusted_rand_score
 
 
 class AppState(rx.State):
@@ -22,11 +107,14 @@ class AppState(rx.State):
 
     raw_data: list[dict[str, str | int | float]] = []
     raw_data_columns: list[str] = []
-    cleaned_data: list[dict[str, str | int | float]] = []
+    cleaned_data_preview: list[dict[str, str | int | float]] = []
     cleaned_data_columns: list[str] = []
-    pca_data: list[dict[str, str | int | float]] = []
-    clustered_data: list[dict[str, str | int | float]] = []
-    hierarchical_clustered_data: list[dict[str, str | int | float]] = []
+    categorical_columns: list[str] = []
+    categorical_encoding: str = "none"
+    pca_feature_names: list[str] = []
+    pca_row_count: int = 0
+    num_clustered_rows: int = 0
+    clustering_preview_rows: int = 0
     dendrogram_data: dict = {}
     profiles: list[dict[str, str | int | float]] = []
     insights_data: list[dict[str, str | int | float | list[dict[str, str]]]] = []
@@ -36,7 +124,11 @@ class AppState(rx.State):
     cleaning_log: list[str] = []
     current_stage: str = "Upload"
     uploaded_files: list[str] = []
+    upload_row_counts: list[dict[str, str | int]] = []
     num_clusters: int = 3
+    k_min: int = 2
+    k_max: int = 10
+    k_recommendation: dict[str, int | float] = {}
     is_uploading: bool = False
     cleaning_summary: dict[str, int] = {
         "total_rows": 0,
@@ -46,35 +138,171 @@ class AppState(rx.State):
     }
     pca_results: dict[str, list[float]] = {}
     pca_variance_data: list[dict[str, str | float]] = []
-    pca_scatter_data: list[dict[str, float]] = []
+    pca_scatter_data: dict[str, list[float]] = {}
     pca_components_data: list[dict[str, str | float]] = []
     elbow_data: list[dict[str, float]] = []
-    cluster_scatter_data: dict[int, list[dict[str, str | int | float]]] = {}
-    hierarchical_cluster_scatter_data: dict[int, list[dict[str, str | int | float]]] = {}
+    cluster_scatter_data: dict[int, dict[str, list[float]]] = {}
+    hierarchical_cluster_scatter_data: dict[int, dict[str, list[float]]] = {}
     cluster_profiles: list[dict[str, str | int | float]] = []
-    selected_cluster_filter: int = -1
+    selected_cluster_filter: int = ALL_SEGMENTS
     cluster_comparison_data: list[dict[str, str | int | float]] = []
-    kmeans_labels: list[int] = []
-    hierarchical_labels: list[int] = []
+    profiling_enabled: bool = False
+    profile_captures: list[dict[str, str | int | float]] = []
+    memory_footprint: dict[str, int | float] = {}
+    memory_datasets: list[dict[str, str | float]] = []
+    memory_sessions: list[dict[str, str | float]] = []
+    model_version: str = ""
+    incremental_mode: bool = False
+    warm_start_model: str = ""
+    saved_model_versions: list[str] = []
+    previous_model_version: str = ""
+    incremental_iterations: int = 0
+    segment_drift_data: list[dict[str, str | int | float]] = []
+    clustering_sample_size: int = 0
+    stability_methods: list[dict[str, str | float]] = []
+    stability_clusters: list[dict[str, int | float]] = []
+    stability_progress: str = ""
+    sampling_report: dict[str, int | float] = {}
+    segmentation_method: str = "K-Means"
+    density_min_cluster_size: int = 0
+    density_report: dict[str, str | int | float] = {}
+    stage_fingerprints: dict[str, str] = {}
+    drilldown_rows: list[dict[str, str | int | float]] = []
+    drilldown_columns: list[str] = []
+    drilldown_total: int = 0
+    drilldown_page: int = 0
+    drilldown_sort: str = ""
+    drilldown_descending: bool = False
+    segment_representatives: list[dict[str, str | int | float]] = []
+
+    # Full-size datasets stay on the backend; only previews and chart series
+    # are synced to the browser. They live in the session dataset store
+    # (app/utils/session_store.py) under this key, which spills them to disk
+    # when the session idles or exceeds its memory budget. Frames follow the
+    # dtype policy in app/utils/dtypes.py.
+    _dataset_session: str = ""
+    _pca_model: dict[str, Any] = {}
+    _cleaning_params: dict[str, dict[str, float]] = {}
+    _wire_fingerprints: dict[str, str] = {}
+    # Values derived from the datasets above, reused until one is replaced.
+    _derived: DerivedCache = DerivedCache()
+
+    def _session_key(self) -> str:
+        """Key of this session's datasets in the session dataset store."""
+        if not self._dataset_session:
+            self._dataset_session = secrets.token_hex(8)
+        return self._dataset_session
+
+    def _set_if_changed(self, name: str, value: Any, digest: str):
+        """Assign a synced var only when its content changed, so no delta is sent."""
+        if self._wire_fingerprints.get(name) == digest:
+            return
+        self._wire_fingerprints[name] = digest
+        setattr(self, name, value)
+
+    @property
+    def warm_start_version(self) -> str:
+        """Saved model an incremental K-Means run starts from; "" for a cold start."""
+        if not self.incremental_mode:
+            return ""
+        return self.warm_start_model or self.model_version
+
+    def _stage_params(self) -> dict[str, Any]:
+        return {name: getattr(self, name) for name in STAGE_PARAMS}
+
+    def _record_stage(self, *stages: str):
+        """Record that `stages` just ran on their current inputs and parameters."""
+        recorded = dict(self.stage_fingerprints)
+        for stage in stages:
+            recorded[stage] = stage_fingerprint(stage, recorded, self._stage_params())
+        self.stage_fingerprints = recorded
+
+    def _forget_dropped_data(self) -> bool:
+        """Clear the stage records if the session store dropped this session's data.
+
+        The store drops sessions unused for SPILL_TTL_S, which leaves the
+        badges claiming stages whose outputs are gone. True when it did.
+        """
+        if not self.stage_fingerprints or has_session(self._session_key()):
+            return False
+        self.stage_fingerprints = {}
+        self._wire_fingerprints = {}
+        self._derived.clear()
+        self.current_stage = "Upload"
+        return True
+
+    def _no_data_toast(self, message: str):
+        """Error for a handler missing its input; a re-upload prompt if it was dropped."""
+        if self._forget_dropped_data():
+            return rx.toast.warning(DATA_DROPPED_MESSAGE)
+        return rx.toast.error(message)
+
+    @rx.event
+    def check_session_data(self):
+        """On page load, flag stages whose data the session store dropped."""
+        if self._forget_dropped_data():
+            return rx.toast.warning(DATA_DROPPED_MESSAGE)
+
+    def _stage_is_fresh(self, stage: str) -> bool:
+        return (
+            stage_status(self.stage_fingerprints, self._stage_params())[stage]
+            == "fresh"
+        )
 
     def set_num_clusters(self, value: str):
         """Set the number of clusters from string input."""
         try:
             self.num_clusters = int(value)
         except ValueError:
-            self.num_clusters = 4
+            pass
+
+    def set_categorical_encoding(self, value: str):
+        """Choose how categorical columns enter PCA: none, onehot or frequency."""
+        self.categorical_encoding = value
+
+    def set_k_min(self, value: str):
+        """Set the lower end of the k range scanned by the elbow method."""
+        try:
+            self.k_min = min(max(int(value), 2), self.k_max)
+        except ValueError:
+            pass
+
+    def set_k_max(self, value: str):
+        """Set the upper end of the k range scanned by the elbow method."""
+        try:
+            self.k_max = max(int(value), self.k_min)
+        except ValueError:
+            pass
+
+    def set_clustering_sample_size(self, value: str):
+        """Set the K-Means fitting sample size; 0 fits on every row."""
+        try:
+            self.clustering_sample_size = max(int(value), 0)
+        except ValueError:
+            self.clustering_sample_size = 0
+
+    def set_density_min_cluster_size(self, value: str):
+        """Set the smallest HDBSCAN segment; 0 uses 1% of the rows."""
+        try:
+            self.density_min_cluster_size = max(int(value), 0)
+        except ValueError:
+            self.density_min_cluster_size = 0
 
     @rx.event
     def reset_application(self):
         """Reset the entire application state to allow loading a new file."""
         # Reset all data
         self.raw_data = []
+        drop_session(self._session_key())
         self.raw_data_columns = []
-        self.cleaned_data = []
+        self.upload_row_counts = []
+        self.cleaned_data_preview = []
         self.cleaned_data_columns = []
-        self.pca_data = []
-        self.clustered_data = []
-        self.hierarchical_clustered_data = []
+        self.categorical_columns = []
+        self.pca_feature_names = []
+        self.pca_row_count = 0
+        self.num_clustered_rows = 0
+        self.clustering_preview_rows = 0
         self.dendrogram_data = {}
         self.profiles = []
         self.insights_data = []
@@ -92,30 +320,56 @@ class AppState(rx.State):
         }
         self.pca_results = {}
         self.pca_variance_data = []
-        self.pca_scatter_data = []
+        self.pca_scatter_data = {}
         self.pca_components_data = []
         self.elbow_data = []
+        self.k_recommendation = {}
         self.cluster_scatter_data = {}
         self.hierarchical_cluster_scatter_data = {}
         self.cluster_profiles = []
-        self.selected_cluster_filter = -1
+        self.selected_cluster_filter = ALL_SEGMENTS
+        self.drilldown_rows = []
+        self.drilldown_columns = []
+        self.drilldown_total = 0
+        self.drilldown_page = 0
+        self.drilldown_sort = ""
+        self.drilldown_descending = False
+        self.segment_representatives = []
         self.cluster_comparison_data = []
-        self.kmeans_labels = []
-        self.hierarchical_labels = []
+        self._pca_model = {}
+        self._cleaning_params = {}
+        self.model_version = ""
+        self.previous_model_version = ""
+        self.warm_start_model = ""
+        self.incremental_iterations = 0
+        self.segment_drift_data = []
+        self.sampling_report = {}
+        self.segmentation_method = "K-Means"
+        self.density_report = {}
+        self.stability_methods = []
+        self.stability_clusters = []
+        self.stability_progress = ""
+        self.stage_fingerprints = {}
+        self._wire_fingerprints = {}
+        self._derived.clear()
         
         # Reset stage and redirect to home
         self.current_stage = "Upload"
         yield rx.toast.success("Application reset successfully. You can now upload a new file.")
         yield rx.redirect("/")
 
-    @rx.var
+    @rx.var(cache=True, deps=["cluster_profiles"], auto_deps=False)
     def total_customers_in_profiles(self) -> int:
         return sum((p["size"] for p in self.cluster_profiles))
 
-    @rx.var
+    @rx.var(
+        cache=True,
+        deps=["cluster_profiles", "selected_cluster_filter"],
+        auto_deps=False,
+    )
     def filtered_cluster_profiles(self) -> list[dict[str, str | int | float]]:
         """Return cluster profiles based on the selected filter."""
-        if self.selected_cluster_filter == -1:
+        if self.selected_cluster_filter == ALL_SEGMENTS:
             return self.cluster_profiles
         return [
             p
@@ -123,63 +377,166 @@ class AppState(rx.State):
             if p["cluster_id"] == self.selected_cluster_filter
         ]
 
-    @rx.var
+    @rx.var(cache=True, deps=["stage_fingerprints", *STAGE_VARS], auto_deps=False)
+    def stage_badges(self) -> dict[str, str]:
+        """'fresh', 'stale' or 'missing' for every pipeline stage."""
+        return stage_status(self.stage_fingerprints, self._stage_params())
+
+    @rx.var(cache=True, deps=["stage_fingerprints", *STAGE_VARS], auto_deps=False)
+    def stale_stage_count(self) -> int:
+        return len(stale_stages(self.stage_fingerprints, self._stage_params()))
+
+    @rx.var(
+        cache=True,
+        deps=["segment_representatives", "selected_cluster_filter"],
+        auto_deps=False,
+    )
+    def selected_representatives(self) -> list[dict[str, str | int | float]]:
+        """Typical and borderline customers of the selected segment."""
+        return [
+            r
+            for r in self.segment_representatives
+            if r["cluster_id"] == self.selected_cluster_filter
+        ]
+
+    @rx.var(cache=True, deps=["segment_representatives"], auto_deps=False)
+    def representative_columns(self) -> list[str]:
+        if not self.segment_representatives:
+            return []
+        return [c for c in self.segment_representatives[0] if c != "cluster_id"]
+
+    @rx.var(cache=True, deps=["drilldown_total"], auto_deps=False)
+    def drilldown_page_count(self) -> int:
+        return max(1, -(-self.drilldown_total // DRILLDOWN_PAGE_SIZE))
+
+    @rx.var(cache=True, deps=["pca_feature_names"], auto_deps=False)
     def pca_components_columns(self) -> list[str]:
         """Return columns for the PCA components table."""
-        if not self.cleaned_data_columns:
-            return ["component"]
-        return ["component"] + self.cleaned_data_columns
+        return ["component"] + self.pca_feature_names
 
-    @rx.var
+    @property
     def raw_data_df(self) -> pd.DataFrame:
-        return pd.DataFrame(self.raw_data) if self.raw_data else pd.DataFrame()
+        """Backend-only frame of every uploaded row."""
+        return get_dataset(self._session_key(), "raw", pd.DataFrame())
+
+    @property
+    def cleaned_df(self) -> pd.DataFrame:
+        return get_dataset(self._session_key(), "cleaned", pd.DataFrame())
+
+    @property
+    def pca_df(self) -> pd.DataFrame:
+        return get_dataset(self._session_key(), "pca", pd.DataFrame())
+
+    @property
+    def kmeans_labels(self) -> np.ndarray:
+        return get_dataset(self._session_key(), "kmeans_labels", label_array([]))
+
+    @property
+    def hierarchical_labels(self) -> np.ndarray:
+        return get_dataset(self._session_key(), "hierarchical_labels", label_array([]))
+
+    @property
+    def density_labels(self) -> np.ndarray:
+        return get_dataset(self._session_key(), "density_labels", label_array([]))
 
-    @rx.var
+    @property
+    def segment_index(self) -> dict[str, np.ndarray]:
+        """Rows of each segment behind the profiles (see build_segment_index)."""
+        index = get_dataset(self._session_key(), "segment_index")
+        return index if index is not None else build_segment_index(label_array([]))
+
+    @property
+    def segment_labels(self) -> np.ndarray:
+        """Labels behind the profiles: the latest K-Means or HDBSCAN run."""
+        if self.segmentation_method == "HDBSCAN":
+            return self.density_labels
+        return self.kmeans_labels
+
+    @derived(
+        "pca", "kmeans_labels", "density_labels", params=("segmentation_method",)
+    )
+    def segment_centroids(self) -> np.ndarray:
+        """PCA-space centroids of the segments behind the profiles."""
+        return compute_centroids(self.pca_df, self.segment_labels)
+
+    @rx.var(cache=True, deps=["uploaded_files"], auto_deps=False)
     def uploaded_filename(self) -> str:
-        return self.uploaded_files[0] if self.uploaded_files else ""
+        return ", ".join(self.uploaded_files)
 
     @rx.event
+    @profiled("upload")
     async def handle_upload(self, files: list[rx.UploadFile]):
-        """Process uploaded CSV file."""
+        """Process uploaded CSV files, merging several regional extracts into one dataset."""
         self.is_uploading = True
         yield
         if not files:
             self.is_uploading = False
             yield rx.toast.error("No file selected.")
             return
-        file = files[0]
         try:
-            upload_data = await file.read()
-            df = pd.read_csv(io.BytesIO(upload_data))
+            uploads = [(file.name, await file.read()) for file in files]
+            source = source_fingerprint(uploads)
+            if (
+                source == self.stage_fingerprints.get("upload")
+                and not self.raw_data_df.empty
+            ):
+                yield rx.toast.info(
+                    "Same data as the current upload; every stage is kept."
+                )
+                return
+            names = [name for name, _ in uploads]
+            frames = await asyncio.to_thread(parse_uploads, uploads)
+            df, row_counts = merge_uploads(names, frames)
+            put_dataset(self._session_key(), "raw", compact_frame(df))
             self.raw_data = df.head(200).to_dict("records")
             self.raw_data_columns = df.columns.to_list()
-            self.uploaded_files = [file.name]
+            self.upload_row_counts = row_counts
+            self.uploaded_files = names
+            # Later stages are now stale; they re-run on demand, not here.
+            self.stage_fingerprints = {**self.stage_fingerprints, "upload": source}
             self.current_stage = "Uploaded"
+            if len(names) > 1:
+                yield rx.toast.success(
+                    f"Merged {len(names)} files into {len(df)} rows."
+                )
         except Exception as e:
             logging.exception(f"Error processing file: {e}")
             self.raw_data = []
+            put_dataset(self._session_key(), "raw", pd.DataFrame())
             self.raw_data_columns = []
+            self.upload_row_counts = []
             self.uploaded_files = []
+            self.stage_fingerprints = {}
             self.current_stage = "Upload"
             yield rx.toast.error(f"Error processing file: {e}")
         finally:
             self.is_uploading = False
 
     @rx.event
+    @profiled("cleaning")
     def run_cleaning(self):
         """Runs the data cleaning pipeline."""
-        if not self.raw_data:
-            yield rx.toast.error("No data to clean. Please upload a file first.")
+        if self.raw_data_df.empty:
+            yield self._no_data_toast("No data to clean. Please upload a file first.")
+            return
+        if self._stage_is_fresh("cleaning"):
+            yield rx.toast.info("Cleaned data is up to date.")
+            yield rx.redirect("/data-cleaning")
             return
         self.current_stage = "Cleaning..."
         yield
         try:
-            df = pd.DataFrame(self.raw_data)
-            cleaned_df, log, summary = clean_data(df)
-            self.cleaned_data = cleaned_df.to_dict("records")
+            cleaned_df, log, summary, params = clean_data(
+                self.raw_data_df, return_params=True
+            )
+            self._cleaning_params = params
+            put_dataset(self._session_key(), "cleaned", compact_frame(cleaned_df))
+            self.cleaned_data_preview = cleaned_df.head(100).to_dict("records")
             self.cleaned_data_columns = cleaned_df.columns.to_list()
+            self.categorical_columns = detect_categorical_columns(cleaned_df)
             self.cleaning_log = log
             self.cleaning_summary = summary
+            self._record_stage("cleaning")
             self.current_stage = "Cleaned"
             yield rx.toast.success("Data cleaning complete!")
             yield rx.redirect("/data-cleaning")
@@ -189,17 +546,40 @@ class AppState(rx.State):
             yield rx.toast.error(f"Cleaning failed: {e}")
 
     @rx.event
+    @profiled("pca")
     def run_pca(self):
         """Runs the PCA analysis on cleaned data."""
-        if not self.cleaned_data:
-            yield rx.toast.error("No cleaned data available for PCA.")
+        if self.cleaned_df.empty:
+            yield self._no_data_toast("No cleaned data available for PCA.")
+            return
+        if self._stage_is_fresh("pca"):
+            yield rx.toast.info("PCA results are up to date.")
+            yield rx.redirect("/pca-analysis")
             return
         self.current_stage = "PCA Analysis..."
         yield
         try:
-            df = pd.DataFrame(self.cleaned_data)
-            numeric_cols = df.select_dtypes(include=np.number).columns.tolist()
-            results = perform_pca(df)
+            df = self.cleaned_df
+            if self.categorical_encoding != "none" and self.categorical_columns:
+                results = perform_pca(
+                    df, self.categorical_columns, self.categorical_encoding
+                )
+            else:
+                results = perform_pca(df)
+            numeric_cols = results["feature_names"]
+            self.pca_feature_names = numeric_cols
+            self._pca_model = {
+                key: results[key]
+                for key in (
+                    "feature_names",
+                    "numeric_features",
+                    "encoding",
+                    "scaler_mean",
+                    "scaler_scale",
+                    "pca_mean",
+                    "components",
+                )
+            }
             self.pca_results = {
                 "explained_variance": results["explained_variance"].tolist(),
                 "cumulative_variance": results["cumulative_variance"].tolist(),
@@ -215,18 +595,24 @@ class AppState(rx.State):
                 results["pca_result"],
                 columns=[f"PC{i + 1}" for i in range(results["pca_result"].shape[1])],
             )
-            self.pca_scatter_data = pca_df[["PC1", "PC2"]].to_dict("records")
+            self._set_if_changed(
+                "pca_scatter_data",
+                columnar_series(pca_df, ["PC1", "PC2"]),
+                fingerprint(results["pca_result"][:, :2]),
+            )
             components_df = pd.DataFrame(
                 results["components"],
                 columns=numeric_cols,
                 index=[f"PC{i + 1}" for i in range(results["components"].shape[0])],
             )
-            self.pca_components_data = (
+            self.pca_components_data = round_records(
                 components_df.reset_index()
                 .rename(columns={"index": "component"})
                 .to_dict("records")
             )
-            self.pca_data = pca_df.to_dict("records")
+            put_dataset(self._session_key(), "pca", pca_df)
+            self.pca_row_count = len(pca_df)
+            self._record_stage("pca")
             self.current_stage = "PCA Complete"
             yield rx.toast.success("PCA analysis complete!")
             yield rx.redirect("/pca-analysis")
@@ -236,15 +622,24 @@ class AppState(rx.State):
             yield rx.toast.error(f"PCA failed: {e}")
 
     @rx.event
+    @profiled("elbow")
     def compute_elbow_method(self):
-        if not self.pca_data:
-            yield rx.toast.error("PCA data not available. Please run PCA first.")
+        if self.pca_df.empty:
+            yield self._no_data_toast("PCA data not available. Please run PCA first.")
+            return
+        if self._stage_is_fresh("elbow"):
+            yield rx.toast.info("Elbow data is up to date.")
             return
         self.current_stage = "Computing Elbow..."
         yield
         try:
-            pca_df = pd.DataFrame(self.pca_data)
-            self.elbow_data = compute_elbow_data(pca_df)
+            pca_df = self.pca_df
+            self.elbow_data = []
+            self.k_recommendation = {}
+            for row in iter_elbow_data(pca_df, self.k_min, self.k_max):
+                self.elbow_data = [*self.elbow_data, row]
+                yield
+            self._record_stage("elbow")
             self.current_stage = "PCA Complete"
             yield rx.toast.success("Elbow method data computed.")
         except Exception as e:
@@ -252,83 +647,290 @@ class AppState(rx.State):
             yield rx.toast.error(f"Failed to compute elbow data: {e}")
 
     @rx.event
+    @profiled("k_selection")
+    def recommend_num_clusters(self):
+        """Recommend k from the inertia knee, the gap statistic and the silhouette."""
+        if self.pca_df.empty:
+            yield self._no_data_toast("PCA data not available. Please run PCA first.")
+            return
+        if self.k_max - self.k_min < 2:
+            yield rx.toast.error("Choose a k range of at least three values.")
+            return
+        self.current_stage = "Recommending k..."
+        yield
+        try:
+            pca_df = self.pca_df
+            scanned = [int(row["k"]) for row in self.elbow_data]
+            if scanned != list(range(self.k_min, self.k_max + 1)):
+                self.elbow_data = []
+                for row in iter_elbow_data(pca_df, self.k_min, self.k_max):
+                    self.elbow_data = [*self.elbow_data, row]
+                    yield
+                self._record_stage("elbow")
+            recommendation = recommend_k(pca_df, self.elbow_data)
+            self.k_recommendation = {
+                key: value
+                for key, value in recommendation.items()
+                if key != "gap_data"
+            }
+            self.k_recommendation["confidence_pct"] = round(
+                recommendation["confidence"] * 100
+            )
+            self.num_clusters = recommendation["k"]
+            self.current_stage = "PCA Complete"
+            yield rx.toast.success(
+                f"Recommended k={recommendation['k']} "
+                f"(confidence {recommendation['confidence']:.0%})."
+            )
+        except Exception as e:
+            logging.exception(f"k recommendation failed: {e}")
+            self.current_stage = "PCA Complete"
+            yield rx.toast.error(f"Failed to recommend k: {e}")
+
+    @rx.event
+    @profiled("clustering")
     def run_clustering(self, k: int):
-        if not self.pca_data:
-            yield rx.toast.error("No PCA data available for clustering.")
+        if self.pca_df.empty:
+            yield self._no_data_toast("No PCA data available for clustering.")
             return
         self.num_clusters = int(k)
+        if self.segmentation_method == "K-Means" and self._stage_is_fresh("profiles"):
+            yield rx.toast.info(f"Clustering with k={k} is up to date.")
+            return
         self.current_stage = "Clustering..."
         yield
+        shown = (
+            self.cluster_scatter_data,
+            self._wire_fingerprints.get("cluster_scatter_data"),
+        )
         try:
-            pca_df = pd.DataFrame(self.pca_data)
-            original_df = pd.DataFrame(self.cleaned_data)
-            clusters = perform_clustering(pca_df, self.num_clusters)
-            clustered_df = pca_df.copy()
-            clustered_df["cluster"] = clusters
-            self.clustered_data = clustered_df.to_dict("records")
-            self.kmeans_labels = [int(c) for c in clusters.tolist() if hasattr(clusters, 'tolist')] if hasattr(clusters, 'tolist') else [int(x) for x in clusters]
-            scatter_data_by_cluster = {}
-            for i in range(self.num_clusters):
-                cluster_data = clustered_df[clustered_df["cluster"] == i]
-                scatter_data_by_cluster[i] = cluster_data.to_dict("records")
-            self.cluster_scatter_data = scatter_data_by_cluster
+            pca_df = self.pca_df
+            original_df = self.cleaned_df
+            if len(pca_df) > PREVIEW_SAMPLE_ROWS:
+                sample, sample_labels = preview_clustering(pca_df, self.num_clusters)
+                preview = pca_df.iloc[sample]
+                self._set_if_changed(
+                    "cluster_scatter_data",
+                    columnar_series_by_label(preview, sample_labels, ["PC1", "PC2"]),
+                    fingerprint(preview[["PC1", "PC2"]].to_numpy(), sample_labels),
+                )
+                self.clustering_preview_rows = len(sample)
+                yield
+            previous = self._previous_model() if self.incremental_mode else None
+            if previous is not None:
+                previous, previous_centroids = previous
+                result = perform_incremental_clustering(
+                    pca_df, self.num_clusters, previous_centroids
+                )
+                clusters = result["labels"]
+                self.previous_model_version = previous["version"]
+                self.incremental_iterations = result["n_iter"]
+                self.sampling_report = {}
+                self.segment_drift_data = segment_drift(
+                    previous_centroids,
+                    {int(p["cluster_id"]): int(p["size"]) for p in previous["profiles"]},
+                    result["centroids"],
+                    clusters,
+                )
+            else:
+                if 0 < self.clustering_sample_size < len(pca_df):
+                    result = perform_sampled_clustering(
+                        pca_df, self.num_clusters, self.clustering_sample_size
+                    )
+                    clusters = result["labels"]
+                    self.sampling_report = {
+                        "sample_size": result["sample_size"],
+                        "sample_inertia": round(result["sample_inertia"], 4),
+                        "full_inertia": round(result["full_inertia"], 4),
+                    }
+                else:
+                    clusters = perform_clustering(pca_df, self.num_clusters)
+                    self.sampling_report = {}
+                self.previous_model_version = ""
+                self.incremental_iterations = 0
+                self.segment_drift_data = []
+            put_dataset(self._session_key(), "kmeans_labels", label_array(clusters))
+            self.segmentation_method = "K-Means"
+            self.density_report = {}
+            self.stability_methods = []
+            self.stability_clusters = []
+            self.stability_progress = ""
+            self.num_clustered_rows = len(clusters)
+            self._set_if_changed(
+                "cluster_scatter_data",
+                columnar_series_by_label(pca_df, clusters, ["PC1", "PC2"]),
+                fingerprint(pca_df[["PC1", "PC2"]].to_numpy(), np.asarray(clusters)),
+            )
+            self.clustering_preview_rows = 0
             self.cluster_profiles = generate_cluster_profiles(original_df, clusters)
-            # Update comparison metrics if hierarchical labels exist
+            self._index_segments(clusters)
+            self._pick_representatives(pca_df, original_df, clusters)
             try:
-                if self.hierarchical_labels:
-                    km_sil = float(silhouette_score(pca_df, self.kmeans_labels))
-                    hc_sil = float(silhouette_score(pca_df, self.hierarchical_labels))
-                    ari = float(adjusted_rand_score(self.kmeans_labels, self.hierarchical_labels))
-                    self.cluster_comparison_data = [
-                        {"algorithm": "KMeans", "k": self.num_clusters, "silhouette": km_sil},
-                        {"algorithm": "Hierarchical", "k": self.num_clusters, "silhouette": hc_sil},
-                        {"metric": "Adjusted Rand Index", "value": ari},
-                    ]
-            except Exception:
-                pass
+                model = build_model(
+                    self._pca_model,
+                    self.segment_centroids,
+                    resolve_column_roles(original_df),
+                    self.cluster_profiles,
+                    self._cleaning_params,
+                )
+                self._pin_models()
+                self.model_version = save_model(model)
+                self._pin_models()
+            except OSError as e:
+                logging.exception(f"Could not save segmentation model: {e}")
+            # Recorded after the save: re-running from the model this run just
+            # saved reproduces it, so that is the warm start it is fresh for.
+            self._record_stage("clustering", "profiles")
+            self._update_comparison(pca_df)
             self.current_stage = "Clustered"
             yield rx.toast.success(f"Clustering complete with {k} clusters.")
             yield rx.redirect("/clustering")
         except Exception as e:
             logging.exception(f"Clustering failed: {e}")
             self.current_stage = "Clustering Failed"
+            if self.clustering_preview_rows:
+                # Put back the last full result instead of the sampled preview.
+                self.cluster_scatter_data, digest = shown
+                self._wire_fingerprints.pop("cluster_scatter_data", None)
+                if digest is not None:
+                    self._wire_fingerprints["cluster_scatter_data"] = digest
+                self.clustering_preview_rows = 0
             yield rx.toast.error(f"Clustering failed: {e}")
 
+    def _update_comparison(self, pca_df: pd.DataFrame):
+        """Compare every clustering of the current PCA data once two exist.
+
+        Noise rows are left out of the silhouette and kNN consistency, and
+        count as one more group in the Adjusted Rand Index.
+        """
+        try:
+            from sklearn.metrics import adjusted_rand_score
+
+            runs = [
+                (algorithm, dataset, labels)
+                for algorithm, dataset, labels in (
+                    ("KMeans", "kmeans_labels", self.kmeans_labels),
+                    ("Hierarchical", "hierarchical_labels", self.hierarchical_labels),
+                    ("HDBSCAN", "density_labels", self.density_labels),
+                )
+                if len(labels) == len(pca_df) > 0
+            ]
+            if len(runs) < 2:
+                return
+            rows = []
+            for algorithm, dataset, labels in runs:
+                # A run keeps its metrics until its labels or the PCA scores change.
+                rows.append(
+                    {
+                        **self._derived.get(
+                            f"comparison_{dataset}",
+                            dataset_key(self._session_key(), "pca", dataset),
+                            lambda: self._run_metrics(algorithm, pca_df, labels),
+                        )
+                    }
+                )
+            for i, (first, _, first_labels) in enumerate(runs):
+                for second, _, second_labels in runs[i + 1 :]:
+                    ari = adjusted_rand_score(first_labels, second_labels)
+                    rows.append(
+                        {
+                            "metric": f"Adjusted Rand Index ({first} vs {second})",
+                            "value": round(float(ari), 4),
+                        }
+                    )
+            self.cluster_comparison_data = rows
+        except Exception as e:
+            logging.exception(f"Could not compare clusterings: {e}")
+
+    def _run_metrics(
+        self, algorithm: str, pca_df: pd.DataFrame, labels: np.ndarray
+    ) -> dict[str, str | int | float]:
+        noise = labels == NOISE_LABEL
+        return {
+            "algorithm": algorithm,
+            "k": len(np.unique(labels[~noise])),
+            "silhouette": round(silhouette(pca_df, labels), 4),
+            "knn_consistency": round(knn_consistency(knn_graph(pca_df), labels), 4),
+            "noise_pct": round(float(noise.mean()) * 100, 2),
+        }
+
+    def _previous_model(self) -> tuple[dict, np.ndarray] | None:
+        """The model to warm-start from and its centroids in the current PCA space.
+
+        That is the model picked in the UI, else this session's last model.
+        None (a cold start) when there is neither, or when the model cannot
+        be loaded or does not share the current features.
+        """
+        version = self.warm_start_version
+        if not version:
+            return None
+        try:
+            model = load_model(version)
+            return model, project_centroids(model, self._pca_model)
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f"Cannot warm-start from model {version}: {e}")
+            return None
+
+    def _pin_models(self):
+        """Keep this session's model and warm-start source from being pruned.
+
+        The pins lapse with the session's spilled data unless renewed.
+        """
+        pin_models(
+            self._session_key(),
+            [self.model_version, self.warm_start_model],
+            ttl_s=SPILL_TTL_S,
+        )
+
+    @rx.event
+    def toggle_incremental_mode(self):
+        self.incremental_mode = not self.incremental_mode
+        if self.incremental_mode:
+            self.saved_model_versions = [
+                m["version"] for m in list_models() if m.get("version")
+            ]
+
     @rx.event
+    def set_warm_start_model(self, version: str):
+        """Pick a saved model to warm-start from; "" uses this session's last model."""
+        self.warm_start_model = version
+        try:
+            self._pin_models()
+        except OSError as e:
+            logging.exception(f"Could not pin model {version}: {e}")
+
+    @rx.event
+    @profiled("hierarchical")
     def run_hierarchical_clustering(self):
-        if not self.pca_data:
-            yield rx.toast.error("No PCA data available for clustering.")
+        if self.pca_df.empty:
+            yield self._no_data_toast("No PCA data available for clustering.")
+            return
+        if self._stage_is_fresh("hierarchical"):
+            yield rx.toast.info("Hierarchical clustering is up to date.")
             return
         self.current_stage = "Hierarchical Clustering..."
         yield
         try:
-            pca_df = pd.DataFrame(self.pca_data)
-            clusters = perform_hierarchical_clustering(pca_df, int(self.num_clusters))
-            clustered_df = pca_df.copy()
-            clustered_df["cluster"] = clusters
-            self.hierarchical_clustered_data = clustered_df.to_dict("records")
-            self.hierarchical_labels = [int(c) for c in clusters.tolist() if hasattr(clusters, 'tolist')] if hasattr(clusters, 'tolist') else [int(x) for x in clusters]
-            scatter_data_by_cluster = {}
-            for i in range(int(self.num_clusters)):
-                cluster_data = clustered_df[clustered_df["cluster"] == i]
-                scatter_data_by_cluster[i] = cluster_data.to_dict("records")
-            self.hierarchical_cluster_scatter_data = scatter_data_by_cluster
+            pca_df = self.pca_df
+            clusters = perform_hierarchical_clustering(
+                pca_df, int(self.num_clusters), knn_graph(pca_df)
+            )
+            put_dataset(
+                self._session_key(), "hierarchical_labels", label_array(clusters)
+            )
+            self.stability_methods = []
+            self.stability_clusters = []
+            self.stability_progress = ""
+            self._set_if_changed(
+                "hierarchical_cluster_scatter_data",
+                columnar_series_by_label(pca_df, clusters, ["PC1", "PC2"]),
+                fingerprint(pca_df[["PC1", "PC2"]].to_numpy(), np.asarray(clusters)),
+            )
             
             # Compute dendrogram data
             self.dendrogram_data = compute_dendrogram_data(pca_df)
-            # Compute comparison metrics if KMeans already run
-            try:
-                if self.kmeans_labels:
-                    km_sil = float(silhouette_score(pca_df, self.kmeans_labels))
-                    hc_sil = float(silhouette_score(pca_df, self.hierarchical_labels))
-                    ari = float(adjusted_rand_score(self.kmeans_labels, self.hierarchical_labels))
-                    self.cluster_comparison_data = [
-                        {"algorithm": "KMeans", "k": int(self.num_clusters), "silhouette": km_sil},
-                        {"algorithm": "Hierarchical", "k": int(self.num_clusters), "silhouette": hc_sil},
-                        {"metric": "Adjusted Rand Index", "value": ari},
-                    ]
-            except Exception:
-                pass
+            self._record_stage("hierarchical")
+            self._update_comparison(pca_df)
             self.current_stage = "Hierarchical Complete"
             yield rx.toast.success("Hierarchical clustering complete.")
             yield rx.redirect("/clustering")
@@ -337,6 +939,101 @@ class AppState(rx.State):
             self.current_stage = "Hierarchical Failed"
             yield rx.toast.error(f"Hierarchical clustering failed: {e}")
 
+    @rx.event
+    @profiled("density")
+    def run_density_clustering(self):
+        """Segment with HDBSCAN, which leaves customers in sparse regions as noise."""
+        if self.pca_df.empty:
+            yield self._no_data_toast("No PCA data available for clustering.")
+            return
+        if self.segmentation_method == "HDBSCAN" and self._stage_is_fresh("profiles"):
+            yield rx.toast.info("HDBSCAN segments are up to date.")
+            return
+        self.current_stage = "Density Clustering..."
+        yield
+        try:
+            pca_df = self.pca_df
+            result = perform_density_clustering(
+                pca_df,
+                self.density_min_cluster_size or None,
+                graph=knn_graph(pca_df),
+            )
+            clusters = result["labels"]
+            if result["n_clusters"] == 0:
+                self.current_stage = "Density Failed"
+                yield rx.toast.error(
+                    "HDBSCAN found no segments; try a smaller minimum cluster size."
+                )
+                return
+            put_dataset(self._session_key(), "density_labels", label_array(clusters))
+            self.segmentation_method = "HDBSCAN"
+            self.density_report = {
+                "n_clusters": result["n_clusters"],
+                "noise_pct": round(result["noise_fraction"] * 100, 2),
+                "min_cluster_size": result["min_cluster_size"],
+                "method": result["method"],
+            }
+            self.sampling_report = {}
+            self.segment_drift_data = []
+            self.num_clustered_rows = len(clusters)
+            self._set_if_changed(
+                "cluster_scatter_data",
+                columnar_series_by_label(pca_df, clusters, ["PC1", "PC2"]),
+                fingerprint(pca_df[["PC1", "PC2"]].to_numpy(), np.asarray(clusters)),
+            )
+            self.clustering_preview_rows = 0
+            self.cluster_profiles = generate_cluster_profiles(self.cleaned_df, clusters)
+            self._record_stage("density", "profiles")
+            self.selected_cluster_filter = ALL_SEGMENTS
+            self._index_segments(clusters)
+            self._pick_representatives(pca_df, self.cleaned_df, clusters)
+            self._update_comparison(pca_df)
+            self.current_stage = "Clustered"
+            yield rx.toast.success(f"HDBSCAN found {result['n_clusters']} segments.")
+            yield rx.redirect("/clustering")
+        except Exception as e:
+            logging.exception(f"Density clustering failed: {e}")
+            self.current_stage = "Density Failed"
+            yield rx.toast.error(f"Density clustering failed: {e}")
+
+    @rx.event
+    @profiled("stability")
+    def run_stability_analysis(self):
+        """Bootstrap both clusterings to check that the chosen k is stable."""
+        if not len(self.kmeans_labels):
+            yield self._no_data_toast("Run K-Means clustering before the stability analysis.")
+            return
+        self.current_stage = "Stability Analysis..."
+        self.stability_progress = "Starting worker processes..."
+        yield
+        try:
+            k = len(set(self.kmeans_labels))
+            # Hierarchical labels from a run with another k are not comparable.
+            hierarchical = (
+                self.hierarchical_labels
+                if len(set(self.hierarchical_labels)) == k
+                else None
+            )
+            summary = {}
+            for summary in iter_bootstrap_stability(
+                self.pca_df, k, self.kmeans_labels, hierarchical
+            ):
+                self.stability_methods = summary["methods"]
+                self.stability_clusters = summary["clusters"]
+                self.stability_progress = (
+                    f"{summary['runs']} of up to {summary['target_runs']} resamples"
+                )
+                yield
+            if summary.get("converged"):
+                self.stability_progress += " (converged early)"
+            self.current_stage = "Clustered"
+            yield rx.toast.success("Stability analysis complete.")
+        except Exception as e:
+            logging.exception(f"Stability analysis failed: {e}")
+            self.current_stage = "Clustered"
+            self.stability_progress = ""
+            yield rx.toast.error(f"Stability analysis failed: {e}")
+
     @rx.event
     def generate_profiles(self):
         """Generates data for comparison charts and navigates to the profiles page."""
@@ -349,17 +1046,106 @@ class AppState(rx.State):
     @rx.event
     def filter_by_cluster(self, cluster_id: int):
         self.selected_cluster_filter = int(cluster_id)
+        self.drilldown_page = 0
+        self._load_drilldown()
+
+    def _index_segments(self, clusters: np.ndarray):
+        """Index the rows of the segmentation behind the profiles for drill-down."""
+        put_dataset(self._session_key(), "segment_index", build_segment_index(clusters))
+        self.drilldown_page = 0
+        self._load_drilldown()
+
+    def _pick_representatives(
+        self, pca_df: pd.DataFrame, original_df: pd.DataFrame, clusters: np.ndarray
+    ):
+        """Keep each segment's most typical and most borderline customers."""
+        own, second = centroid_distances(
+            pca_df.to_numpy(), self.segment_centroids, clusters
+        )
+        self.segment_representatives = representative_customers(
+            original_df, self.segment_index, own, second
+        )
+
+    def _load_drilldown(self):
+        """Load the current page of the selected segment's customers."""
+        if self.selected_cluster_filter == ALL_SEGMENTS:
+            self.drilldown_rows = []
+            self.drilldown_total = 0
+            return
+        frame = self.cleaned_df
+        members = segment_members(self.segment_index, self.selected_cluster_filter)
+        positions = segment_page(
+            frame,
+            members,
+            self.drilldown_page,
+            DRILLDOWN_PAGE_SIZE,
+            self.drilldown_sort or None,
+            self.drilldown_descending,
+        )
+        page = frame.iloc[positions]
+        page.insert(0, "row", positions + 1)
+        self.drilldown_rows = page.to_dict("records")
+        self.drilldown_columns = page.columns.to_list()
+        self.drilldown_total = len(members)
 
     @rx.event
+    def set_drilldown_sort(self, column: str):
+        """Order the segment's customers by a column; "" keeps file order."""
+        self.drilldown_sort = column
+        self.drilldown_page = 0
+        self._load_drilldown()
+
+    @rx.event
+    def toggle_drilldown_order(self):
+        self.drilldown_descending = not self.drilldown_descending
+        self.drilldown_page = 0
+        self._load_drilldown()
+
+    @rx.event
+    def change_drilldown_page(self, step: int):
+        page = self.drilldown_page + int(step)
+        self.drilldown_page = min(max(page, 0), self.drilldown_page_count - 1)
+        self._load_drilldown()
+
+    @rx.event
+    def export_segment(self, fmt: str):
+        """Stream the customers of the selected segment as CSV or Parquet."""
+        cluster_id = self.selected_cluster_filter
+        if cluster_id == ALL_SEGMENTS:
+            return rx.toast.error("Select a segment to export its customers.")
+        if not len(segment_members(self.segment_index, cluster_id)):
+            return self._no_data_toast("This segment has no customers.")
+        name = "noise" if cluster_id == NOISE_LABEL else f"segment_{cluster_id}"
+        cleaned = self._stored_dataset("cleaned")
+        index = self._stored_dataset("segment_index")
+
+        def load():
+            return cleaned().iloc[segment_members(index(), cluster_id)], None
+
+        try:
+            return self._start_export(load, f"{name}_customers.{fmt}", fmt)
+        except (ImportError, ValueError) as e:
+            logging.exception(f"Error starting export: {e}")
+            return rx.toast.error(str(e))
+
+    @rx.event
+    @profiled("insights")
     def generate_insights(self):
         if not self.cluster_profiles:
             yield rx.toast.error("No cluster profiles available to generate insights.")
             return
+        if self._stage_is_fresh("insights"):
+            yield rx.redirect("/insights")
+            return
         self.current_stage = "Generating Insights..."
         yield
         try:
-            self.insights_data = generate_marketing_insights(self.cluster_profiles) # type: ignore
-            total_customers = sum((p["size"] for p in self.cluster_profiles))
+            # Noise is not a segment, so it gets no name or recommendations.
+            segments = [
+                p for p in self.cluster_profiles if p["cluster_id"] != NOISE_LABEL
+            ]
+            self.insights_data = generate_marketing_insights(segments) # type: ignore
+            total_customers = sum((p["size"] for p in segments))
             self.distribution_pie_data = [
                 {
                     "name": insight["segment_name"],
@@ -370,13 +1156,12 @@ class AppState(rx.State):
             ]
             self.kpi_summary = {
                 "total_customers": total_customers,
-                "num_segments": len(self.cluster_profiles),
+                "num_segments": len(segments),
                 "avg_segment_size": int(
-                    total_customers / len(self.cluster_profiles)
-                    if self.cluster_profiles
-                    else 0
+                    total_customers / len(segments) if segments else 0
                 ),
             }
+            self._record_stage("insights")
             self.current_stage = "Insights Generated"
             yield rx.toast.success("Marketing insights generated!")
             yield rx.redirect("/insights")
@@ -385,6 +1170,32 @@ class AppState(rx.State):
             self.current_stage = "Insights Failed"
             yield rx.toast.error(f"Failed to generate insights: {e}")
 
+    @rx.event
+    def recompute_stale_stages(self):
+        """Re-run only the stages whose inputs or parameters changed, in order.
+
+        Stages that never ran stay that way. Each handler's own events
+        (toasts, redirects) are dropped; progress shows in the stage badges.
+        """
+        if self._forget_dropped_data():
+            yield rx.toast.warning(DATA_DROPPED_MESSAGE)
+            return
+        failed = None
+        while stale := stale_stages(self.stage_fingerprints, self._stage_params()):
+            stage = stale[0]
+            if stage == "profiles":
+                stage = upstream(stage, self._stage_params())[0]
+            args = (self.num_clusters,) if stage == "clustering" else ()
+            for _ in getattr(self, STAGE_HANDLERS[stage])(*args):
+                yield
+            if stale_stages(self.stage_fingerprints, self._stage_params()) == stale:
+                failed = stage
+                break
+        if failed:
+            yield rx.toast.error(f"Could not recompute the {failed} stage.")
+        else:
+            yield rx.toast.success("Every stage is up to date.")
+
     @rx.event
     def download_cleaning_log(self):
         """Downloads the cleaning log as a CSV file."""
@@ -398,8 +1209,7 @@ class AppState(rx.State):
             return rx.toast.error("No cluster summary to download.")
         try:
             df = pd.DataFrame(self.cluster_profiles)
-            csv_string = df.to_csv(index=False)
-            return rx.download(data=csv_string, filename="cluster_summary.csv")
+            return self._start_export(lambda: (df, None), "cluster_summary.csv")
         except Exception as e:
             logging.exception(f"Error creating CSV for download: {e}")
             return rx.toast.error("Failed to prepare download.")
@@ -409,17 +1219,145 @@ class AppState(rx.State):
         if not self.insights_data:
             return rx.toast.error("No insights to download.")
         try:
-            df = pd.DataFrame(self.insights_data)
-            df["recommendations"] = df["recommendations"].apply(
-                lambda recs: " | ".join([r["text"] for r in recs])
-            )
-            df["kpis"] = df["kpis"].apply(
-                lambda kpis: " | ".join([f"{k['name']}: {k['value']}" for k in kpis])
-            )
-            csv_string = df.to_csv(index=False)
-            return rx.download(
-                data=csv_string, filename="marketing_insights_report.csv"
+            df = insights_to_frame(self.insights_data)
+            return self._start_export(
+                lambda: (df, None), "marketing_insights_report.csv"
             )
         except Exception as e:
             logging.exception(f"Error creating insights CSV: {e}")
-            return rx.toast.error("Failed to prepare insights report.")
\ No newline at end of file
+            return rx.toast.error("Failed to prepare insights report.")
+
+    def _stored_dataset(self, name: str):
+        """A reader of the stored dataset as it is now, for exports.
+
+        Raises LookupError once the dataset was replaced or dropped.
+        """
+        key = self._session_key()
+        version = dataset_version(key, name)
+
+        def read():
+            value = get_dataset(key, name)
+            if value is None or dataset_version(key, name) != version:
+                raise LookupError(f"The {name} data changed since the export.")
+            return value
+
+        return read
+
+    def _start_export(self, load: ExportLoader, filename: str, fmt: str = "csv"):
+        """Stage an export for the streaming endpoint and start the download."""
+        token = register_export(load, filename, fmt)
+        # The endpoint lives on the backend, which rx.download's "/" paths do not target.
+        url = rx.Var.create(f"{get_config().api_url}/api/export/{token}")
+        return rx.download(url=url, filename=filename)
+
+    @rx.event
+    def export_dataset(self, dataset: str, fmt: str):
+        """Stream the cleaned, PCA or clustered dataset as chunked CSV or Parquet."""
+        # The data is read again when the download starts, so none is held here.
+        labels, names = None, {}
+        if dataset == "cleaned":
+            empty = self.cleaned_df.empty
+            frame = self._stored_dataset("cleaned")
+        elif dataset == "pca":
+            empty = self.pca_df.empty
+            frame = self._stored_dataset("pca")
+        elif dataset == "clustered":
+            if not len(self.segment_labels):
+                return self._no_data_toast("Run clustering before exporting segments.")
+            empty = self.cleaned_df.empty
+            frame = self._stored_dataset("cleaned")
+            labels = self._stored_dataset(
+                "density_labels"
+                if self.segmentation_method == "HDBSCAN"
+                else "kmeans_labels"
+            )
+            names = {
+                int(i["cluster_id"]): i["segment_name"] for i in self.insights_data
+            }
+        else:
+            return rx.toast.error(f"Unknown dataset: {dataset}")
+        if empty:
+            return self._no_data_toast(f"No {dataset} data to export.")
+
+        def load():
+            if labels is None:
+                return frame(), None
+            clusters = np.asarray(labels())
+            extra_columns = {"cluster": clusters}
+            if names:
+                extra_columns["segment_name"] = (
+                    pd.Series(clusters).map(names).fillna("").to_numpy()
+                )
+            return frame(), extra_columns
+
+        try:
+            return self._start_export(load, f"{dataset}_customers.{fmt}", fmt)
+        except (ImportError, ValueError) as e:
+            logging.exception(f"Error starting export: {e}")
+            return rx.toast.error(str(e))
+
+    @rx.event
+    def toggle_profiling(self):
+        """Switch per-session profiling of the pipeline handlers on or off."""
+        self.profiling_enabled = not self.profiling_enabled
+
+    @rx.event
+    def refresh_memory_footprint(self):
+        """Report the dataset bytes held by this and every other session."""
+        footprint = store_footprint()
+        key = self._session_key()
+
+        def mb(n_bytes: int) -> float:
+            return round(n_bytes / 2**20, 2)
+
+        own = next(
+            (s for s in footprint["sessions"] if s["session"] == key),
+            {"memory_bytes": 0, "disk_bytes": 0, "datasets": []},
+        )
+        chart_bytes = sum(
+            series_bytes(getattr(self, name))
+            for name in (
+                "pca_scatter_data",
+                "cluster_scatter_data",
+                "hierarchical_cluster_scatter_data",
+            )
+        )
+        self.memory_footprint = {
+            "memory_mb": mb(own["memory_bytes"]),
+            "disk_mb": mb(own["disk_bytes"]),
+            "chart_mb": mb(chart_bytes),
+            "session_budget_mb": mb(footprint["session_budget_bytes"]),
+            "total_memory_mb": mb(footprint["memory_bytes"]),
+            "total_disk_mb": mb(footprint["disk_bytes"]),
+            "total_budget_mb": mb(footprint["total_budget_bytes"]),
+            "sessions": len(footprint["sessions"]),
+        }
+        self.memory_datasets = [
+            {"name": d["name"], "size_mb": mb(d["bytes"]), "location": d["location"]}
+            for d in own["datasets"]
+        ]
+        self.memory_sessions = [
+            {
+                "session": s["session"][:8]
+                + (" (this session)" if s["session"] == key else ""),
+                "memory_mb": mb(s["memory_bytes"]),
+                "disk_mb": mb(s["disk_bytes"]),
+                "idle_min": round(s["idle_s"] / 60, 1),
+            }
+            for s in sorted(
+                footprint["sessions"], key=lambda s: s["memory_bytes"], reverse=True
+            )
+        ]
+
+    @rx.event
+    def refresh_profile_captures(self):
+        self.profile_captures = list_captures()
+
+    @rx.event
+    def download_profile_capture(self, name: str, suffix: str):
+        """Downloads the pstats or collapsed-stack artifact of one capture."""
+        try:
+            return rx.download(data=read_capture(name, suffix), filename=f"{name}{suffix}")
+        except (OSError, ValueError) as e:
+            logging.exception(f"Error reading profile capture: {e}")
+            return rx.toast.error("Profile capture not found.")
@@ -1,11 +1,22 @@
 import pandas as pd
 import numpy as np
-from scipy import stats
 import datetime
 
 
-def clean_data(df: pd.DataFrame) -> tuple[pd.DataFrame, list[str], dict[str, int]]:
-    """4-step iterative process for cleaning bank customer data."""
+def clean_data(
+    df: pd.DataFrame, return_params: bool = False
+) -> (
+    tuple[pd.DataFrame, list[str], dict[str, int]]
+    | tuple[pd.DataFrame, list[str], dict[str, int], dict[str, dict[str, float]]]
+):
+    """4-step iterative process for cleaning bank customer data.
+
+    With `return_params=True` the per-column medians and ±3σ caps are also
+    returned, so the same treatment can be replayed on new data with
+    `apply_cleaning_params`.
+    """
+    from scipy import stats
+
     log = []
     now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     log.append(f"[{now}] Starting data cleaning process.")
@@ -18,22 +29,26 @@ def clean_data(df: pd.DataFrame) -> tuple[pd.DataFrame, list[str], dict[str, int
     )
     numeric_cols = df_clean.select_dtypes(include=np.number).columns.tolist()
     outliers_detected_total = 0
+    params = {"medians": {}, "lower_caps": {}, "upper_caps": {}}
     for col in numeric_cols:
+        median_val = df_clean[col].median()
+        params["medians"][col] = float(median_val)
         if missing_before[col] > 0:
-            median_val = df_clean[col].median()
-            df_clean[col].fillna(median_val, inplace=True)
+            df_clean[col] = df_clean[col].fillna(median_val)
             log.append(
                 f"TREAT: Filled {missing_before[col]} missing values in '{col}' with median ({median_val:.2f})."
             )
         z_scores = np.abs(stats.zscore(df_clean[col]))
         outliers_mask = z_scores > 3
         num_outliers = outliers_mask.sum()
+        mean = df_clean[col].mean()
+        std = df_clean[col].std()
+        upper_bound = mean + 3 * std
+        lower_bound = mean - 3 * std
+        params["lower_caps"][col] = float(lower_bound)
+        params["upper_caps"][col] = float(upper_bound)
         if num_outliers > 0:
             outliers_detected_total += num_outliers
-            mean = df_clean[col].mean()
-            std = df_clean[col].std()
-            upper_bound = mean + 3 * std
-            lower_bound = mean - 3 * std
             df_clean[col] = df_clean[col].clip(lower=lower_bound, upper=upper_bound)
             log.append(
                 f"TREAT: Capped {num_outliers} outliers in '{col}' at 3 standard deviations."
@@ -52,4 +67,22 @@ def clean_data(df: pd.DataFrame) -> tuple[pd.DataFrame, list[str], dict[str, int
         "outliers_detected": int(outliers_detected_total),
         "duplicates_removed": duplicates_removed,
     }
-    return (df_clean, log, summary)
\ No newline at end of file
+    if return_params:
+        return (df_clean, log, summary, params)
+    return (df_clean, log, summary)
+
+
+def apply_cleaning_params(
+    df: pd.DataFrame, params: dict[str, dict[str, float]]
+) -> pd.DataFrame:
+    """Fills missing values with the saved medians and clips to the saved caps."""
+    columns = [col for col in params["medians"] if col in df.columns]
+    if not columns:
+        return df
+    treated = df[columns].fillna(pd.Series(params["medians"])[columns])
+    treated = treated.clip(
+        lower=pd.Series(params["lower_caps"])[columns],
+        upper=pd.Series(params["upper_caps"])[columns],
+        axis=1,
+    )
+    return df.assign(**{col: treated[col] for col in columns})
\ No newline at end of file
@@ -1,20 +1,61 @@
+from __future__ import annotations
+
 import pandas as pd
 import numpy as np
-from sklearn.cluster import KMeans
-from sklearn.cluster import AgglomerativeClustering
-from sklearn.metrics import silhouette_score
-from scipy.cluster.hierarchy import dendrogram, linkage
-from typing import Any
-
-def perform_hierarchical_clustering(pca_df: pd.DataFrame, k: int) -> np.ndarray:
-    """Runs hierarchical clustering with a specified number of clusters."""
-    hierarchical = AgglomerativeClustering(n_clusters=int(k), linkage="ward")
+from typing import TYPE_CHECKING, Any, Iterator
+from app.utils.knn_graph import (
+    DEFAULT_NEIGHBORS,
+    KD_TREE_MAX_DIMS,
+    build_knn_graph,
+    connectivity,
+    knn_consistency,
+    knn_graph,
+)
+
+if TYPE_CHECKING:
+    from scipy import sparse
+
+# Ward on more rows than this is restricted to kNN-graph neighbours.
+STRUCTURED_WARD_MIN_ROWS = 5_000
+# The silhouette is quadratic in rows, so larger data is scored on a sample.
+SILHOUETTE_MAX_ROWS = 20_000
+# Label of rows that density clustering leaves outside every segment.
+NOISE_LABEL = -1
+# Exact HDBSCAN builds its spanning tree in quadratic time; above this many
+# rows the tree is built over the kNN graph instead.
+EXACT_DENSITY_MAX_ROWS = 20_000
+DEFAULT_MIN_SAMPLES = 10
+# Typical and borderline customers kept per segment.
+DEFAULT_REPRESENTATIVES = 5
+
+
+def perform_hierarchical_clustering(
+    pca_df: pd.DataFrame, k: int, graph: sparse.csr_matrix | None = None
+) -> np.ndarray:
+    """Runs hierarchical clustering with a specified number of clusters.
+
+    Above STRUCTURED_WARD_MIN_ROWS rows, Ward only merges clusters that
+    are linked in the kNN graph (`graph`, or one built for the call), which
+    keeps memory linear instead of quadratic in the number of rows.
+    """
+    from sklearn.cluster import AgglomerativeClustering
+
+    structure = None
+    if len(pca_df) > STRUCTURED_WARD_MIN_ROWS:
+        if graph is None:
+            graph = build_knn_graph(pca_df.to_numpy())
+        structure = connectivity(graph)
+    hierarchical = AgglomerativeClustering(
+        n_clusters=int(k), linkage="ward", connectivity=structure
+    )
     clusters = hierarchical.fit_predict(pca_df)
     return clusters
 
 
 def compute_dendrogram_data(pca_df: pd.DataFrame) -> dict:
     """Computes linkage matrix and dendrogram data for hierarchical clustering."""
+    from scipy.cluster.hierarchy import dendrogram, linkage
+
     # Use a sample of data for dendrogram to avoid performance issues
     sample_size = min(50, len(pca_df))  # Reduced for better visualization
     if len(pca_df) > sample_size:
@@ -70,28 +111,470 @@ def create_tree_structure(linkage_matrix, n_leaves):
     return tree
 
 
-def compute_elbow_data(pca_df: pd.DataFrame) -> list[dict[str, str | int | float]]:
-    """Calculates inertia and silhouette scores for k=2 to k=10."""
-    elbow_data = []
-    K_range = range(2, 11)
+def _bridge_components(
+    graph: sparse.csr_matrix, points: np.ndarray
+) -> sparse.csr_matrix:
+    """Joins the connected components of a symmetric kNN graph.
+
+    One member of each component is linked to the others along a spanning
+    tree of their true distances. Those links are longer than any kNN edge,
+    so they only add the top merges of the hierarchy.
+    """
+    from scipy import sparse
+    from scipy.sparse import csgraph
+    from scipy.spatial.distance import cdist
+
+    n_components, component = csgraph.connected_components(graph, directed=False)
+    if n_components == 1:
+        return graph
+    members = np.unique(component, return_index=True)[1]
+    tree = csgraph.minimum_spanning_tree(cdist(points[members], points[members]))
+    rows, cols = tree.nonzero()
+    bridges = sparse.csr_matrix(
+        (np.asarray(tree[rows, cols]).ravel(), (members[rows], members[cols])),
+        shape=graph.shape,
+        dtype=graph.dtype,
+    )
+    return graph.maximum(bridges).maximum(bridges.T).tocsr()
+
+
+def perform_density_clustering(
+    pca_df: pd.DataFrame,
+    min_cluster_size: int | None = None,
+    min_samples: int = DEFAULT_MIN_SAMPLES,
+    graph: sparse.csr_matrix | None = None,
+) -> dict:
+    """Runs HDBSCAN; rows in no dense region get NOISE_LABEL.
+
+    Core distances come from a KD-tree (a ball tree in high dimensions)
+    queried on every core. Up to EXACT_DENSITY_MAX_ROWS rows the spanning
+    tree is exact. Above that, it is built over the mutual reachability
+    of the kNN graph (`graph`, or one built for the call), which keeps the
+    run near O(n log n) and only approximates merges between points that
+    are not neighbours of each other. `min_cluster_size` defaults to 1% of
+    the rows, and at least 15.
+    """
+    from sklearn.cluster import HDBSCAN
+
+    points = pca_df.to_numpy(dtype=np.float64)
+    n_rows, dims = points.shape
+    min_cluster_size = int(min_cluster_size or max(15, n_rows // 100))
+    min_samples = max(2, min(int(min_samples), n_rows - 1))
+    if n_rows <= EXACT_DENSITY_MAX_ROWS:
+        method = "exact"
+        model = HDBSCAN(
+            min_cluster_size=min_cluster_size,
+            min_samples=min_samples,
+            algorithm="kd_tree" if dims <= KD_TREE_MAX_DIMS else "ball_tree",
+            n_jobs=-1,
+            copy=False,
+        ).fit(points)
+    else:
+        method = "knn_graph"
+        if graph is None or graph.indptr[1] < min_samples - 1:
+            graph = build_knn_graph(points, max(DEFAULT_NEIGHBORS, min_samples))
+        # HDBSCAN counts the point itself in min_samples; the graph does not.
+        distances = _bridge_components(graph.maximum(graph.T).tocsr(), points)
+        model = HDBSCAN(
+            min_cluster_size=min_cluster_size,
+            min_samples=min_samples - 1,
+            metric="precomputed",
+            copy=False,
+        ).fit(distances)
+    # HDBSCAN marks rows with infinite or missing distances apart; all are noise.
+    labels = np.where(model.labels_ < 0, NOISE_LABEL, model.labels_)
+    noise = labels == NOISE_LABEL
+    return {
+        "labels": labels,
+        "probabilities": model.probabilities_,
+        "n_clusters": int(labels.max()) + 1,
+        "noise_fraction": float(noise.mean()) if n_rows else 0.0,
+        "min_cluster_size": min_cluster_size,
+        "method": method,
+    }
+
+
+def silhouette(
+    pca_df: pd.DataFrame, labels: np.ndarray, random_state: int = 42
+) -> float:
+    """Silhouette score, estimated on SILHOUETTE_MAX_ROWS rows for larger data.
+
+    Noise rows are left out; with fewer than two segments the score is 0.
+    """
+    from sklearn.metrics import silhouette_score
+
+    labels = np.asarray(labels)
+    clustered = labels != NOISE_LABEL
+    if len(np.unique(labels[clustered])) < 2:
+        return 0.0
+    if not clustered.all():
+        pca_df, labels = pca_df[clustered], labels[clustered]
+    sample_size = SILHOUETTE_MAX_ROWS if len(pca_df) > SILHOUETTE_MAX_ROWS else None
+    return float(
+        silhouette_score(
+            pca_df, labels, sample_size=sample_size, random_state=random_state
+        )
+    )
+
+
+def iter_elbow_data(
+    pca_df: pd.DataFrame, k_min: int = 2, k_max: int = 10
+) -> Iterator[dict[str, str | int | float]]:
+    """Yields inertia, silhouette and kNN consistency for each k once it is fitted."""
+    from sklearn.cluster import KMeans
+
+    graph = knn_graph(pca_df)
+    K_range = range(k_min, k_max + 1)
     for k in K_range:
         kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
         kmeans.fit(pca_df)
         inertia = kmeans.inertia_
-        silhouette = silhouette_score(pca_df, kmeans.labels_)
-        elbow_data.append(
-            {"k": k, "inertia": float(inertia), "silhouette": float(silhouette)}
-        )
-    return elbow_data
+        yield {
+            "k": k,
+            "inertia": float(inertia),
+            "silhouette": silhouette(pca_df, kmeans.labels_),
+            "knn_consistency": knn_consistency(graph, kmeans.labels_),
+        }
+
+
+def compute_elbow_data(
+    pca_df: pd.DataFrame, k_min: int = 2, k_max: int = 10
+) -> list[dict[str, str | int | float]]:
+    """Calculates inertia, silhouette and kNN consistency for k=k_min to k=k_max (2 to 10 by default)."""
+    return list(iter_elbow_data(pca_df, k_min, k_max))
+
+
+ASSIGN_CHUNK_ROWS = 250_000
+DEFAULT_SAMPLE_STRATA = 10
+# Larger data gets a sampled preview before the full clustering result.
+PREVIEW_SAMPLE_ROWS = 10_000
+
+
+def nearest_centroid(
+    points: np.ndarray,
+    centroids: np.ndarray,
+    chunk_rows: int = ASSIGN_CHUNK_ROWS,
+    return_distances: bool = False,
+) -> np.ndarray | tuple[np.ndarray, np.ndarray]:
+    """Assigns each point to its closest centroid in bounded-memory chunks.
+
+    Uses ||x||^2 - 2 x.c + ||c||^2, where the ||x||^2 term is constant per
+    row and only needed when squared distances are requested.
+    """
+    # NaN centroids mark ids with no members; they can never be the nearest.
+    centroid_norms = np.where(
+        np.isnan(centroids).any(axis=1), np.inf, (centroids**2).sum(axis=1)
+    )
+    centroids = np.nan_to_num(centroids)
+    labels = np.empty(len(points), dtype=np.int32)
+    distances = np.empty(len(points)) if return_distances else None
+    for start in range(0, len(points), chunk_rows):
+        block = points[start : start + chunk_rows]
+        scores = centroid_norms - 2.0 * block @ centroids.T
+        block_labels = np.argmin(scores, axis=1)
+        labels[start : start + chunk_rows] = block_labels
+        if return_distances:
+            nearest = scores[np.arange(len(block)), block_labels]
+            distances[start : start + chunk_rows] = np.maximum(
+                nearest + (block**2).sum(axis=1), 0.0
+            )
+    if return_distances:
+        return labels, distances
+    return labels
+
+
+def centroid_distances(
+    points: np.ndarray,
+    centroids: np.ndarray,
+    labels: np.ndarray,
+    chunk_rows: int = ASSIGN_CHUNK_ROWS,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Distance of each row to its own centroid and to the nearest other centroid.
+
+    Runs in bounded-memory chunks like nearest_centroid. Noise rows have no
+    own centroid (inf); their second distance is to the nearest centroid.
+    """
+    centroid_norms = np.where(
+        np.isnan(centroids).any(axis=1), np.inf, (centroids**2).sum(axis=1)
+    )
+    centroids = np.nan_to_num(centroids)
+    labels = np.asarray(labels)
+    own = np.full(len(points), np.inf)
+    second = np.full(len(points), np.inf)
+    for start in range(0, len(points), chunk_rows):
+        block = np.asarray(points[start : start + chunk_rows], dtype=np.float64)
+        block_labels = labels[start : start + chunk_rows]
+        scores = centroid_norms - 2.0 * block @ centroids.T
+        scores += (block**2).sum(axis=1)[:, None]
+        rows = np.flatnonzero(block_labels != NOISE_LABEL)
+        own[start + rows] = scores[rows, block_labels[rows]]
+        scores[rows, block_labels[rows]] = np.inf
+        second[start : start + len(block)] = scores.min(axis=1)
+    return np.sqrt(np.maximum(own, 0.0)), np.sqrt(np.maximum(second, 0.0))
+
+
+def representative_customers(
+    frame: pd.DataFrame,
+    index: dict[str, np.ndarray],
+    own: np.ndarray,
+    second: np.ndarray,
+    n: int = DEFAULT_REPRESENTATIVES,
+) -> list[dict[str, str | int | float]]:
+    """The n most typical and n most borderline customers of every segment.
+
+    Typical customers are closest to their own centroid. Borderline ones
+    have the highest ambiguity, own / second-nearest centroid distance,
+    where 1.0 means halfway between two segments. `index` comes from
+    build_segment_index; each segment is scanned once with argpartition,
+    so the cost is linear in the number of rows. Customer columns that
+    share a name with a computed field are prefixed with "customer_".
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ambiguity = np.where(np.isfinite(second), own / second, 0.0)
+    records = []
+    for i, cluster_id in enumerate(index["cluster_ids"]):
+        if cluster_id == NOISE_LABEL:
+            continue
+        members = index["rows"][index["offsets"][i] : index["offsets"][i + 1]]
+        m = min(n, len(members))
+        for kind, keys in (
+            ("typical", own[members]),
+            ("borderline", -ambiguity[members]),
+        ):
+            picks = np.argpartition(keys, m - 1)[:m]
+            picks = members[picks[np.argsort(keys[picks], kind="stable")]]
+            for row, customer in zip(picks, frame.iloc[picks].to_dict("records")):
+                record = {
+                    "cluster_id": int(cluster_id),
+                    "kind": kind,
+                    "row": int(row) + 1,
+                    "distance": round(float(own[row]), 4),
+                    "ambiguity": round(float(ambiguity[row]), 4),
+                }
+                # A customer column named like a computed field must not replace it.
+                for column, value in customer.items():
+                    record[f"customer_{column}" if column in record else column] = value
+                records.append(record)
+    return records
+
+
+def stratified_sample(
+    pca_df: pd.DataFrame,
+    sample_size: int,
+    strata: int = DEFAULT_SAMPLE_STRATA,
+    random_state: int = 42,
+) -> np.ndarray:
+    """Draws row positions proportionally from quantile bins of PC1.
+
+    Binning on the leading component keeps small but distinct groups at
+    either end of the main axis of variation represented in the sample.
+    """
+    n_rows = len(pca_df)
+    if sample_size >= n_rows:
+        return np.arange(n_rows)
+    rng = np.random.default_rng(random_state)
+    bins = pd.qcut(
+        pca_df.iloc[:, 0].to_numpy(), q=strata, labels=False, duplicates="drop"
+    )
+    order = np.argsort(bins, kind="stable")
+    _, starts, counts = np.unique(bins[order], return_index=True, return_counts=True)
+    quotas = np.floor(counts * sample_size / n_rows).astype(int)
+    # Hand the rounding remainder to the largest bins.
+    quotas[np.argsort(-counts)[: sample_size - quotas.sum()]] += 1
+    picks = [
+        rng.choice(order[start : start + count], size=quota, replace=False)
+        for start, count, quota in zip(starts, counts, quotas)
+    ]
+    return np.sort(np.concatenate(picks))
+
+
+def perform_sampled_clustering(
+    pca_df: pd.DataFrame,
+    k: int,
+    sample_size: int,
+    strata: int = DEFAULT_SAMPLE_STRATA,
+    chunk_rows: int = ASSIGN_CHUNK_ROWS,
+) -> dict:
+    """Fits K-Means on a stratified sample and assigns every row to its centroids.
+
+    Reports the mean squared distance to the assigned centroid on the
+    sample and on the full data; a full-data value close to the sample's
+    means the sample was representative.
+    """
+    from sklearn.cluster import KMeans
+
+    points = pca_df.to_numpy(dtype=np.float64)
+    sample = stratified_sample(pca_df, sample_size, strata)
+    kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
+    kmeans.fit(points[sample])
+    labels, distances = nearest_centroid(
+        points, kmeans.cluster_centers_, chunk_rows, return_distances=True
+    )
+    return {
+        "labels": labels,
+        "centroids": kmeans.cluster_centers_,
+        "sample_size": int(len(sample)),
+        "sample_inertia": float(kmeans.inertia_ / len(sample)),
+        "full_inertia": float(distances.mean()),
+    }
+
+
+def preview_clustering(
+    pca_df: pd.DataFrame, k: int, sample_size: int = PREVIEW_SAMPLE_ROWS
+) -> tuple[np.ndarray, np.ndarray]:
+    """Quick K-Means on a stratified sample, for a first look at the segments.
+
+    Returns the sampled row positions and their labels. A single
+    initialisation is used, so the final run's segments may differ slightly.
+    """
+    from sklearn.cluster import KMeans
+
+    sample = stratified_sample(pca_df, sample_size)
+    kmeans = KMeans(n_clusters=k, random_state=42, n_init=1)
+    return sample, kmeans.fit_predict(pca_df.to_numpy()[sample])
 
 
 def perform_clustering(pca_df: pd.DataFrame, k: int) -> np.ndarray:
     """Runs K-Means clustering with a specified number of clusters."""
+    from sklearn.cluster import KMeans
+
     kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
     clusters = kmeans.fit_predict(pca_df)
     return clusters
 
 
+def align_labels(
+    previous_centroids: np.ndarray, centroids: np.ndarray
+) -> np.ndarray:
+    """Maps new cluster ids onto previous ids by matching centroids (Hungarian).
+
+    Returns `mapping` with `mapping[new_id] = aligned_id`. Previous
+    centroids that are NaN (empty segments) are never matched, and new
+    clusters without a partner get fresh ids after the previous ones.
+    """
+    from scipy.optimize import linear_sum_assignment
+    from scipy.spatial.distance import cdist
+
+    valid = np.flatnonzero(~np.isnan(previous_centroids).any(axis=1))
+    rows, cols = linear_sum_assignment(cdist(centroids, previous_centroids[valid]))
+    mapping = np.full(len(centroids), -1)
+    mapping[rows] = valid[cols]
+    unmatched = np.flatnonzero(mapping == -1)
+    mapping[unmatched] = len(previous_centroids) + np.arange(len(unmatched))
+    return mapping
+
+
+def perform_incremental_clustering(
+    pca_df: pd.DataFrame, k: int, previous_centroids: np.ndarray
+) -> dict:
+    """Re-segments refreshed data starting from the previous run's centroids.
+
+    With an unchanged k, KMeans is warm-started from the previous centroids
+    with a single init. Labels are then aligned to the previous ids so
+    segment colours and names stay stable between runs.
+    """
+    from sklearn.cluster import KMeans
+
+    valid = previous_centroids[~np.isnan(previous_centroids).any(axis=1)]
+    if len(valid) == k:
+        kmeans = KMeans(n_clusters=k, init=valid, n_init=1)
+    else:
+        kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
+    raw_labels = kmeans.fit_predict(pca_df)
+    mapping = align_labels(previous_centroids, kmeans.cluster_centers_)
+    labels = mapping[raw_labels]
+    centers = kmeans.cluster_centers_
+    centroids = np.full((int(mapping.max()) + 1, centers.shape[1]), np.nan)
+    centroids[mapping] = centers
+    return {
+        "labels": labels,
+        "centroids": centroids,
+        "n_iter": int(kmeans.n_iter_),
+        "warm_started": len(valid) == k,
+    }
+
+
+def segment_drift(
+    previous_centroids: np.ndarray,
+    previous_sizes: dict[int, int],
+    centroids: np.ndarray,
+    labels: np.ndarray,
+) -> list[dict[str, str | int | float]]:
+    """Reports per-segment size and centroid movement between two aligned runs."""
+    sizes = np.bincount(labels, minlength=len(centroids))
+    previous_total = max(sum(previous_sizes.values()), 1)
+    drift = []
+    for cluster_id in range(max(len(centroids), len(previous_centroids))):
+        new_size = int(sizes[cluster_id]) if cluster_id < len(sizes) else 0
+        old_size = int(previous_sizes.get(cluster_id, 0))
+        if new_size == 0 and old_size == 0:
+            continue
+        shift = float("nan")
+        if cluster_id < len(centroids) and cluster_id < len(previous_centroids):
+            shift = float(
+                np.linalg.norm(centroids[cluster_id] - previous_centroids[cluster_id])
+            )
+        drift.append(
+            {
+                "cluster_id": cluster_id,
+                "previous_size": old_size,
+                "size": new_size,
+                "previous_share": round(old_size / previous_total * 100, 2),
+                "share": round(new_size / max(len(labels), 1) * 100, 2),
+                "centroid_shift": round(shift, 4) if not np.isnan(shift) else -1.0,
+                "status": "new"
+                if old_size == 0
+                else ("retired" if new_size == 0 else "matched"),
+            }
+        )
+    return drift
+
+
+def compute_centroids(pca_df: pd.DataFrame, clusters: np.ndarray) -> np.ndarray:
+    """Computes the mean PCA coordinates of every cluster in one vectorized pass.
+
+    Noise rows belong to no cluster and are left out.
+    """
+    values = np.asarray(pca_df, dtype=np.float64)
+    labels = np.asarray(clusters)
+    if (labels == NOISE_LABEL).any():
+        values, labels = values[labels != NOISE_LABEL], labels[labels != NOISE_LABEL]
+    k = int(labels.max()) + 1 if len(labels) else 0
+    sums = np.zeros((k, values.shape[1]))
+    np.add.at(sums, labels, values)
+    counts = np.bincount(labels, minlength=k)[:, None]
+    # Ids with no members (possible after label alignment) get NaN centroids.
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+COLUMN_MAPPINGS = {
+    "income": ["Monthly Income (€)", "Monthly Income", "Income", "monthly_income"],
+    "savings": [
+        "Savings Amount (€)",
+        "Savings Amount",
+        "Savings",
+        "savings_amount",
+    ],
+    "credit": ["Credit Balance (€)", "Credit Balance", "Credit", "credit_balance"],
+    "spending": [
+        "Monthly Card Spending (€)",
+        "Monthly Card Spending",
+        "Card Spending",
+        "Spending",
+        "monthly_card_spending",
+    ],
+    "age": ["Age", "age"],
+    "seniority": [
+        "Bank Seniority (years)",
+        "Bank Seniority",
+        "Seniority",
+        "bank_seniority",
+        "Years",
+    ],
+}
+
+
 def find_column(df: pd.DataFrame, variations: list[str]) -> str:
     """Find the first matching column name from a list of variations with robust, multi-level matching."""
     import re
@@ -114,57 +597,45 @@ def find_column(df: pd.DataFrame, variations: list[str]) -> str:
     )
 
 
+def resolve_column_roles(df: pd.DataFrame) -> dict[str, str]:
+    """Maps each profiled role (income, savings, ...) to its column in `df`."""
+    try:
+        return {
+            role: find_column(df, variations)
+            for role, variations in COLUMN_MAPPINGS.items()
+        }
+    except (KeyError, ValueError) as e:
+        import logging
+
+        logging.exception(f"Column not found during profiling setup. Details: {e}")
+        raise ValueError(
+            f"A required column for profiling is missing. Please check your CSV. Details: {e}"
+        )
+
+
 def generate_cluster_profiles(
     original_df: pd.DataFrame, clusters: np.ndarray
 ) -> list[dict[str, str | int | float]]:
-    """Computes mean statistics for each cluster using flexible column matching."""
+    """Computes mean statistics for each cluster using flexible column matching.
+
+    Noise rows (NOISE_LABEL) get their own profile, listed last.
+    """
     profiled_df = original_df.copy()
     if len(profiled_df) != len(clusters):
         raise ValueError(
             f"Shape mismatch: The original data has {len(profiled_df)} rows, but the clustering result has {len(clusters)} entries."
         )
     profiled_df["cluster"] = clusters
-    column_mappings = {
-        "income": ["Monthly Income (€)", "Monthly Income", "Income", "monthly_income" ],
-        "savings": [
-            "Savings Amount (€)",
-            "Savings Amount",
-            "Savings",
-            "savings_amount",
-        ],
-        "credit": ["Credit Balance (€)", "Credit Balance", "Credit", "credit_balance"],
-        "spending": [
-            "Monthly Card Spending (€)",
-            "Monthly Card Spending",
-            "Card Spending",
-            "Spending",
-            "monthly_card_spending",
-        ],
-        "age": ["Age", "age"],
-        "seniority": [
-            "Bank Seniority (years)",
-            "Bank Seniority",
-            "Seniority",
-            "bank_seniority",
-            "Years",
-        ],
-    }
-    try:
-        income_col = find_column(profiled_df, column_mappings["income"])
-        savings_col = find_column(profiled_df, column_mappings["savings"])
-        credit_col = find_column(profiled_df, column_mappings["credit"])
-        spending_col = find_column(profiled_df, column_mappings["spending"])
-        age_col = find_column(profiled_df, column_mappings["age"])
-        seniority_col = find_column(profiled_df, column_mappings["seniority"])
-    except (KeyError, ValueError) as e:
-        import logging
-
-        logging.exception(f"Column not found during profiling setup. Details: {e}")
-        raise ValueError(
-            f"A required column for profiling is missing. Please check your CSV. Details: {e}"
-        )
+    roles = resolve_column_roles(profiled_df)
+    income_col = roles["income"]
+    savings_col = roles["savings"]
+    credit_col = roles["credit"]
+    spending_col = roles["spending"]
+    age_col = roles["age"]
+    seniority_col = roles["seniority"]
     profile_data = []
-    for cluster_id in sorted(np.unique(clusters)):
+    cluster_ids = sorted(np.unique(clusters), key=lambda c: (c == NOISE_LABEL, c))
+    for cluster_id in cluster_ids:
         cluster_subset = profiled_df[profiled_df["cluster"] == cluster_id]
         profile = {
             "cluster_id": int(cluster_id),
@@ -0,0 +1,61 @@
+import functools
+from typing import Any, Callable
+from app.utils.session_store import dataset_version
+
+
+class DerivedCache:
+    """Memoizes values derived from session datasets and state vars.
+
+    An entry is reused while its key is unchanged. Keys hold dataset
+    versions from the session store rather than the datasets themselves, so
+    a cached entry never keeps a spilled frame in memory. The cache is
+    dropped when the state is pickled.
+    """
+
+    def __init__(self):
+        self._entries: dict[str, tuple[tuple, Any]] = {}
+
+    def get(self, name: str, key: tuple, compute: Callable[[], Any]) -> Any:
+        entry = self._entries.get(name)
+        if entry is not None and entry[0] == key:
+            return entry[1]
+        value = compute()
+        self._entries[name] = (key, value)
+        return value
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __getstate__(self) -> dict:
+        return {"_entries": {}}
+
+    def __deepcopy__(self, memo: dict) -> "DerivedCache":
+        return DerivedCache()
+
+
+def dataset_key(session_id: str, *datasets: str) -> tuple[int, ...]:
+    """Versions of a session's datasets, for use in a DerivedCache key."""
+    return tuple(dataset_version(session_id, name) for name in datasets)
+
+
+def derived(
+    *datasets: str, params: tuple[str, ...] = ()
+) -> Callable[[Callable], property]:
+    """Turns a state method into a read-only property memoized on its inputs.
+
+    `datasets` name entries of the session dataset store and `params` name
+    state vars. The state must own a `_derived` DerivedCache. Callers must
+    not mutate the returned value in place, because it is shared between calls.
+    """
+
+    def decorator(fn: Callable) -> property:
+        @functools.wraps(fn)
+        def getter(self):
+            key = dataset_key(self._session_key(), *datasets) + tuple(
+                getattr(self, name) for name in params
+            )
+            return self._derived.get(fn.__name__, key, lambda: fn(self))
+
+        return property(getter)
+
+    return decorator
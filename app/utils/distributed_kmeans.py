@@ -0,0 +1,334 @@
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from pathlib import Path
+from typing import Any
+import numpy as np
+import pandas as pd
+from app.utils.clustering_utils import ASSIGN_CHUNK_ROWS, nearest_centroid
+
+WORKER_KEY_ENV_VAR = "CLIENT_SEGMENT_WORKER_KEY"
+DEFAULT_WORKER_PORT = 7100
+# Rows gathered from all shards to pick the starting centroids.
+INIT_SAMPLE_ROWS = 20_000
+DEFAULT_MAX_ITER = 300
+DEFAULT_TOL = 1e-4
+
+
+def worker_key() -> bytes:
+    """Shared secret for TCP workers; messages are pickled, so it is mandatory."""
+    key = os.environ.get(WORKER_KEY_ENV_VAR, "")
+    if not key:
+        raise ValueError(f"Set {WORKER_KEY_ENV_VAR} to the same secret on every node.")
+    return key.encode()
+
+
+def _partial_sums(
+    points: np.ndarray, centroids: np.ndarray, chunk_rows: int
+) -> tuple[np.ndarray, np.ndarray, float]:
+    """Per-centroid coordinate sums, member counts and inertia of one shard."""
+    k, dims = centroids.shape
+    sums = np.zeros((k, dims))
+    counts = np.zeros(k, dtype=np.int64)
+    inertia = 0.0
+    for start in range(0, len(points), chunk_rows):
+        block = np.asarray(points[start : start + chunk_rows], dtype=np.float64)
+        labels, distances = nearest_centroid(
+            block, centroids, chunk_rows, return_distances=True
+        )
+        counts += np.bincount(labels, minlength=k)
+        for dim in range(dims):
+            sums[:, dim] += np.bincount(labels, weights=block[:, dim], minlength=k)
+        inertia += float(distances.sum())
+    return sums, counts, inertia
+
+
+def _shard_stats(
+    points: np.ndarray, chunk_rows: int
+) -> tuple[int, np.ndarray, np.ndarray]:
+    """Row count, column sums and column sums of squares, read in chunks."""
+    sums = np.zeros(points.shape[1])
+    squares = np.zeros(points.shape[1])
+    for start in range(0, len(points), chunk_rows):
+        block = np.asarray(points[start : start + chunk_rows], dtype=np.float64)
+        sums += block.sum(axis=0)
+        squares += (block**2).sum(axis=0)
+    return len(points), sums, squares
+
+
+def _shard_op(shard: dict[str, Any], op: str, args: tuple) -> Any:
+    if op == "load":
+        shard["points"] = np.asarray(args[0], dtype=np.float64)
+        return len(shard["points"])
+    if op == "load_file":
+        shard["points"] = np.load(args[0], mmap_mode="r")
+        return len(shard["points"])
+    points = shard["points"]
+    if points is None:
+        raise RuntimeError("No shard loaded on this worker.")
+    if op == "stats":
+        return _shard_stats(points, ASSIGN_CHUNK_ROWS)
+    if op == "sample":
+        n_rows, seed = args
+        rng = np.random.default_rng(seed)
+        rows = rng.choice(len(points), min(n_rows, len(points)), replace=False)
+        return np.asarray(points[np.sort(rows)], dtype=np.float64)
+    if op == "step":
+        return _partial_sums(points, args[0], ASSIGN_CHUNK_ROWS)
+    if op == "assign":
+        return nearest_centroid(points, args[0])
+    raise ValueError(f"Unknown shard operation: {op}")
+
+
+def serve_connection(conn: Connection) -> None:
+    """Answers (op, *args) requests for the one shard owned by this connection."""
+    shard = {"points": None}
+    while True:
+        try:
+            op, *args = conn.recv()
+        except (EOFError, OSError):
+            return
+        if op == "close":
+            conn.close()
+            return
+        try:
+            conn.send(("ok", _shard_op(shard, op, tuple(args))))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+def _local_worker(conn: Connection) -> None:
+    # One BLAS/OpenMP thread per worker process avoids oversubscription.
+    from threadpoolctl import threadpool_limits
+
+    with threadpool_limits(1):
+        serve_connection(conn)
+
+
+def serve(host: str, port: int, authkey: bytes) -> None:
+    """Runs a TCP shard worker; every accepted connection owns one shard."""
+    with Listener((host, port), authkey=authkey) as listener:
+        while True:
+            try:
+                conn = listener.accept()
+            except (AuthenticationError, OSError) as e:
+                logging.warning(f"Rejected shard connection: {e}")
+                continue
+            threading.Thread(target=serve_connection, args=(conn,), daemon=True).start()
+
+
+class ShardTransport:
+    """Sends one request per shard and gathers the replies in shard order.
+
+    Subclasses only open the connections; requests go out to every shard
+    before any reply is read, so the shards compute concurrently.
+    """
+
+    connections: list[Connection]
+
+    def __len__(self) -> int:
+        return len(self.connections)
+
+    def request(self, op: str, per_shard_args: list[tuple] | None = None) -> list:
+        per_shard_args = per_shard_args or [()] * len(self.connections)
+        for conn, args in zip(self.connections, per_shard_args):
+            conn.send((op, *args))
+        replies = [conn.recv() for conn in self.connections]
+        errors = [value for status, value in replies if status == "error"]
+        if errors:
+            raise RuntimeError(f"Shard worker failed during '{op}': {errors[0]}")
+        return [value for _, value in replies]
+
+    def broadcast(self, op: str, *args) -> list:
+        return self.request(op, [args] * len(self.connections))
+
+    def load(self, shards: list[np.ndarray]) -> list[int]:
+        return self.request("load", [(shard,) for shard in shards])
+
+    def load_files(self, paths: list[str]) -> list[int]:
+        """Has each worker memory-map a .npy shard from its own disk."""
+        return self.request("load_file", [(str(path),) for path in paths])
+
+    def close(self) -> None:
+        for conn in self.connections:
+            try:
+                conn.send(("close",))
+                conn.close()
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class LocalTransport(ShardTransport):
+    """One spawned worker process per shard on this machine."""
+
+    def __init__(self, n_workers: int | None = None):
+        n_workers = max(1, n_workers or os.cpu_count() or 1)
+        context = multiprocessing.get_context("spawn")
+        self.connections, self.processes = [], []
+        for _ in range(n_workers):
+            parent, child = context.Pipe()
+            process = context.Process(target=_local_worker, args=(child,), daemon=True)
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+
+    def close(self) -> None:
+        super().close()
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+
+class TcpTransport(ShardTransport):
+    """One connection per "host:port" address to workers started with app.kmeans_worker.
+
+    An address may be listed several times to place several shards on a node.
+    """
+
+    def __init__(self, addresses: list[str], authkey: bytes | None = None):
+        authkey = authkey or worker_key()
+        self.connections = []
+        for address in addresses:
+            host, _, port = address.rpartition(":")
+            self.connections.append(
+                Client((host or "localhost", int(port)), authkey=authkey)
+            )
+
+
+def fit_sharded_kmeans(
+    transport: ShardTransport,
+    k: int,
+    max_iter: int = DEFAULT_MAX_ITER,
+    tol: float = DEFAULT_TOL,
+    random_state: int = 42,
+) -> dict:
+    """Runs Lloyd's algorithm over shards already loaded on the workers.
+
+    Each iteration broadcasts the centroids; every shard returns its
+    per-centroid sums and counts, which the coordinator reduces into the
+    next centroids. The starting centroids are the best of ten K-Means
+    runs on a sample drawn from all shards in proportion to their size,
+    which avoids most poor local optima. Like scikit-learn, the run stops
+    once the squared centroid shift falls below `tol` times the mean
+    feature variance.
+    """
+    from sklearn.cluster import KMeans
+
+    stats = transport.broadcast("stats")
+    sizes = np.array([n for n, _, _ in stats])
+    n_rows = int(sizes.sum())
+    if n_rows < k:
+        raise ValueError(f"Cannot form {k} clusters from {n_rows} rows.")
+    mean = sum(s for _, s, _ in stats) / n_rows
+    variance = sum(sq for _, _, sq in stats) / n_rows - mean**2
+    threshold = tol * float(np.mean(variance))
+
+    quotas = np.ceil(sizes / n_rows * min(INIT_SAMPLE_ROWS, n_rows)).astype(int)
+    sample = np.vstack(
+        transport.request(
+            "sample", [(int(q), random_state + i) for i, q in enumerate(quotas)]
+        )
+    )
+    centroids = (
+        KMeans(n_clusters=k, n_init=10, random_state=random_state)
+        .fit(sample)
+        .cluster_centers_
+    )
+
+    inertia, n_iter = 0.0, 0
+    for n_iter in range(1, max_iter + 1):
+        partials = transport.broadcast("step", centroids)
+        sums = sum(p[0] for p in partials)
+        counts = sum(p[1] for p in partials)
+        inertia = sum(p[2] for p in partials)
+        # A centroid that lost all its members stays where it was.
+        updated = np.where(
+            counts[:, None] > 0, sums / np.maximum(counts, 1)[:, None], centroids
+        )
+        shift = float(((updated - centroids) ** 2).sum())
+        centroids = updated
+        if shift <= threshold:
+            break
+    labels = np.concatenate(transport.broadcast("assign", centroids))
+    return {
+        "labels": labels,
+        "centroids": centroids,
+        "n_iter": n_iter,
+        "inertia": float(inertia),
+        "n_shards": len(transport),
+    }
+
+
+def write_shards(
+    pca_df: pd.DataFrame, n_shards: int, directory: str | Path
+) -> list[Path]:
+    """Writes the PCA scores as contiguous float64 .npy shards, one at a time.
+
+    Only one shard is converted in memory at once, so the full float64
+    matrix is never built on the coordinator.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    bounds = np.linspace(0, len(pca_df), n_shards + 1).astype(int)
+    paths = []
+    for i, (start, stop) in enumerate(zip(bounds[:-1], bounds[1:])):
+        path = directory / f"shard_{os.getpid()}_{i}.npy"
+        np.save(path, pca_df.iloc[start:stop].to_numpy(dtype=np.float64))
+        paths.append(path)
+    return paths
+
+
+def perform_distributed_clustering(
+    pca_df: pd.DataFrame,
+    k: int,
+    transport: ShardTransport | None = None,
+    n_shards: int | None = None,
+    max_iter: int = DEFAULT_MAX_ITER,
+    tol: float = DEFAULT_TOL,
+    random_state: int = 42,
+    shard_dir: str | Path | None = None,
+) -> dict:
+    """Splits the PCA scores into one contiguous shard per worker and clusters them.
+
+    Without a transport, local worker processes are spawned for the call.
+    Shards are written as .npy files that the workers memory-map: to a
+    temporary directory for local workers, or to `shard_dir`, which remote
+    workers must see at the same path. Without either, shards are sent
+    over the connections. Labels come back in the original row order.
+    """
+    owned = transport is None
+    transport = transport or LocalTransport(n_shards)
+    scratch = None
+    try:
+        if shard_dir is None and owned:
+            scratch = tempfile.TemporaryDirectory(prefix="kmeans-shards-")
+            shard_dir = scratch.name
+        if shard_dir is not None:
+            paths = write_shards(pca_df, len(transport), shard_dir)
+            try:
+                transport.load_files([path.resolve() for path in paths])
+                return fit_sharded_kmeans(transport, k, max_iter, tol, random_state)
+            finally:
+                for path in paths:
+                    path.unlink(missing_ok=True)
+        transport.load(
+            np.array_split(pca_df.to_numpy(dtype=np.float64), len(transport))
+        )
+        return fit_sharded_kmeans(transport, k, max_iter, tol, random_state)
+    finally:
+        if owned:
+            transport.close()
+        if scratch is not None:
+            scratch.cleanup()
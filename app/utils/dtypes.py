@@ -0,0 +1,90 @@
+import os
+import numpy as np
+import pandas as pd
+
+FLOAT_DTYPE_ENV_VAR = "CLIENT_SEGMENT_FLOAT_DTYPE"
+DEFAULT_FLOAT_DTYPE = "float32"
+# A string column becomes categorical when it has at most this share of distinct values.
+CATEGORY_MAX_RATIO = 0.5
+CENTROID_TOLERANCE = 1e-3
+SILHOUETTE_TOLERANCE = 1e-3
+PRECISION_SAMPLE_ROWS = 10_000
+
+
+def feature_dtype() -> np.dtype:
+    """Dtype of scaled feature and PCA score matrices.
+
+    float32 by default; set CLIENT_SEGMENT_FLOAT_DTYPE=float64 to restore
+    full precision.
+    """
+    value = os.environ.get(FLOAT_DTYPE_ENV_VAR, DEFAULT_FLOAT_DTYPE)
+    return np.dtype(np.float64 if value == "float64" else np.float32)
+
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Downcasts integer columns and stores repetitive strings as category codes.
+
+    Float columns are left as float64: they hold currency amounts that are
+    exported, and float32 cannot represent cents above ~131k.
+    """
+    columns = {}
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_integer_dtype(series) and not pd.api.types.is_bool_dtype(
+            series
+        ):
+            columns[col] = pd.to_numeric(series, downcast="integer")
+        elif (
+            pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+        ) and series.nunique() <= CATEGORY_MAX_RATIO * len(series):
+            columns[col] = series.astype("category")
+    return df.assign(**columns) if columns else df
+
+
+def label_array(labels: np.ndarray | list[int]) -> np.ndarray:
+    """Stores cluster labels in the smallest signed integer type that fits them."""
+    labels = np.asarray(labels)
+    if labels.size == 0:
+        return labels.astype(np.int8)
+    low, high = int(labels.min()), int(labels.max())
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return labels.astype(dtype)
+    return labels.astype(np.int64)
+
+
+def precision_check(
+    points: np.ndarray,
+    k: int,
+    sample_rows: int = PRECISION_SAMPLE_ROWS,
+    random_state: int = 42,
+) -> dict[str, float | bool]:
+    """Clusters the same data in float64 and float32 and compares the results.
+
+    Both fits start from the same k-means++ seeds, so any difference comes
+    from precision alone. Silhouettes are computed on a shared sample.
+    """
+    from sklearn.cluster import KMeans, kmeans_plusplus
+    from sklearn.metrics import adjusted_rand_score, silhouette_score
+
+    rng = np.random.default_rng(random_state)
+    if len(points) > sample_rows:
+        points = points[rng.choice(len(points), sample_rows, replace=False)]
+    full = np.asarray(points, dtype=np.float64)
+    compact = full.astype(np.float32)
+    seeds, _ = kmeans_plusplus(full, n_clusters=k, random_state=random_state)
+    km64 = KMeans(n_clusters=k, init=seeds, n_init=1).fit(full)
+    km32 = KMeans(n_clusters=k, init=seeds.astype(np.float32), n_init=1).fit(compact)
+    silhouette64 = float(silhouette_score(full, km64.labels_))
+    silhouette32 = float(silhouette_score(compact, km32.labels_))
+    centroid_diff = float(np.abs(km64.cluster_centers_ - km32.cluster_centers_).max())
+    return {
+        "centroid_max_abs_diff": centroid_diff,
+        "silhouette_float64": silhouette64,
+        "silhouette_float32": silhouette32,
+        "silhouette_abs_diff": abs(silhouette64 - silhouette32),
+        "label_ari": float(adjusted_rand_score(km64.labels_, km32.labels_)),
+        "within_tolerance": centroid_diff <= CENTROID_TOLERANCE
+        and abs(silhouette64 - silhouette32) <= SILHOUETTE_TOLERANCE,
+    }
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+import numpy as np
+import pandas as pd
+from app.utils.ingest import SOURCE_FILE_COLUMN
+
+if TYPE_CHECKING:
+    from scipy import sparse
+
+CATEGORICAL_ENCODINGS = ("onehot", "frequency")
+MAX_CATEGORIES = 50
+
+
+def detect_categorical_columns(
+    df: pd.DataFrame, max_categories: int = MAX_CATEGORIES
+) -> list[str]:
+    """Non-numeric columns with few enough distinct values to encode.
+
+    Identifiers and free text exceed `max_categories` and are left out, as
+    is the provenance column added when several files are merged.
+    """
+    return [
+        col
+        for col in df.select_dtypes(exclude=[np.number, "datetime"]).columns
+        if col != SOURCE_FILE_COLUMN and df[col].nunique() <= max_categories
+    ]
+
+
+def fit_encoding(df: pd.DataFrame, columns: list[str], method: str) -> dict:
+    """Learns the categories and their frequencies for each categorical column."""
+    if method not in CATEGORICAL_ENCODINGS:
+        raise ValueError(f"Unsupported categorical encoding: {method}")
+    encoding = {"method": method, "columns": {}, "frequencies": {}}
+    for col in columns:
+        counts = df[col].astype(str).where(df[col].notna()).value_counts()
+        encoding["columns"][col] = counts.index.tolist()
+        encoding["frequencies"][col] = (counts / len(df)).round(6).tolist()
+    return encoding
+
+
+def encoded_feature_names(encoding: dict) -> list[str]:
+    if encoding["method"] == "frequency":
+        return [f"{col} (frequency)" for col in encoding["columns"]]
+    return [
+        f"{col}={category}"
+        for col, categories in encoding["columns"].items()
+        for category in categories
+    ]
+
+
+def category_codes(df: pd.DataFrame, encoding: dict) -> dict[str, np.ndarray]:
+    """Integer code of each row's category per column; -1 for missing or unseen values."""
+    return {
+        col: pd.Categorical(
+            df[col].astype(str).where(df[col].notna()), categories=categories
+        ).codes.astype(np.int32)
+        for col, categories in encoding["columns"].items()
+    }
+
+
+def encode(df: pd.DataFrame, encoding: dict) -> sparse.csr_matrix | np.ndarray:
+    """Encodes categorical columns from integer codes without densifying one-hot data.
+
+    One-hot returns a CSR indicator matrix with at most one entry per row
+    and column; frequency returns one dense column per categorical column.
+    """
+    from scipy import sparse
+
+    codes = category_codes(df, encoding)
+    n_rows = len(df)
+    if encoding["method"] == "frequency":
+        columns = []
+        for col, col_codes in codes.items():
+            lookup = np.append(np.asarray(encoding["frequencies"][col]), 0.0)
+            columns.append(lookup[col_codes])  # code -1 picks the trailing 0
+        return np.column_stack(columns) if columns else np.empty((n_rows, 0))
+    rows, cols, offset = [], [], 0
+    for col, col_codes in codes.items():
+        present = np.flatnonzero(col_codes >= 0)
+        rows.append(present)
+        cols.append(col_codes[present] + offset)
+        offset += len(encoding["columns"][col])
+    rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.int64)
+    cols = np.concatenate(cols) if cols else np.empty(0, dtype=np.int32)
+    return sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n_rows, offset))
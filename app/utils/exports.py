@@ -0,0 +1,129 @@
+import io
+import secrets
+import threading
+import time
+from typing import Callable, Iterator
+import numpy as np
+import pandas as pd
+
+EXPORT_CHUNK_ROWS = 100_000
+EXPORT_TTL_S = 600
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Builds the frame and extra label columns of an export when it is downloaded.
+ExportLoader = Callable[[], tuple[pd.DataFrame, dict[str, np.ndarray | list] | None]]
+
+_exports: dict[str, dict] = {}
+_exports_lock = threading.Lock()
+
+
+def iter_frame_chunks(
+    frame: pd.DataFrame,
+    extra_columns: dict[str, np.ndarray | list] | None = None,
+    chunk_rows: int = EXPORT_CHUNK_ROWS,
+) -> Iterator[pd.DataFrame]:
+    """Yields row slices of `frame`, attaching label columns slice by slice.
+
+    Labels are never joined onto the full frame, so exporting a labelled
+    dataset does not copy it.
+    """
+    extra_columns = {
+        name: np.asarray(values) for name, values in (extra_columns or {}).items()
+    }
+    for start in range(0, max(len(frame), 1), chunk_rows):
+        chunk = frame.iloc[start : start + chunk_rows]
+        if extra_columns:
+            chunk = chunk.assign(
+                **{
+                    name: values[start : start + chunk_rows]
+                    for name, values in extra_columns.items()
+                }
+            )
+        yield chunk
+
+
+def iter_csv_bytes(chunks: Iterator[pd.DataFrame]) -> Iterator[bytes]:
+    for i, chunk in enumerate(chunks):
+        yield chunk.to_csv(index=False, header=i == 0).encode("utf-8")
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError(
+            "Parquet export requires the optional 'pyarrow' package."
+        ) from e
+    return pyarrow
+
+
+def iter_parquet_bytes(chunks: Iterator[pd.DataFrame]) -> Iterator[bytes]:
+    """Writes one Parquet row group per chunk and yields the bytes as they are produced."""
+    pa = _require_pyarrow()
+    pq = pa.parquet
+    sink = io.BytesIO()
+    writer = None
+    for chunk in chunks:
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(sink, table.schema)
+        writer.write_table(table)
+        yield sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+    if writer is not None:
+        writer.close()
+        yield sink.getvalue()
+
+
+def register_export(load: ExportLoader, filename: str, fmt: str = "csv") -> str:
+    """Stages a dataset for streaming download and returns its one-time token.
+
+    Only `load` is kept, so a staged export holds no data; it is called at
+    download time and may raise LookupError if the data is gone. Exports
+    live in this process for EXPORT_TTL_S seconds, which matches Reflex's
+    default single-backend deployment.
+    """
+    if fmt not in EXPORT_MEDIA_TYPES:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    if fmt == "parquet":
+        _require_pyarrow()
+    token = secrets.token_urlsafe(16)
+    now = time.monotonic()
+    with _exports_lock:
+        for key in [k for k, v in _exports.items() if v["expires"] < now]:
+            del _exports[key]
+        _exports[token] = {
+            "load": load,
+            "filename": filename,
+            "fmt": fmt,
+            "expires": now + EXPORT_TTL_S,
+        }
+    return token
+
+
+def open_export(token: str) -> tuple[str, str, Iterator[bytes]] | None:
+    """Returns (filename, media type, byte stream) for a staged export.
+
+    None when the token is unknown or expired, or the data was replaced or
+    dropped since the export was staged.
+    """
+    with _exports_lock:
+        export = _exports.pop(token, None)
+    if export is None or export["expires"] < time.monotonic():
+        return None
+    try:
+        frame, extra_columns = export["load"]()
+    except LookupError:
+        return None
+    chunks = iter_frame_chunks(frame, extra_columns)
+    stream = (
+        iter_parquet_bytes(chunks)
+        if export["fmt"] == "parquet"
+        else iter_csv_bytes(chunks)
+    )
+    return (export["filename"], EXPORT_MEDIA_TYPES[export["fmt"]], stream)
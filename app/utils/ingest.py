@@ -0,0 +1,67 @@
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from app.utils.clustering_utils import resolve_column_roles
+
+SOURCE_FILE_COLUMN = "source_file"
+MAX_PARSE_WORKERS = 8
+
+
+def parse_uploads(
+    uploads: list[tuple[str, bytes]], max_workers: int = MAX_PARSE_WORKERS
+) -> list[pd.DataFrame]:
+    """Parses uploaded CSV files concurrently, returning frames in upload order.
+
+    pandas' C parser releases the GIL for much of its work, so with a
+    thread pool many files load in roughly the time of the largest one.
+    """
+    if len(uploads) == 1:
+        return [pd.read_csv(io.BytesIO(uploads[0][1]))]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(uploads))) as pool:
+        return list(
+            pool.map(lambda upload: pd.read_csv(io.BytesIO(upload[1])), uploads)
+        )
+
+
+def merge_uploads(
+    names: list[str], frames: list[pd.DataFrame]
+) -> tuple[pd.DataFrame, list[dict[str, str | int]]]:
+    """Checks that uploaded files share one schema and stacks them.
+
+    Every file must provide all profiling roles. Columns are renamed to the
+    first file's names per role, so files that spell a column differently
+    still line up. The remaining columns must match exactly. With more than
+    one file, a `source_file` column records where each row came from.
+    """
+    reference = resolve_column_roles(frames[0])
+    expected = set(frames[0].columns)
+    aligned = []
+    for name, frame in zip(names, frames):
+        try:
+            roles = resolve_column_roles(frame)
+        except ValueError as e:
+            raise ValueError(f"{name}: {e}") from e
+        frame = frame.rename(columns={roles[r]: reference[r] for r in reference})
+        if set(frame.columns) != expected:
+            missing = sorted(expected - set(frame.columns))
+            extra = sorted(set(frame.columns) - expected)
+            raise ValueError(
+                f"{name} does not match the schema of {names[0]}. "
+                f"Missing columns: {missing}. Unexpected columns: {extra}."
+            )
+        aligned.append(frame[frames[0].columns])
+    row_counts = [
+        {"file": name, "rows": len(frame)} for name, frame in zip(names, aligned)
+    ]
+    if len(aligned) == 1:
+        return aligned[0], row_counts
+    merged = pd.concat(
+        [
+            frame.assign(**{SOURCE_FILE_COLUMN: name})
+            for name, frame in zip(names, aligned)
+        ],
+        ignore_index=True,
+    )
+    logging.info(f"Merged {len(names)} uploads into {len(merged)} rows.")
+    return merged, row_counts
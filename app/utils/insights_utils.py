@@ -1,165 +1,229 @@
+import numpy as np
 import pandas as pd
 from typing import Any
+from app.utils.clustering_utils import resolve_column_roles
+
+# Each rule condition reads one feature: the profile field for segment
+# profiles, or the column of that role for individual customers.
+RULE_FEATURES = {
+    "income": "avg_income",
+    "savings": "avg_savings",
+    "credit": "avg_credit",
+    "spending": "avg_spend",
+    "age": "avg_age",
+    "seniority": "avg_seniority",
+}
+
+DEFAULT_RECOMMENDATIONS = [
+    {"icon": "mail", "text": "Send targeted email campaigns for savings products."},
+    {"icon": "percent", "text": "Offer promotional interest rates on loans."},
+]
+
+# Rules are tried in order; the first whose conditions all hold names the segment.
+SEGMENT_RULES = [
+    {
+        "name": "Premium Savers",
+        "when": [("income", ">", 4000), ("savings", ">", 20000)],
+        "recommendations": [
+            {"icon": "trending-up", "text": "Recommend wealth management services."},
+            {"icon": "gem", "text": "Promote exclusive investment products."},
+            {"icon": "award", "text": "Offer premium rewards and loyalty programs."},
+        ],
+    },
+    {
+        "name": "Active Spenders",
+        "when": [("spending", ">", 1000), ("savings", "<", 5000)],
+        "recommendations": [
+            {"icon": "save", "text": "Suggest automated savings plans."},
+            {
+                "icon": "credit-card",
+                "text": "Promote high-reward cashback credit cards.",
+            },
+            {"icon": "user-cog", "text": "Offer financial planning consultations."},
+        ],
+    },
+    {
+        "name": "Young Professionals",
+        "when": [("age", "<", 35), ("seniority", "<", 5)],
+        "recommendations": [
+            {"icon": "smartphone", "text": "Market advanced digital banking features."},
+            {"icon": "graduation-cap", "text": "Promote starter and student accounts."},
+            {"icon": "line-chart", "text": "Offer credit-building loans and products."},
+        ],
+    },
+    {
+        "name": "Loyal Veterans",
+        "when": [("age", ">", 55), ("seniority", ">", 15)],
+        "recommendations": [
+            {
+                "icon": "gift",
+                "text": "Provide exclusive loyalty and anniversary rewards.",
+            },
+            {"icon": "home", "text": "Offer retirement planning and estate services."},
+            {
+                "icon": "headphones",
+                "text": "Ensure access to premium customer service channels.",
+            },
+        ],
+    },
+    {
+        "name": "Credit Dependent",
+        "when": [("income", "<", 2500), ("credit", ">", 7000)],
+        "recommendations": [
+            {"icon": "refresh-cw", "text": "Suggest debt consolidation loan options."},
+            {"icon": "book-open", "text": "Promote financial literacy workshops."},
+            {
+                "icon": "clipboard-list",
+                "text": "Offer personalized budget management tools.",
+            },
+        ],
+    },
+    {
+        "name": "High-Income Earners",
+        "when": [("income", ">", 3500)],
+        "recommendations": DEFAULT_RECOMMENDATIONS,
+    },
+    {
+        "name": "Diligent Savers",
+        "when": [("savings", ">", 15000)],
+        "recommendations": DEFAULT_RECOMMENDATIONS,
+    },
+]
+FALLBACK_SEGMENT_NAME = "Standard Segment"
+
+KPI_TABLE = [
+    {"name": "Avg. Income", "field": "avg_income", "icon": "wallet"},
+    {"name": "Avg. Savings", "field": "avg_savings", "icon": "piggy-bank"},
+    {"name": "Avg. Spend", "field": "avg_spend", "icon": "shopping-cart"},
+]
+
+_OPERATORS = {
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+}
+
+
+def match_rules(
+    features: dict[str, np.ndarray], rules: list[dict[str, Any]] = SEGMENT_RULES
+) -> np.ndarray:
+    """Index of the first matching rule for every row, or -1 when none match.
+
+    Each rule becomes one boolean mask over all rows and np.select picks
+    the first true mask, so millions of rows are classified in one pass.
+    """
+    n_rows = len(next(iter(features.values()))) if features else 0
+    masks = []
+    for rule in rules:
+        mask = np.ones(n_rows, dtype=bool)
+        for feature, op, threshold in rule["when"]:
+            mask &= _OPERATORS[op](features[feature], threshold)
+        masks.append(mask)
+    if not masks:
+        return np.full(n_rows, -1, dtype=np.int16)
+    return np.select(masks, np.arange(len(rules), dtype=np.int16), default=-1)
+
+
+def profile_features(
+    cluster_profiles: list[dict[str, str | int | float]],
+) -> dict[str, np.ndarray]:
+    """Rule features of each profile, parsed once from its formatted averages."""
+    return {
+        feature: np.array([float(p[field]) for p in cluster_profiles], dtype=float)
+        for feature, field in RULE_FEATURES.items()
+    }
+
+
+def customer_features(df: pd.DataFrame) -> dict[str, np.ndarray]:
+    """Rule features of individual customers, read from their role columns."""
+    roles = resolve_column_roles(df)
+    return {
+        feature: pd.to_numeric(df[roles[feature]], errors="coerce").to_numpy(float)
+        for feature in RULE_FEATURES
+    }
+
+
+def classify_customers(
+    df: pd.DataFrame, rules: list[dict[str, Any]] = SEGMENT_RULES
+) -> pd.Categorical:
+    """Segment name of every customer row under the rule table."""
+    codes = match_rules(customer_features(df), rules)
+    categories = [rule["name"] for rule in rules] + [FALLBACK_SEGMENT_NAME]
+    return pd.Categorical.from_codes(np.where(codes < 0, len(rules), codes), categories)
+
+
+def name_segments(
+    cluster_profiles: list[dict[str, str | int | float]],
+    rules: list[dict[str, Any]] = SEGMENT_RULES,
+) -> list[str]:
+    matches = match_rules(profile_features(cluster_profiles), rules)
+    return [
+        rules[i]["name"] if i >= 0 else f"{FALLBACK_SEGMENT_NAME} {p['cluster_id']}"
+        for i, p in zip(matches, cluster_profiles)
+    ]
 
 
 def create_segment_name(profile: dict[str, str | int | float]) -> str:
     """Generates a descriptive name for a customer segment."""
-    income = float(profile["avg_income"])
-    savings = float(profile["avg_savings"])
-    spend = float(profile["avg_spend"])
-    age = float(profile["avg_age"])
-    seniority = float(profile["avg_seniority"])
-    if income > 4000 and savings > 20000:
-        return "Premium Savers"
-    if spend > 1000 and savings < 5000:
-        return "Active Spenders"
-    if age < 35 and seniority < 5:
-        return "Young Professionals"
-    if age > 55 and seniority > 15:
-        return "Loyal Veterans"
-    if income < 2500 and float(profile["avg_credit"]) > 7000:
-        return "Credit Dependent"
-    if income > 3500:
-        return "High-Income Earners"
-    if savings > 15000:
-        return "Diligent Savers"
-    return f"Standard Segment {profile['cluster_id']}"
+    return name_segments([profile])[0]
 
 
 def generate_kpis(profile: dict[str, str | int | float]) -> list[dict[str, str]]:
     """Identifies top 3 KPIs for a segment."""
-    kpis = [
-        {
-            "name": "Avg. Income",
-            "value": f"€{profile['avg_income']}",
-            "icon": "wallet",
-        },
-        {
-            "name": "Avg. Savings",
-            "value": f"€{profile['avg_savings']}",
-            "icon": "piggy-bank",
-        },
-        {
-            "name": "Avg. Spend",
-            "value": f"€{profile['avg_spend']}",
-            "icon": "shopping-cart",
-        },
+    return [
+        {"name": kpi["name"], "value": f"€{profile[kpi['field']]}", "icon": kpi["icon"]}
+        for kpi in KPI_TABLE
     ]
-    return kpis
 
 
 def generate_marketing_insights(
     cluster_profiles: list[dict[str, str | int | float]],
+    rules: list[dict[str, Any]] = SEGMENT_RULES,
 ) -> list[dict[str, str | int | float | list[dict[str, str]]]]:
     """Analyzes cluster profiles and generates marketing recommendations."""
+    if not cluster_profiles:
+        return []
+    matches = match_rules(profile_features(cluster_profiles), rules)
+    total_customers = sum(p["size"] for p in cluster_profiles)
     insights = []
-    for profile in cluster_profiles:
-        segment_name = create_segment_name(profile)
-        kpis = generate_kpis(profile)
-        recommendations = []
-        if segment_name == "Premium Savers":
-            recommendations.extend(
-                [
-                    {
-                        "icon": "trending-up",
-                        "text": "Recommend wealth management services.",
-                    },
-                    {"icon": "gem", "text": "Promote exclusive investment products."},
-                    {
-                        "icon": "award",
-                        "text": "Offer premium rewards and loyalty programs.",
-                    },
-                ]
-            )
-        elif segment_name == "Active Spenders":
-            recommendations.extend(
-                [
-                    {"icon": "save", "text": "Suggest automated savings plans."},
-                    {
-                        "icon": "credit-card",
-                        "text": "Promote high-reward cashback credit cards.",
-                    },
-                    {
-                        "icon": "user-cog",
-                        "text": "Offer financial planning consultations.",
-                    },
-                ]
-            )
-        elif segment_name == "Young Professionals":
-            recommendations.extend(
-                [
-                    {
-                        "icon": "smartphone",
-                        "text": "Market advanced digital banking features.",
-                    },
-                    {
-                        "icon": "graduation-cap",
-                        "text": "Promote starter and student accounts.",
-                    },
-                    {
-                        "icon": "line-chart",
-                        "text": "Offer credit-building loans and products.",
-                    },
-                ]
-            )
-        elif segment_name == "Loyal Veterans":
-            recommendations.extend(
-                [
-                    {
-                        "icon": "gift",
-                        "text": "Provide exclusive loyalty and anniversary rewards.",
-                    },
-                    {
-                        "icon": "home",
-                        "text": "Offer retirement planning and estate services.",
-                    },
-                    {
-                        "icon": "headphones",
-                        "text": "Ensure access to premium customer service channels.",
-                    },
-                ]
-            )
-        elif segment_name == "Credit Dependent":
-            recommendations.extend(
-                [
-                    {
-                        "icon": "refresh-cw",
-                        "text": "Suggest debt consolidation loan options.",
-                    },
-                    {
-                        "icon": "book-open",
-                        "text": "Promote financial literacy workshops.",
-                    },
-                    {
-                        "icon": "clipboard-list",
-                        "text": "Offer personalized budget management tools.",
-                    },
-                ]
-            )
-        else:
-            recommendations.extend(
-                [
-                    {
-                        "icon": "mail",
-                        "text": "Send targeted email campaigns for savings products.",
-                    },
-                    {
-                        "icon": "percent",
-                        "text": "Offer promotional interest rates on loans.",
-                    },
-                ]
-            )
-        total_customers = sum((p["size"] for p in cluster_profiles))
+    for i, profile in zip(matches, cluster_profiles):
+        rule = rules[i] if i >= 0 else None
         insights.append(
             {
                 "cluster_id": profile["cluster_id"],
-                "segment_name": segment_name,
+                "segment_name": (
+                    rule["name"]
+                    if rule
+                    else f"{FALLBACK_SEGMENT_NAME} {profile['cluster_id']}"
+                ),
                 "size": profile["size"],
-                "percentage": profile["size"] / total_customers * 100
-                if total_customers > 0
-                else 0,
-                "kpis": kpis,
-                "recommendations": recommendations,
+                "percentage": (
+                    profile["size"] / total_customers * 100
+                    if total_customers > 0
+                    else 0
+                ),
+                "kpis": generate_kpis(profile),
+                "recommendations": [
+                    dict(r)
+                    for r in (
+                        rule["recommendations"] if rule else DEFAULT_RECOMMENDATIONS
+                    )
+                ],
             }
         )
-    return insights
\ No newline at end of file
+    return insights
+
+
+def insights_to_frame(
+    insights: list[dict[str, str | int | float | list[dict[str, str]]]],
+) -> pd.DataFrame:
+    """Flattens insights into one row per segment for CSV export."""
+    df = pd.DataFrame(insights)
+    df["recommendations"] = df["recommendations"].apply(
+        lambda recs: " | ".join([r["text"] for r in recs])
+    )
+    df["kpis"] = df["kpis"].apply(
+        lambda kpis: " | ".join([f"{k['name']}: {k['value']}" for k in kpis])
+    )
+    return df
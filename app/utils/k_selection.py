@@ -0,0 +1,123 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+DEFAULT_REFERENCES = 10
+# Gap statistic datasets are capped; W_k is compared on samples of equal size.
+MAX_GAP_ROWS = 20_000
+GAP_N_INIT = 3
+
+
+def knee_point(ks: list[int], inertias: list[float]) -> tuple[int, float]:
+    """Finds the elbow of a decreasing inertia curve with the Kneedle method.
+
+    Both axes are scaled to [0, 1]; the knee is the k where the curve lies
+    furthest above the straight line joining its ends. Returns the knee and
+    that distance, which is near 0 for curves without a clear elbow.
+    """
+    x = np.asarray(ks, dtype=np.float64)
+    y = np.asarray(inertias, dtype=np.float64)
+    x_norm = (x - x.min()) / max(x.max() - x.min(), 1e-12)
+    y_norm = (y.max() - y) / max(y.max() - y.min(), 1e-12)
+    difference = y_norm - x_norm
+    best = int(np.argmax(difference))
+    return int(ks[best]), float(difference[best])
+
+
+def _log_dispersions(task: tuple[np.ndarray, list[int], int]) -> np.ndarray:
+    """log(W_k) of one dataset for every k; runs in a worker process."""
+    points, ks, seed = task
+    from sklearn.cluster import KMeans
+    from threadpoolctl import threadpool_limits
+
+    with threadpool_limits(1):
+        return np.array(
+            [
+                np.log(
+                    KMeans(n_clusters=k, n_init=GAP_N_INIT, random_state=seed)
+                    .fit(points)
+                    .inertia_
+                )
+                for k in ks
+            ]
+        )
+
+
+def gap_statistic(
+    pca_df: pd.DataFrame,
+    ks: list[int],
+    n_references: int = DEFAULT_REFERENCES,
+    max_workers: int | None = None,
+    random_state: int = 42,
+) -> list[dict[str, int | float]]:
+    """Computes Tibshirani's gap statistic with reference datasets clustered in parallel.
+
+    Reference datasets are drawn uniformly from the bounding box of the
+    PCA scores, which are already aligned with the principal axes. Each
+    reference (and the data itself) is one task in a process pool.
+    """
+    rng = np.random.default_rng(random_state)
+    points = pca_df.to_numpy(dtype=np.float64)
+    if len(points) > MAX_GAP_ROWS:
+        points = points[rng.choice(len(points), MAX_GAP_ROWS, replace=False)]
+    low, high = points.min(axis=0), points.max(axis=0)
+    datasets = [points] + [
+        rng.uniform(low, high, size=points.shape) for _ in range(n_references)
+    ]
+    tasks = [(data, list(ks), random_state) for data in datasets]
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(tasks)))
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        results = list(pool.map(_log_dispersions, tasks))
+    observed, references = results[0], np.vstack(results[1:])
+    gaps = references.mean(axis=0) - observed
+    errors = references.std(axis=0) * np.sqrt(1 + 1 / n_references)
+    return [
+        {"k": int(k), "gap": float(g), "gap_error": float(e)}
+        for k, g, e in zip(ks, gaps, errors)
+    ]
+
+
+def gap_choice(gap_data: list[dict[str, int | float]]) -> int:
+    """Smallest k with Gap(k) >= Gap(k+1) - s(k+1), else the k with the largest gap."""
+    for current, following in zip(gap_data, gap_data[1:]):
+        if current["gap"] >= following["gap"] - following["gap_error"]:
+            return int(current["k"])
+    return int(max(gap_data, key=lambda row: row["gap"])["k"])
+
+
+def recommend_k(
+    pca_df: pd.DataFrame,
+    elbow_data: list[dict[str, str | int | float]],
+    n_references: int = DEFAULT_REFERENCES,
+    max_workers: int | None = None,
+) -> dict:
+    """Combines the inertia knee, the gap statistic and the best silhouette into one k.
+
+    Each criterion votes for a k; a vote for a neighbouring k counts half.
+    The k with the most support wins (ties go to the gap statistic) and the
+    confidence is its share of the votes.
+    """
+    ks = [int(row["k"]) for row in elbow_data]
+    knee_k, knee_strength = knee_point(ks, [row["inertia"] for row in elbow_data])
+    gap_data = gap_statistic(pca_df, ks, n_references, max_workers)
+    gap_k = gap_choice(gap_data)
+    silhouette_k = int(max(elbow_data, key=lambda row: row["silhouette"])["k"])
+    votes = [gap_k, knee_k, silhouette_k]
+
+    def support(k: int) -> float:
+        return sum(1.0 if v == k else 0.5 if abs(v - k) == 1 else 0.0 for v in votes)
+
+    best = max(votes, key=lambda k: (support(k), k == gap_k))
+    return {
+        "k": int(best),
+        "confidence": round(min(support(best) / len(votes), 1.0), 2),
+        "knee_k": knee_k,
+        "knee_strength": round(knee_strength, 3),
+        "gap_k": gap_k,
+        "silhouette_k": silhouette_k,
+        "gap_data": gap_data,
+    }
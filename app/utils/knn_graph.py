@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import os
+import threading
+import zipfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING
+import numpy as np
+import pandas as pd
+from app.utils.wire_format import fingerprint
+
+if TYPE_CHECKING:
+    from scipy import sparse
+
+KNN_DIR_ENV_VAR = "CLIENT_SEGMENT_KNN_DIR"
+DEFAULT_KNN_DIR = ".knn_cache"
+DEFAULT_NEIGHBORS = 15
+# Tree searches lose their edge over brute force in high dimensions.
+KD_TREE_MAX_DIMS = 20
+# Graphs kept in this process and on disk; older ones are evicted.
+MEMORY_CACHE_SIZE = 4
+DISK_CACHE_SIZE = 16
+
+_graphs: OrderedDict[str, sparse.csr_matrix] = OrderedDict()
+_graphs_lock = threading.Lock()
+
+
+def knn_cache_dir() -> Path:
+    return Path(os.environ.get(KNN_DIR_ENV_VAR, DEFAULT_KNN_DIR))
+
+
+def build_knn_graph(
+    points: np.ndarray, n_neighbors: int = DEFAULT_NEIGHBORS, n_jobs: int = -1
+) -> sparse.csr_matrix:
+    """Sparse n x n matrix of distances from each row to its nearest neighbours.
+
+    A point is never its own neighbour. Queries run in parallel over
+    `n_jobs` threads against a KD-tree, or a ball tree in higher dimensions.
+    """
+    from scipy import sparse
+    from sklearn.neighbors import NearestNeighbors
+
+    points = np.asarray(points)
+    n_rows = len(points)
+    n_neighbors = max(1, min(n_neighbors, n_rows - 1))
+    algorithm = "kd_tree" if points.shape[1] <= KD_TREE_MAX_DIMS else "ball_tree"
+    index = NearestNeighbors(
+        n_neighbors=n_neighbors, algorithm=algorithm, n_jobs=n_jobs
+    ).fit(points)
+    distances, neighbors = index.kneighbors()
+    return sparse.csr_matrix(
+        (
+            distances.astype(np.float32).ravel(),
+            neighbors.astype(np.int32).ravel(),
+            np.arange(0, n_rows * n_neighbors + 1, n_neighbors),
+        ),
+        shape=(n_rows, n_rows),
+    )
+
+
+def _prune_disk_cache(directory: Path) -> None:
+    files = sorted(directory.glob("*.npz"), key=lambda p: p.stat().st_mtime)
+    for path in files[:-DISK_CACHE_SIZE]:
+        path.unlink(missing_ok=True)
+
+
+def knn_graph(
+    pca_df: pd.DataFrame, n_neighbors: int = DEFAULT_NEIGHBORS
+) -> sparse.csr_matrix:
+    """kNN graph of a PCA dataset, built once and cached in memory and on disk.
+
+    The cache key is a hash of the scores, so every consumer of the same
+    PCA run shares one graph, and a new run gets a new graph.
+    """
+    from scipy import sparse
+
+    points = pca_df.to_numpy()
+    key = fingerprint(points, np.array([n_neighbors]))
+    with _graphs_lock:
+        if key in _graphs:
+            _graphs.move_to_end(key)
+            return _graphs[key]
+    path = knn_cache_dir() / f"{key}.npz"
+    try:
+        graph = sparse.load_npz(path)
+        path.touch()
+    except (OSError, ValueError, zipfile.BadZipFile):
+        graph = build_knn_graph(points, n_neighbors)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            partial = path.with_name(f"{key}.{os.getpid()}.tmp.npz")
+            sparse.save_npz(partial, graph, compressed=False)
+            os.replace(partial, path)
+            _prune_disk_cache(path.parent)
+        except OSError:
+            pass  # the cache is an optimisation; a read-only disk is fine
+    with _graphs_lock:
+        _graphs[key] = graph
+        while len(_graphs) > MEMORY_CACHE_SIZE:
+            _graphs.popitem(last=False)
+    return graph
+
+
+def connectivity(graph: sparse.csr_matrix) -> sparse.csr_matrix:
+    """Symmetric 0/1 adjacency of a kNN graph, as structured Ward expects."""
+    from scipy import sparse
+
+    adjacency = sparse.csr_matrix(
+        (np.ones_like(graph.data), graph.indices, graph.indptr), shape=graph.shape
+    )
+    adjacency = (adjacency + adjacency.T).tocsr()
+    adjacency.data[:] = 1.0
+    return adjacency
+
+
+def knn_consistency(graph: sparse.csr_matrix, labels: np.ndarray) -> float:
+    """Share of neighbour pairs that fall in the same cluster (1.0 is perfectly local).
+
+    A neighbourhood counterpart to the silhouette that costs O(n * k)
+    instead of O(n^2). Pairs involving a noise row (a negative label) are
+    not counted.
+    """
+    labels = np.asarray(labels)
+    owners = np.repeat(labels, np.diff(graph.indptr))
+    neighbours = labels[graph.indices]
+    counted = (owners >= 0) & (neighbours >= 0)
+    if not counted.any():
+        return 0.0
+    return float(np.mean(neighbours[counted] == owners[counted]))
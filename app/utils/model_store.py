@@ -0,0 +1,266 @@
+import datetime
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Iterable
+import numpy as np
+import pandas as pd
+from app.utils.clustering_utils import COLUMN_MAPPINGS, find_column, nearest_centroid
+from app.utils.cleaning_pipeline import apply_cleaning_params
+from app.utils.encoding import encode
+from app.utils.pca_utils import project
+from app.utils.insights_utils import name_segments
+
+MODEL_DIR_ENV_VAR = "CLIENT_SEGMENT_MODEL_DIR"
+DEFAULT_MODEL_DIR = ".models"
+MODEL_FORMAT_VERSION = 1
+MODEL_ARRAYS = ("scaler_mean", "scaler_scale", "components", "centroids", "pca_mean")
+SCORING_CHUNK_ROWS = 250_000
+# Unpinned bundles kept per directory; older ones are deleted when a new one is saved.
+MAX_MODELS = 20
+# Subdirectory of the model directory holding one pin file per holder.
+PINS_DIR = "pins"
+
+
+def get_model_dir() -> Path:
+    """Returns the directory holding saved segmentation model bundles."""
+    return Path(os.environ.get(MODEL_DIR_ENV_VAR, DEFAULT_MODEL_DIR))
+
+
+def build_model(
+    pca_results: dict,
+    centroids: np.ndarray,
+    column_roles: dict[str, str],
+    profiles: list[dict[str, str | int | float]] | None = None,
+    cleaning_params: dict[str, dict[str, float]] | None = None,
+) -> dict:
+    """Collects everything needed to score new customers into one model dict.
+
+    Arrays are the scaler statistics, the PCA components and the cluster
+    centroids in PCA space. Metadata maps the feature columns to their
+    profiled roles so files with differently named columns can be scored.
+    """
+    return {
+        "format_version": MODEL_FORMAT_VERSION,
+        "version": "",
+        "created": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "feature_names": list(pca_results["feature_names"]),
+        "numeric_features": list(
+            pca_results.get("numeric_features", pca_results["feature_names"])
+        ),
+        "encoding": pca_results.get("encoding"),
+        "column_roles": dict(column_roles),
+        "k": int(len(centroids)),
+        "profiles": list(profiles or []),
+        "cleaning_params": cleaning_params
+        or {"medians": {}, "lower_caps": {}, "upper_caps": {}},
+        "scaler_mean": np.asarray(pca_results["scaler_mean"], dtype=np.float64),
+        "scaler_scale": np.asarray(pca_results["scaler_scale"], dtype=np.float64),
+        "components": np.asarray(pca_results["components"], dtype=np.float64),
+        "centroids": np.asarray(centroids, dtype=np.float64),
+        "pca_mean": np.asarray(
+            pca_results.get("pca_mean", np.zeros(len(pca_results["components"][0]))),
+            dtype=np.float64,
+        ),
+    }
+
+
+def save_model(model: dict, directory: str | Path | None = None) -> str:
+    """Writes the model as `<version>.npz` plus `<version>.json` and returns the version."""
+    directory = Path(directory) if directory is not None else get_model_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    version = model.get("version") or (
+        datetime.datetime.now().strftime("%Y%m%d-%H%M%S") + "-" + uuid.uuid4().hex[:8]
+    )
+    model["version"] = version
+    np.savez_compressed(
+        directory / f"{version}.npz", **{name: model[name] for name in MODEL_ARRAYS}
+    )
+    metadata = {k: v for k, v in model.items() if k not in MODEL_ARRAYS}
+    (directory / f"{version}.json").write_text(json.dumps(metadata, indent=2))
+    _prune_models(directory)
+    return version
+
+
+def pin_models(
+    holder: str,
+    versions: Iterable[str],
+    directory: str | Path | None = None,
+    ttl_s: float | None = None,
+) -> None:
+    """Keeps `versions` from being pruned on behalf of `holder`.
+
+    Replaces the holder's earlier pins; an empty `versions` releases them.
+    With `ttl_s` the pins lapse unless renewed within that many seconds.
+    """
+    directory = Path(directory) if directory is not None else get_model_dir()
+    path = directory / PINS_DIR / f"{holder}.json"
+    versions = sorted({v for v in versions if v})
+    if not versions:
+        path.unlink(missing_ok=True)
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    expires = time.time() + ttl_s if ttl_s is not None else None
+    tmp = path.with_suffix(f".{uuid.uuid4().hex[:8]}.tmp")
+    tmp.write_text(json.dumps({"versions": versions, "expires": expires}))
+    tmp.replace(path)
+
+
+def pinned_versions(directory: str | Path | None = None) -> set[str]:
+    """Versions pinned by any holder; lapsed pin files are deleted."""
+    directory = Path(directory) if directory is not None else get_model_dir()
+    pinned, now = set(), time.time()
+    for path in (directory / PINS_DIR).glob("*.json"):
+        try:
+            pins = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        if pins.get("expires") is not None and pins["expires"] < now:
+            path.unlink(missing_ok=True)
+            continue
+        pinned.update(pins.get("versions", []))
+    return pinned
+
+
+def _prune_models(directory: Path) -> None:
+    # Versions start with their timestamp, so name order is age order.
+    pinned = pinned_versions(directory)
+    metas = [
+        meta
+        for meta in sorted(directory.glob("*.json"), reverse=True)
+        if meta.stem not in pinned
+    ]
+    for meta in metas[MAX_MODELS:]:
+        for suffix in (".json", ".npz"):
+            meta.with_suffix(suffix).unlink(missing_ok=True)
+
+
+def list_models(directory: str | Path | None = None) -> list[dict]:
+    """Lists saved model metadata, newest first."""
+    directory = Path(directory) if directory is not None else get_model_dir()
+    if not directory.exists():
+        return []
+    models = []
+    for meta_path in sorted(directory.glob("*.json"), reverse=True):
+        try:
+            models.append(json.loads(meta_path.read_text()))
+        except (OSError, ValueError):
+            continue
+    return models
+
+
+def load_model(version: str | None = None, directory: str | Path | None = None) -> dict:
+    """Loads a saved model bundle, or the most recent one when `version` is None."""
+    directory = Path(directory) if directory is not None else get_model_dir()
+    if version is None:
+        saved = list_models(directory)
+        if not saved:
+            raise FileNotFoundError(f"No segmentation models found in {directory}.")
+        version = saved[0]["version"]
+    if Path(version).name != version:
+        raise ValueError(f"Invalid model version: {version}")
+    model = json.loads((directory / f"{version}.json").read_text())
+    if model.get("format_version") != MODEL_FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported model format {model.get('format_version')} for {version}."
+        )
+    with np.load(directory / f"{version}.npz") as arrays:
+        for name in MODEL_ARRAYS:
+            if name in arrays:
+                model[name] = arrays[name]
+    # Bundles saved before categorical encoding had numeric features only.
+    model.setdefault("numeric_features", model["feature_names"])
+    model.setdefault("encoding", None)
+    model.setdefault("pca_mean", np.zeros(model["components"].shape[1]))
+    return model
+
+
+def resolve_feature_columns(model: dict, df: pd.DataFrame) -> list[str]:
+    """Finds the input column for every model feature, falling back to role matching."""
+    role_of = {column: role for role, column in model["column_roles"].items()}
+    columns = []
+    for name in model["numeric_features"]:
+        if name in df.columns:
+            columns.append(name)
+        elif name in role_of:
+            columns.append(find_column(df, COLUMN_MAPPINGS[role_of[name]]))
+        else:
+            raise KeyError(
+                f"Column '{name}' required by model {model['version']} is missing."
+            )
+    return columns
+
+
+def transform(model: dict, df: pd.DataFrame) -> np.ndarray:
+    """Projects raw feature rows into the model's PCA space."""
+    values = df[resolve_feature_columns(model, df)].to_numpy(dtype=np.float64)
+    encoded = encode(df, model["encoding"]) if model["encoding"] else None
+    return project(
+        values,
+        encoded,
+        model["scaler_mean"],
+        model["scaler_scale"],
+        model["pca_mean"],
+        model["components"],
+    )
+
+
+def assign_segments(model: dict, df: pd.DataFrame) -> np.ndarray:
+    """Assigns new customers to the model's existing segments."""
+    return nearest_centroid(
+        transform(model, df), model["centroids"], chunk_rows=SCORING_CHUNK_ROWS
+    )
+
+
+def segment_names(model: dict) -> np.ndarray:
+    """Returns the segment name of every cluster id, indexed by label."""
+    names = np.array([f"Standard Segment {i}" for i in range(model["k"])], dtype=object)
+    ids = [int(profile["cluster_id"]) for profile in model["profiles"]]
+    names[ids] = name_segments(model["profiles"])
+    return names
+
+
+def score_frame(
+    model: dict, df: pd.DataFrame, names: np.ndarray | None = None
+) -> pd.DataFrame:
+    """Cleans, projects and assigns one chunk of customers.
+
+    Missing values and outliers are treated with the medians and caps saved
+    from the training data, never re-estimated from the chunk itself.
+    """
+    columns = resolve_feature_columns(model, df)
+    features = df[columns].rename(columns=dict(zip(columns, model["numeric_features"])))
+    if model["encoding"]:
+        features = features.join(df[list(model["encoding"]["columns"])])
+    features = apply_cleaning_params(features, model["cleaning_params"])
+    labels = assign_segments(model, features)
+    names = segment_names(model) if names is None else names
+    return pd.DataFrame({"cluster": labels, "segment_name": names[labels]})
+
+
+def project_centroids(model: dict, pca_model: dict) -> np.ndarray:
+    """Re-expresses a saved model's centroids in a newly fitted PCA space.
+
+    Centroids are mapped back to raw feature values through the saved PCA
+    and scaler, then forward through the new scaler and components, so runs
+    fitted on different months of data can be compared.
+    """
+    raw = (model["centroids"] @ model["components"] + model["pca_mean"]) * model[
+        "scaler_scale"
+    ] + model["scaler_mean"]
+    raw = pd.DataFrame(raw, columns=model["feature_names"])
+    numeric = pca_model.get("numeric_features", pca_model["feature_names"])
+    missing = [name for name in numeric if name not in raw.columns]
+    if missing:
+        raise KeyError(f"Previous model lacks features {missing}.")
+    # Categories the previous model never saw have an indicator mean of 0.
+    values = raw.reindex(columns=pca_model["feature_names"], fill_value=0.0).to_numpy()
+    scaled = (values - np.asarray(pca_model["scaler_mean"])) / np.asarray(
+        pca_model["scaler_scale"]
+    )
+    pca_mean = np.asarray(
+        pca_model.get("pca_mean", np.zeros(len(pca_model["feature_names"])))
+    )
+    return (scaled - pca_mean) @ np.asarray(pca_model["components"]).T
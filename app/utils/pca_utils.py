@@ -1,16 +1,69 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import StandardScaler
-from sklearn.decomposition import PCA
+from app.utils.encoding import encode, encoded_feature_names, fit_encoding
+from app.utils.dtypes import feature_dtype
+
+if TYPE_CHECKING:
+    from scipy import sparse
+
+MAX_SPARSE_COMPONENTS = 20
+
 
+def perform_pca(
+    df: pd.DataFrame,
+    categorical_columns: list[str] | None = None,
+    encoding_method: str = "onehot",
+) -> dict:
+    """Performs PCA on the given dataframe.
 
-def perform_pca(df: pd.DataFrame) -> dict:
-    """Performs PCA on the given dataframe."""
+    Numeric columns are standardized. Categorical columns, when given, are
+    either frequency-encoded and standardized with them, or one-hot encoded
+    as a sparse matrix with each indicator divided by the square root of
+    its frequency (FAMD weighting). The sparse case is decomposed with
+    ARPACK, which centres implicitly instead of densifying the matrix.
+    The scaled matrix and the scores use the configured feature dtype
+    (float32 by default).
+    """
+    from scipy import sparse
+    from sklearn.decomposition import PCA
+    from sklearn.preprocessing import StandardScaler
+
+    dtype = feature_dtype()
     numeric_df = df.select_dtypes(include=np.number)
+    numeric_features = numeric_df.columns.tolist()
+    encoding = (
+        fit_encoding(df, categorical_columns, encoding_method)
+        if categorical_columns
+        else None
+    )
+    values = numeric_df.to_numpy(dtype=dtype)
+    if encoding is not None and encoding["method"] == "frequency":
+        values = np.hstack([values, encode(df, encoding).astype(dtype)])
     scaler = StandardScaler()
-    scaled_data = scaler.fit_transform(numeric_df)
-    pca = PCA()
-    pca_result = pca.fit_transform(scaled_data)
+    scaled_data = scaler.fit_transform(values)
+    shift, scale = scaler.mean_, scaler.scale_
+    if encoding is not None and encoding["method"] == "onehot":
+        indicators = encode(df, encoding).astype(dtype)
+        weights = np.sqrt(np.concatenate(list(encoding["frequencies"].values())))
+        weights[weights == 0] = 1.0
+        design = sparse.hstack(
+            [
+                sparse.csr_matrix(scaled_data),
+                indicators @ sparse.diags((1.0 / weights).astype(dtype)),
+            ],
+            format="csr",
+        )
+        shift = np.concatenate([shift, np.zeros(len(weights))])
+        scale = np.concatenate([scale, weights])
+        n_components = min(MAX_SPARSE_COMPONENTS, min(design.shape) - 1)
+        pca = PCA(n_components=n_components, svd_solver="arpack", random_state=42)
+        pca_result = pca.fit_transform(design)
+    else:
+        pca = PCA()
+        pca_result = pca.fit_transform(scaled_data)
     eigenvalues = pca.explained_variance_
     results = {
         "pca_result": pca_result,
@@ -18,5 +71,35 @@ def perform_pca(df: pd.DataFrame) -> dict:
         "cumulative_variance": np.cumsum(pca.explained_variance_ratio_),
         "components": pca.components_,
         "eigenvalues": eigenvalues,
+        "feature_names": numeric_features
+        + (encoded_feature_names(encoding) if encoding else []),
+        "numeric_features": numeric_features,
+        "encoding": encoding,
+        "scaler_mean": shift,
+        "scaler_scale": scale,
+        "pca_mean": pca.mean_,
     }
-    return results
\ No newline at end of file
+    return results
+
+
+def project(
+    numeric: np.ndarray,
+    encoded: sparse.spmatrix | np.ndarray | None,
+    scaler_mean: np.ndarray,
+    scaler_scale: np.ndarray,
+    pca_mean: np.ndarray,
+    components: np.ndarray,
+) -> np.ndarray:
+    """Projects new rows with a fitted scaler and PCA, keeping one-hot blocks sparse."""
+    from scipy import sparse
+
+    p = numeric.shape[1]
+    scores = ((numeric - scaler_mean[:p]) / scaler_scale[:p]) @ components[:, :p].T
+    if encoded is not None and encoded.shape[1] > 0:
+        loadings = (components[:, p:] / scaler_scale[p:]).T
+        if sparse.issparse(encoded):
+            # One-hot columns are not shifted, so the product stays sparse.
+            scores += np.asarray(encoded @ loadings)
+        else:
+            scores += (encoded - scaler_mean[p:]) @ loadings
+    return scores - pca_mean @ components.T
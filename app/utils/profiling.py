@@ -0,0 +1,268 @@
+import cProfile
+import datetime
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable
+
+PROFILE_ENV_VAR = "CLIENT_SEGMENT_PROFILE"
+PROFILE_DIR_ENV_VAR = "CLIENT_SEGMENT_PROFILE_DIR"
+DEFAULT_PROFILE_DIR = ".profiles"
+SAMPLE_INTERVAL_S = 0.005
+MAX_CAPTURES = 50
+
+
+def get_profile_dir() -> Path:
+    """Returns the directory where profile captures are written."""
+    return Path(os.environ.get(PROFILE_DIR_ENV_VAR, DEFAULT_PROFILE_DIR))
+
+
+def profiling_enabled_by_env() -> bool:
+    return os.environ.get(PROFILE_ENV_VAR, "").strip().lower() in (
+        "1",
+        "true",
+        "yes",
+        "on",
+    )
+
+
+class _StackSampler(threading.Thread):
+    """Samples one thread's Python stack at a fixed interval into collapsed stacks."""
+
+    def __init__(self, interval: float):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self.target_thread: int | None = None
+        self._active = threading.Event()
+        self._stopped = threading.Event()
+
+    def resume(self, thread_id: int) -> None:
+        self.target_thread = thread_id
+        self._active.set()
+
+    def pause(self) -> None:
+        self._active.clear()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._active.set()
+
+    def run(self) -> None:
+        while not self._stopped.is_set():
+            self._active.wait()
+            if self._stopped.is_set():
+                break
+            frame = sys._current_frames().get(self.target_thread)
+            if frame is not None:
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(
+                        f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+                    )
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(names))] += 1
+            time.sleep(self.interval)
+
+
+class ProfileRun:
+    """One profiled pipeline run: a cProfile profile plus sampled stacks.
+
+    The run can be resumed and paused around each step of a generator
+    handler, so time spent waiting for the frontend between yields is
+    not attributed to the stage.
+    """
+
+    def __init__(self, stage: str, session: str = ""):
+        self.stage = stage
+        self.session = session
+        self.profiler = cProfile.Profile()
+        self.sampler = _StackSampler(SAMPLE_INTERVAL_S)
+        self.active_seconds = 0.0
+        self._enabled = False
+        self.started_at = datetime.datetime.now()
+        self.sampler.start()
+
+    def resume(self) -> float:
+        self.sampler.resume(threading.get_ident())
+        try:
+            self.profiler.enable()
+            self._enabled = True
+        except ValueError:
+            # Another profiler already owns this thread (e.g. a concurrent run).
+            self._enabled = False
+        return time.perf_counter()
+
+    def pause(self, resumed_at: float) -> None:
+        if self._enabled:
+            self.profiler.disable()
+        self.sampler.pause()
+        self.active_seconds += time.perf_counter() - resumed_at
+
+    def save(self) -> dict[str, str | float]:
+        """Writes the .pstats and .folded artifacts and returns their metadata."""
+        self.sampler.stop()
+        self.sampler.join(timeout=1)
+        profile_dir = get_profile_dir()
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        stamp = self.started_at.strftime("%Y%m%d-%H%M%S-%f")
+        session = f"_{self.session[:8]}" if self.session else ""
+        base = f"{stamp}_{self.stage}{session}"
+        self.profiler.dump_stats(profile_dir / f"{base}.pstats")
+        folded = "\n".join(
+            f"{stack} {count}" for stack, count in self.sampler.stacks.most_common()
+        )
+        (profile_dir / f"{base}.folded").write_text(folded)
+        self.profiler.create_stats()
+        meta = {
+            "name": base,
+            "stage": self.stage,
+            "created": self.started_at.strftime("%Y-%m-%d %H:%M:%S"),
+            "duration_s": round(self.active_seconds, 4),
+            "total_calls": int(sum(v[1] for v in self.profiler.stats.values())),
+            "samples": int(sum(self.sampler.stacks.values())),
+        }
+        (profile_dir / f"{base}.json").write_text(json.dumps(meta))
+        _prune_captures(profile_dir)
+        return meta
+
+
+def _prune_captures(profile_dir: Path) -> None:
+    metas = sorted(profile_dir.glob("*.json"), reverse=True)
+    for meta in metas[MAX_CAPTURES:]:
+        for suffix in (".json", ".pstats", ".folded"):
+            meta.with_suffix(suffix).unlink(missing_ok=True)
+
+
+def list_captures(limit: int = 20) -> list[dict[str, str | float]]:
+    """Lists the most recent profile captures, newest first."""
+    profile_dir = get_profile_dir()
+    if not profile_dir.exists():
+        return []
+    captures = []
+    for meta_path in sorted(profile_dir.glob("*.json"), reverse=True)[:limit]:
+        try:
+            captures.append(json.loads(meta_path.read_text()))
+        except (OSError, ValueError):
+            continue
+    return captures
+
+
+def read_capture(name: str, suffix: str) -> bytes:
+    """Returns the bytes of one capture artifact, rejecting paths outside the profile dir."""
+    if suffix not in (".pstats", ".folded") or Path(name).name != name:
+        raise ValueError(f"Invalid capture artifact: {name}{suffix}")
+    return (get_profile_dir() / f"{name}{suffix}").read_bytes()
+
+
+def _should_profile(state: Any) -> bool:
+    return profiling_enabled_by_env() or bool(
+        getattr(state, "profiling_enabled", False)
+    )
+
+
+def _session_token(state: Any) -> str:
+    try:
+        return str(state.router.session.client_token)
+    except Exception:
+        return ""
+
+
+class _Suspend:
+    """Hands a future from a driven coroutine over to the event loop."""
+
+    def __init__(self, future: Any):
+        self.future = future
+
+    def __await__(self):
+        return (yield self.future)
+
+
+async def _profiled_await(run: ProfileRun, awaitable: Any) -> Any:
+    """Awaits `awaitable`, profiling only while its own code runs.
+
+    The profiler is per thread, so it is paused whenever the awaitable
+    suspends; otherwise other sessions' handlers running on the event loop
+    meanwhile would be attributed to this run.
+    """
+    steps = awaitable.__await__()
+    value, error = None, None
+    while True:
+        resumed_at = run.resume()
+        try:
+            future = steps.throw(error) if error is not None else steps.send(value)
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            run.pause(resumed_at)
+        try:
+            value, error = await _Suspend(future), None
+        except BaseException as e:
+            value, error = None, e
+
+
+def profiled(stage: str) -> Callable:
+    """Wraps an AppState pipeline handler so each run can be profiled.
+
+    Profiling is active when the CLIENT_SEGMENT_PROFILE environment variable
+    is set or the session has `profiling_enabled` switched on. Sync and
+    async generator handlers are both supported.
+    """
+
+    def decorator(fn: Callable) -> Callable:
+        if inspect.isasyncgenfunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(self, *args, **kwargs):
+                if not _should_profile(self):
+                    async for event in fn(self, *args, **kwargs):
+                        yield event
+                    return
+                run = ProfileRun(stage, _session_token(self))
+                events = fn(self, *args, **kwargs)
+                try:
+                    while True:
+                        try:
+                            event = await _profiled_await(run, events.__anext__())
+                        except StopAsyncIteration:
+                            break
+                        yield event
+                finally:
+                    await events.aclose()
+                    run.save()
+                    self.profile_captures = list_captures()
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            if not _should_profile(self):
+                yield from fn(self, *args, **kwargs)
+                return
+            run = ProfileRun(stage, _session_token(self))
+            events = fn(self, *args, **kwargs)
+            try:
+                while True:
+                    resumed_at = run.resume()
+                    try:
+                        event = next(events)
+                    except StopIteration:
+                        break
+                    finally:
+                        run.pause(resumed_at)
+                    yield event
+            finally:
+                events.close()
+                run.save()
+                self.profile_captures = list_captures()
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+DRILLDOWN_PAGE_SIZE = 50
+
+
+def build_segment_index(labels: np.ndarray) -> dict[str, np.ndarray]:
+    """Groups row positions by cluster with one stable sort, in CSR layout.
+
+    `rows[offsets[i]:offsets[i + 1]]` are the rows of `cluster_ids[i]`, in
+    their original order, so any one segment is a slice rather than a scan.
+    """
+    labels = np.asarray(labels)
+    position_dtype = np.int32 if len(labels) < 2**31 else np.int64
+    rows = np.argsort(labels, kind="stable").astype(position_dtype)
+    cluster_ids, starts = np.unique(labels[rows], return_index=True)
+    return {
+        "cluster_ids": cluster_ids,
+        "offsets": np.append(starts, len(labels)).astype(np.int64),
+        "rows": rows,
+    }
+
+
+def segment_members(index: dict[str, np.ndarray], cluster_id: int) -> np.ndarray:
+    """Row positions of one cluster; empty for an unknown id."""
+    cluster_ids = index["cluster_ids"]
+    i = int(np.searchsorted(cluster_ids, cluster_id))
+    if i == len(cluster_ids) or cluster_ids[i] != cluster_id:
+        return index["rows"][:0]
+    return index["rows"][index["offsets"][i] : index["offsets"][i + 1]]
+
+
+def segment_page(
+    frame: pd.DataFrame,
+    members: np.ndarray,
+    page: int,
+    page_size: int = DRILLDOWN_PAGE_SIZE,
+    sort_by: str | None = None,
+    descending: bool = False,
+) -> np.ndarray:
+    """Row positions on one page of a segment, optionally ordered by a column.
+
+    Only the segment's own values are read. For a numeric column the rows
+    up to the end of the page are picked with argpartition, so early pages
+    cost O(segment size) instead of a full sort.
+    """
+    start = max(page, 0) * page_size
+    stop = min(start + page_size, len(members))
+    if start >= stop:
+        return members[:0]
+    if not sort_by:
+        return members[start:stop]
+    values = frame[sort_by].to_numpy()[members]
+    if pd.api.types.is_numeric_dtype(values.dtype):
+        keys = values.astype(np.float64)
+        keys = np.where(np.isnan(keys), np.inf, -keys if descending else keys)
+        if stop < len(keys):
+            head = np.argpartition(keys, stop - 1)[:stop]
+            order = head[np.argsort(keys[head], kind="stable")]
+        else:
+            order = np.argsort(keys, kind="stable")
+    else:
+        order = pd.Series(values).sort_values(
+            ascending=not descending, kind="stable", na_position="last"
+        ).index.to_numpy()
+    return members[order[start:stop]]
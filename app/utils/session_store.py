@@ -0,0 +1,312 @@
+import itertools
+import logging
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+import numpy as np
+import pandas as pd
+
+SESSION_BUDGET_ENV_VAR = "CLIENT_SEGMENT_SESSION_BUDGET_MB"
+TOTAL_BUDGET_ENV_VAR = "CLIENT_SEGMENT_MEMORY_BUDGET_MB"
+IDLE_TIMEOUT_ENV_VAR = "CLIENT_SEGMENT_SESSION_IDLE_S"
+SPILL_DIR_ENV_VAR = "CLIENT_SEGMENT_SPILL_DIR"
+DEFAULT_SESSION_BUDGET_MB = 512
+DEFAULT_TOTAL_BUDGET_MB = 4096
+DEFAULT_IDLE_TIMEOUT_S = 900
+DEFAULT_SPILL_DIR = ".session_data"
+# Spilled sessions untouched for this long are deleted from disk.
+SPILL_TTL_S = 24 * 3600
+SWEEP_INTERVAL_S = 30
+# A Python float in a list costs a pointer plus a boxed object.
+PY_FLOAT_BYTES = 32
+
+_sessions: dict[str, dict] = {}
+_lock = threading.RLock()
+_last_sweep = 0.0
+# Every stored dataset gets a new version, unique across sessions.
+_versions = itertools.count(1)
+# Disk writes and deletions run here, outside the lock and the event loop.
+_spill_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session-spill")
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return float(default)
+
+
+def session_budget_bytes() -> int:
+    return int(_env_number(SESSION_BUDGET_ENV_VAR, DEFAULT_SESSION_BUDGET_MB) * 2**20)
+
+
+def total_budget_bytes() -> int:
+    return int(_env_number(TOTAL_BUDGET_ENV_VAR, DEFAULT_TOTAL_BUDGET_MB) * 2**20)
+
+
+def idle_timeout_s() -> float:
+    return _env_number(IDLE_TIMEOUT_ENV_VAR, DEFAULT_IDLE_TIMEOUT_S)
+
+
+def spill_dir() -> Path:
+    return Path(os.environ.get(SPILL_DIR_ENV_VAR, DEFAULT_SPILL_DIR))
+
+
+def dataset_bytes(value: Any) -> int:
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sum(dataset_bytes(v) for v in value.values())
+    return 0
+
+
+def series_bytes(value: Any) -> int:
+    """Approximate size of chart series held as (nested) lists of floats in state."""
+    if isinstance(value, dict):
+        return sum(series_bytes(v) for v in value.values())
+    if isinstance(value, list):
+        return len(value) * PY_FLOAT_BYTES
+    return 0
+
+
+def _memory_bytes(session: dict) -> int:
+    return sum(
+        d["bytes"]
+        for d in session["datasets"].values()
+        if d["value"] is not None and not d["spilling"]
+    )
+
+
+def _is_current(session_id: str, name: str, dataset: dict) -> bool:
+    session = _sessions.get(session_id)
+    return session is not None and session["datasets"].get(name) is dataset
+
+
+def _write_spill(session_id: str, name: str, dataset: dict, path: Path) -> None:
+    """Writes a dataset queued by _spill, then releases it unless it was used since."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        pd.to_pickle(dataset["value"], path)
+    except OSError as e:
+        logging.warning(f"Could not spill session dataset {name}: {e}")
+        with _lock:
+            dataset["writing"] = dataset["spilling"] = False
+        return
+    with _lock:
+        dataset["writing"] = False
+        if not _is_current(session_id, name, dataset):
+            path.unlink(missing_ok=True)
+            return
+        dataset["path"] = path
+        if dataset["spilling"]:
+            dataset["value"] = None
+            dataset["spilling"] = False
+
+
+def _spill(session_id: str, name: str) -> None:
+    """Moves one dataset to disk; an unchanged dataset keeps its earlier file.
+
+    The file is written on the spill thread, so callers holding the lock
+    never wait for the disk. Until the write finishes the dataset stays
+    readable but no longer counts towards the memory budgets.
+    """
+    dataset = _sessions[session_id]["datasets"][name]
+    if dataset["value"] is None or dataset["spilling"]:
+        return
+    if dataset["path"] is not None:
+        dataset["value"] = None
+        return
+    dataset["spilling"] = True
+    if not dataset["writing"]:
+        dataset["writing"] = True
+        path = spill_dir() / session_id / f"{name}.{dataset['version']}.pkl"
+        _spill_thread.submit(_write_spill, session_id, name, dataset, path)
+
+
+def _spill_session(session_id: str, keep: str | None = None) -> None:
+    datasets = _sessions[session_id]["datasets"]
+    for name in sorted(datasets, key=lambda n: datasets[n]["used"]):
+        if name != keep:
+            _spill(session_id, name)
+
+
+def _drop(session_id: str) -> None:
+    _sessions.pop(session_id, None)
+    directory = spill_dir() / session_id
+    # Renaming is instant; the files are deleted on the spill thread.
+    dropped = directory.with_name(f"{session_id}.{next(_versions)}.dropped")
+    try:
+        directory.rename(dropped)
+    except OSError:
+        return
+    _spill_thread.submit(shutil.rmtree, dropped, ignore_errors=True)
+
+
+def _sweep(now: float) -> None:
+    """Spills idle sessions and forgets sessions idle for longer than SPILL_TTL_S."""
+    global _last_sweep
+    if now - _last_sweep < SWEEP_INTERVAL_S:
+        return
+    _last_sweep = now
+    idle_after = idle_timeout_s()
+    for session_id, session in list(_sessions.items()):
+        idle = now - session["used"]
+        if idle > SPILL_TTL_S:
+            _drop(session_id)
+        elif idle > idle_after:
+            _spill_session(session_id)
+
+
+def _enforce_budgets(session_id: str, keep: str) -> None:
+    """Spills least recently used datasets until both budgets are met.
+
+    Other sessions give way first under the total budget. The dataset just
+    stored or read (`keep`) stays in memory even if it alone exceeds a budget.
+    """
+    session = _sessions[session_id]
+    datasets = session["datasets"]
+    for name in sorted(datasets, key=lambda n: datasets[n]["used"]):
+        if _memory_bytes(session) <= session_budget_bytes():
+            break
+        if name != keep:
+            _spill(session_id, name)
+    budget = total_budget_bytes()
+    others = sorted(
+        (s for s in _sessions if s != session_id), key=lambda s: _sessions[s]["used"]
+    )
+    for other in others:
+        if sum(_memory_bytes(s) for s in _sessions.values()) <= budget:
+            return
+        _spill_session(other)
+    if sum(_memory_bytes(s) for s in _sessions.values()) > budget:
+        _spill_session(session_id, keep=keep)
+
+
+def put_dataset(
+    session_id: str, name: str, value: pd.DataFrame | np.ndarray | dict
+) -> None:
+    """Stores a session's dataset in memory, replacing any earlier version."""
+    now = time.monotonic()
+    with _lock:
+        session = _sessions.setdefault(session_id, {"datasets": {}, "used": now})
+        previous = session["datasets"].get(name)
+        if previous is not None and previous["path"] is not None:
+            _spill_thread.submit(previous["path"].unlink, missing_ok=True)
+        session["datasets"][name] = {
+            "value": value,
+            "bytes": dataset_bytes(value),
+            "path": None,
+            "used": now,
+            "version": next(_versions),
+            "spilling": False,
+            "writing": False,
+        }
+        session["used"] = now
+        _enforce_budgets(session_id, name)
+        _sweep(now)
+
+
+def _touch(session_id: str, name: str, dataset: dict, now: float) -> Any:
+    """Marks an in-memory dataset as used, cancelling a pending spill of it."""
+    dataset["spilling"] = False
+    dataset["used"] = _sessions[session_id]["used"] = now
+    _enforce_budgets(session_id, name)
+    _sweep(now)
+    return dataset["value"]
+
+
+def get_dataset(session_id: str, name: str, default: Any = None) -> Any:
+    """Returns a session's dataset, reading it back from disk if it was spilled.
+
+    The file is read without holding the store lock, so other sessions are
+    not blocked. A dataset replaced or dropped meanwhile is looked up again.
+    """
+    while True:
+        now = time.monotonic()
+        with _lock:
+            session = _sessions.get(session_id)
+            dataset = session["datasets"].get(name) if session else None
+            if dataset is None:
+                return default
+            if dataset["value"] is not None:
+                return _touch(session_id, name, dataset, now)
+            path = dataset["path"]
+        try:
+            value = pd.read_pickle(path)
+        except OSError:
+            with _lock:
+                if _is_current(session_id, name, dataset) and dataset["path"] == path:
+                    raise
+            continue
+        with _lock:
+            if not _is_current(session_id, name, dataset):
+                continue
+            if dataset["value"] is None:
+                dataset["value"] = value
+            return _touch(session_id, name, dataset, now)
+
+
+def dataset_version(session_id: str, name: str) -> int:
+    """Changes whenever the dataset is replaced; 0 when it was never stored."""
+    with _lock:
+        session = _sessions.get(session_id)
+        dataset = session["datasets"].get(name) if session else None
+        return dataset["version"] if dataset is not None else 0
+
+
+def has_session(session_id: str) -> bool:
+    """False once the session was dropped, e.g. after SPILL_TTL_S without use."""
+    with _lock:
+        return session_id in _sessions
+
+
+def drop_session(session_id: str) -> None:
+    with _lock:
+        _drop(session_id)
+
+
+def wait_for_spills() -> None:
+    """Blocks until every queued spill write and file deletion has finished."""
+    _spill_thread.submit(lambda: None).result()
+
+
+def _session_summary(session_id: str, now: float) -> dict[str, Any]:
+    session = _sessions[session_id]
+    return {
+        "session": session_id,
+        "memory_bytes": _memory_bytes(session),
+        "disk_bytes": sum(
+            d["bytes"] for d in session["datasets"].values() if d["path"] is not None
+        ),
+        "idle_s": now - session["used"],
+        "datasets": [
+            {
+                "name": name,
+                "bytes": d["bytes"],
+                "location": "memory"
+                if d["value"] is not None and not d["spilling"]
+                else "disk",
+            }
+            for name, d in session["datasets"].items()
+        ],
+    }
+
+
+def store_footprint() -> dict[str, Any]:
+    """Per-session and total dataset bytes held in memory and spilled to disk."""
+    now = time.monotonic()
+    with _lock:
+        sessions = [_session_summary(s, now) for s in _sessions]
+    return {
+        "sessions": sessions,
+        "memory_bytes": sum(s["memory_bytes"] for s in sessions),
+        "disk_bytes": sum(s["disk_bytes"] for s in sessions),
+        "session_budget_bytes": session_budget_bytes(),
+        "total_budget_bytes": total_budget_bytes(),
+    }
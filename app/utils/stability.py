@@ -0,0 +1,168 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator
+import numpy as np
+import pandas as pd
+from app.utils.clustering_utils import (
+    perform_clustering,
+    perform_hierarchical_clustering,
+)
+
+DEFAULT_BOOTSTRAPS = 30
+MIN_BOOTSTRAPS = 8
+CONVERGENCE_TOL = 0.01
+# Ward linkage is quadratic in memory, so resamples are capped (m-out-of-n bootstrap).
+MAX_RESAMPLE_ROWS = 10_000
+
+_points: np.ndarray | None = None
+
+
+def _init_worker(points: np.ndarray) -> None:
+    global _points
+    _points = points
+    # One BLAS/OpenMP thread per worker process avoids oversubscription.
+    from threadpoolctl import threadpool_limits
+
+    threadpool_limits(1)
+
+
+def _fit_resample(
+    task: tuple[int, int, int, bool],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray | None]:
+    seed, size, k, hierarchical = task
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(len(_points), size=size, replace=True)
+    sample = pd.DataFrame(_points[rows])
+    km_labels = perform_clustering(sample, k)
+    hc_labels = perform_hierarchical_clustering(sample, k) if hierarchical else None
+    # Duplicated rows always share a label, so keeping the first copy is lossless.
+    unique_rows, first = np.unique(rows, return_index=True)
+    return (
+        unique_rows,
+        km_labels[first],
+        hc_labels[first] if hc_labels is not None else None,
+    )
+
+
+def cluster_jaccard(reference: np.ndarray, labels: np.ndarray) -> dict[int, float]:
+    """Best Jaccard overlap of each reference cluster with any resampled cluster."""
+    from sklearn.metrics.cluster import contingency_matrix
+
+    ref_ids, ref_codes = np.unique(reference, return_inverse=True)
+    table = contingency_matrix(ref_codes, labels)
+    union = table.sum(axis=1)[:, None] + table.sum(axis=0)[None, :] - table
+    jaccard = (table / union).max(axis=1)
+    return {int(c): float(j) for c, j in zip(ref_ids, jaccard)}
+
+
+def _summarize(
+    runs: list[dict], clusters: list[int], converged: bool, target: int
+) -> dict:
+    summary = {
+        "runs": len(runs),
+        "target_runs": target,
+        "converged": converged,
+        "methods": [],
+        "clusters": [],
+    }
+    for method in ("kmeans", "hierarchical"):
+        scores = [run[f"{method}_ari"] for run in runs if f"{method}_ari" in run]
+        if not scores:
+            continue
+        summary["methods"].append(
+            {
+                "method": "KMeans" if method == "kmeans" else "Hierarchical",
+                "ari_mean": round(float(np.mean(scores)), 4),
+                "ari_std": round(float(np.std(scores)), 4),
+            }
+        )
+    cross = [run["cross_ari"] for run in runs if "cross_ari" in run]
+    if cross:
+        summary["methods"].append(
+            {
+                "method": "KMeans vs Hierarchical",
+                "ari_mean": round(float(np.mean(cross)), 4),
+                "ari_std": round(float(np.std(cross)), 4),
+            }
+        )
+    for cluster_id in clusters:
+        row = {"cluster_id": cluster_id}
+        for method in ("kmeans", "hierarchical"):
+            values = [
+                run[f"{method}_jaccard"][cluster_id]
+                for run in runs
+                if cluster_id in run.get(f"{method}_jaccard", {})
+            ]
+            if values:
+                row[f"{method}_jaccard"] = round(float(np.mean(values)), 4)
+        summary["clusters"].append(row)
+    return summary
+
+
+def iter_bootstrap_stability(
+    pca_df: pd.DataFrame,
+    k: int,
+    kmeans_labels: np.ndarray,
+    hierarchical_labels: np.ndarray | None = None,
+    n_bootstraps: int = DEFAULT_BOOTSTRAPS,
+    max_workers: int | None = None,
+    tol: float = CONVERGENCE_TOL,
+    random_state: int = 42,
+) -> Iterator[dict]:
+    """Re-clusters bootstrap resamples in a process pool and yields running summaries.
+
+    Each resample is clustered with both methods and compared with the
+    reference labels on the resampled rows (ARI and per-cluster Jaccard,
+    as in Hennig's clusterboot). The two methods are also compared with
+    each other on the same resample. Runs are submitted in batches of one
+    per worker; sampling stops early once the standard error of the
+    KMeans ARI drops below `tol`.
+    """
+    from sklearn.metrics import adjusted_rand_score
+
+    points = pca_df.to_numpy(dtype=np.float64)
+    kmeans_labels = np.asarray(kmeans_labels)
+    hierarchical = hierarchical_labels is not None and len(hierarchical_labels) > 0
+    if hierarchical:
+        hierarchical_labels = np.asarray(hierarchical_labels)
+    size = min(len(points), MAX_RESAMPLE_ROWS)
+    seeds = np.random.SeedSequence(random_state).generate_state(n_bootstraps)
+    workers = max(1, min(max_workers or os.cpu_count() or 1, n_bootstraps))
+    clusters = sorted(int(c) for c in np.unique(kmeans_labels))
+    runs: list[dict] = []
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(points,),
+    ) as pool:
+        for start in range(0, n_bootstraps, workers):
+            tasks = [
+                (int(seed), size, int(k), hierarchical)
+                for seed in seeds[start : start + workers]
+            ]
+            for rows, km, hc in pool.map(_fit_resample, tasks):
+                run = {
+                    "kmeans_ari": adjusted_rand_score(kmeans_labels[rows], km),
+                    "kmeans_jaccard": cluster_jaccard(kmeans_labels[rows], km),
+                }
+                if hc is not None:
+                    run["hierarchical_ari"] = adjusted_rand_score(
+                        hierarchical_labels[rows], hc
+                    )
+                    run["hierarchical_jaccard"] = cluster_jaccard(
+                        hierarchical_labels[rows], hc
+                    )
+                    run["cross_ari"] = adjusted_rand_score(km, hc)
+                runs.append(run)
+            scores = [run["kmeans_ari"] for run in runs]
+            stderr = (
+                np.std(scores, ddof=1) / np.sqrt(len(scores))
+                if len(scores) > 1
+                else np.inf
+            )
+            converged = len(runs) >= MIN_BOOTSTRAPS and stderr < tol
+            yield _summarize(runs, clusters, converged, n_bootstraps)
+            if converged:
+                return
@@ -0,0 +1,109 @@
+import hashlib
+import json
+from typing import Any
+
+# Each stage lists the stages whose output it reads and the AppState vars
+# that parameterise it, in dependency order. "segmentation" stands for
+# whichever of K-Means or HDBSCAN produced the current profiles, and
+# "warm_start_version" for the saved model an incremental run starts from.
+STAGES: dict[str, dict[str, tuple[str, ...]]] = {
+    "upload": {"after": (), "params": ()},
+    "cleaning": {"after": ("upload",), "params": ()},
+    "pca": {"after": ("cleaning",), "params": ("categorical_encoding",)},
+    "elbow": {"after": ("pca",), "params": ("k_min", "k_max")},
+    "clustering": {
+        "after": ("pca",),
+        "params": (
+            "num_clusters",
+            "clustering_sample_size",
+            "incremental_mode",
+            "warm_start_version",
+        ),
+    },
+    "hierarchical": {"after": ("pca",), "params": ("num_clusters",)},
+    "density": {"after": ("pca",), "params": ("density_min_cluster_size",)},
+    "profiles": {"after": ("segmentation",), "params": ()},
+    "insights": {"after": ("profiles",), "params": ()},
+}
+SEGMENTATION_STAGES = {"K-Means": "clustering", "HDBSCAN": "density"}
+STAGE_PARAMS = sorted(
+    {p for stage in STAGES.values() for p in stage["params"]} | {"segmentation_method"}
+)
+
+
+def source_fingerprint(uploads: list[tuple[str, bytes]]) -> str:
+    """Hash of the uploaded bytes; file names only count when files are merged."""
+    digest = hashlib.blake2b(digest_size=16)
+    for name, content in uploads:
+        if len(uploads) > 1:
+            digest.update(name.encode())
+        digest.update(hashlib.blake2b(content, digest_size=16).digest())
+    return digest.hexdigest()
+
+
+def upstream(stage: str, params: dict[str, Any]) -> tuple[str, ...]:
+    return tuple(
+        SEGMENTATION_STAGES[params["segmentation_method"]]
+        if name == "segmentation"
+        else name
+        for name in STAGES[stage]["after"]
+    )
+
+
+def _digest(stage: str, inputs: list[str], params: dict[str, Any]) -> str:
+    values = [params[name] for name in STAGES[stage]["params"]]
+    payload = json.dumps([stage, inputs, values], default=str).encode()
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def stage_fingerprint(
+    stage: str, recorded: dict[str, str], params: dict[str, Any]
+) -> str | None:
+    """Fingerprint a run of `stage` records now, from the upstream runs it reads.
+
+    None when an upstream stage has never run.
+    """
+    inputs = [recorded.get(name) for name in upstream(stage, params)]
+    if None in inputs:
+        return None
+    return _digest(stage, inputs, params)
+
+
+def expected_fingerprints(
+    recorded: dict[str, str], params: dict[str, Any]
+) -> dict[str, str | None]:
+    """Fingerprint each stage would have if everything upstream were fresh.
+
+    Built from the upstream expectations rather than the recorded runs, so
+    one stale stage makes everything downstream of it stale too.
+    """
+    expected = {"upload": recorded.get("upload")}
+    for stage in list(STAGES)[1:]:
+        inputs = [expected[name] for name in upstream(stage, params)]
+        expected[stage] = None if None in inputs else _digest(stage, inputs, params)
+    return expected
+
+
+def stage_status(recorded: dict[str, str], params: dict[str, Any]) -> dict[str, str]:
+    """'fresh', 'stale' (inputs or parameters changed since the run) or 'missing'."""
+    expected = expected_fingerprints(recorded, params)
+    return {
+        stage: "missing"
+        if stage not in recorded
+        else ("fresh" if recorded[stage] == expected[stage] else "stale")
+        for stage in STAGES
+    }
+
+
+def stale_stages(recorded: dict[str, str], params: dict[str, Any]) -> list[str]:
+    """Stages to re-run, in dependency order. Stages that never ran are left out.
+
+    The segmentation behind the profiles comes after the other segmentation
+    stages, so re-running them does not change which one is active.
+    """
+    status = stage_status(recorded, params)
+    order = list(STAGES)
+    active = upstream("profiles", params)[0]
+    order.remove(active)
+    order.insert(order.index("profiles"), active)
+    return [stage for stage in order if status[stage] == "stale"]
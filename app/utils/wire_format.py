@@ -0,0 +1,81 @@
+import hashlib
+import os
+import numpy as np
+import pandas as pd
+
+WIRE_DECIMALS_ENV_VAR = "CLIENT_SEGMENT_WIRE_DECIMALS"
+DEFAULT_WIRE_DECIMALS = 4
+
+
+def wire_decimals() -> int:
+    """Number of decimals kept for chart coordinates sent to the browser."""
+    try:
+        return int(os.environ.get(WIRE_DECIMALS_ENV_VAR, DEFAULT_WIRE_DECIMALS))
+    except ValueError:
+        return DEFAULT_WIRE_DECIMALS
+
+
+def _compact_matrix(values: np.ndarray, decimals: int) -> np.ndarray:
+    # float32 drops the noise digits; rounding in float64 keeps the JSON short.
+    return np.round(values.astype(np.float32).astype(np.float64), decimals)
+
+
+def fingerprint(*arrays: np.ndarray) -> str:
+    """Cheap content hash used to skip re-sending unchanged state vars."""
+    digest = hashlib.blake2b(digest_size=16)
+    for arr in arrays:
+        arr = np.ascontiguousarray(arr)
+        digest.update(str((arr.dtype, arr.shape)).encode())
+        digest.update(arr.tobytes())
+    return digest.hexdigest()
+
+
+def columnar_series(
+    df: pd.DataFrame, columns: list[str], decimals: int | None = None
+) -> dict[str, list[float]]:
+    """Encodes the given columns as one rounded float array per column.
+
+    This replaces the list-of-records layout, which repeats every key for
+    every point, with `{"PC1": [...], "PC2": [...]}`.
+    """
+    decimals = wire_decimals() if decimals is None else decimals
+    values = _compact_matrix(df[columns].to_numpy(), decimals)
+    return {col: values[:, j].tolist() for j, col in enumerate(columns)}
+
+
+def columnar_series_by_label(
+    df: pd.DataFrame,
+    labels: np.ndarray,
+    columns: list[str],
+    decimals: int | None = None,
+) -> dict[int, dict[str, list[float]]]:
+    """Splits the given columns into one columnar series per cluster label.
+
+    Rows are grouped with a single stable sort instead of one boolean
+    filter per cluster.
+    """
+    decimals = wire_decimals() if decimals is None else decimals
+    labels = np.asarray(labels)
+    values = _compact_matrix(df[columns].to_numpy(), decimals)
+    order = np.argsort(labels, kind="stable")
+    unique, starts = np.unique(labels[order], return_index=True)
+    bounds = list(starts[1:]) + [len(order)]
+    series = {}
+    for label, start, stop in zip(unique, starts, bounds):
+        rows = values[order[start:stop]]
+        series[int(label)] = {col: rows[:, j].tolist() for j, col in enumerate(columns)}
+    return series
+
+
+def round_records(
+    records: list[dict[str, str | int | float]], decimals: int | None = None
+) -> list[dict[str, str | int | float]]:
+    """Rounds float values of small tables such as PCA loadings."""
+    decimals = wire_decimals() if decimals is None else decimals
+    return [
+        {
+            key: round(float(value), decimals) if isinstance(value, float) else value
+            for key, value in record.items()
+        }
+        for record in records
+    ]
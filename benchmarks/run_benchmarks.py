@@ -0,0 +1,400 @@
+import argparse
+import asyncio
+import datetime
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks.synthetic import generate_customers
+from app.utils.cleaning_pipeline import clean_data
+from app.utils.pca_utils import perform_pca
+from app.utils.clustering_utils import (
+    compute_elbow_data,
+    perform_clustering,
+    perform_sampled_clustering,
+    perform_hierarchical_clustering,
+    perform_density_clustering,
+    compute_dendrogram_data,
+    generate_cluster_profiles,
+    centroid_distances,
+    compute_centroids,
+)
+from app.utils.distributed_kmeans import perform_distributed_clustering
+from app.utils.knn_graph import build_knn_graph
+from app.utils.segment_index import build_segment_index
+from app.utils.insights_utils import classify_customers, generate_marketing_insights
+from app.utils.dtypes import precision_check
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+SAMPLED_CLUSTERING_ROWS = 50_000
+DISTRIBUTED_SHARDS = 4
+
+# Seconds `import app.app` may add on top of Reflex, Starlette and pandas.
+IMPORT_BUDGET_S = 0.5
+# Scientific modules the app must only import from the handlers that use them.
+DEFERRED_MODULES = ["sklearn", "scipy.stats", "scipy.cluster", "scipy.sparse"]
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import numpy, pandas, reflex, reflex.app, reflex.config, reflex.state
+import starlette.applications
+framework = time.perf_counter()
+import app.app
+done = time.perf_counter()
+print(json.dumps({
+    "framework_s": framework - start,
+    "app_s": done - framework,
+    "loaded": [m for m in %r if m in sys.modules],
+}))
+""" % (DEFERRED_MODULES,)
+
+# Upper row limits for slow stages (ten K-Means fits per k in the elbow scan,
+# Ward linkage over the kNN graph); larger sizes are recorded as skipped.
+MAX_ROWS = {
+    "compute_elbow_data": 200_000,
+    "perform_hierarchical_clustering": 50_000,
+    "app_state_pipeline": 50_000,
+}
+
+
+def _pca_frame(results: dict) -> pd.DataFrame:
+    return pd.DataFrame(
+        results["pca_result"],
+        columns=[f"PC{i + 1}" for i in range(results["pca_result"].shape[1])],
+    )
+
+
+def _drive(handler, *args) -> None:
+    """Runs a Reflex event handler body to completion outside the server."""
+    events = handler(*args)
+    if hasattr(events, "__anext__"):
+
+        async def consume():
+            async for _ in events:
+                pass
+
+        asyncio.run(consume())
+    elif hasattr(events, "__next__"):
+        for _ in events:
+            pass
+
+
+def run_app_pipeline(csv_bytes: bytes, k: int) -> Any:
+    """Runs upload → clean → PCA → elbow → cluster → insights through AppState."""
+    import reflex as rx
+    from app.state import AppState
+
+    state = AppState(_reflex_internal_init=True)
+    handlers = {name: h.fn for name, h in AppState.event_handlers.items()}
+    upload = rx.UploadFile(
+        file=io.BytesIO(csv_bytes),
+        path=Path("synthetic_customers.csv"),
+    )
+    _drive(handlers["handle_upload"], state, [upload])
+    for name, args in [
+        ("run_cleaning", ()),
+        ("run_pca", ()),
+        ("compute_elbow_method", ()),
+        ("run_clustering", (k,)),
+        ("generate_insights", ()),
+    ]:
+        _drive(handlers[name], state, *args)
+    if state.current_stage != "Insights Generated":
+        raise RuntimeError(f"Pipeline stopped at stage '{state.current_stage}'.")
+    return state
+
+
+def build_cases(df: pd.DataFrame, k: int) -> list[tuple[str, Callable[[], Any]]]:
+    """Prepares the inputs of every stage once and returns timed callables."""
+    cleaned_df, _, _ = clean_data(df)
+    pca_df = _pca_frame(perform_pca(cleaned_df))
+    clusters = perform_clustering(pca_df, k)
+    profiles = generate_cluster_profiles(cleaned_df, clusters)
+    csv_cache: list[bytes] = []
+
+    def app_pipeline():
+        if not csv_cache:
+            csv_cache.append(df.to_csv(index=False).encode())
+        return run_app_pipeline(csv_cache[0], k)
+
+    return [
+        ("clean_data", lambda: clean_data(df)),
+        ("perform_pca", lambda: perform_pca(cleaned_df)),
+        ("build_knn_graph", lambda: build_knn_graph(pca_df.to_numpy())),
+        ("compute_elbow_data", lambda: compute_elbow_data(pca_df)),
+        ("perform_clustering", lambda: perform_clustering(pca_df, k)),
+        (
+            "perform_sampled_clustering",
+            lambda: perform_sampled_clustering(pca_df, k, SAMPLED_CLUSTERING_ROWS),
+        ),
+        (
+            "perform_distributed_clustering",
+            lambda: perform_distributed_clustering(
+                pca_df, k, n_shards=DISTRIBUTED_SHARDS
+            ),
+        ),
+        (
+            "perform_hierarchical_clustering",
+            lambda: perform_hierarchical_clustering(pca_df, k),
+        ),
+        ("perform_density_clustering", lambda: perform_density_clustering(pca_df)),
+        ("compute_dendrogram_data", lambda: compute_dendrogram_data(pca_df)),
+        (
+            "generate_cluster_profiles",
+            lambda: generate_cluster_profiles(cleaned_df, clusters),
+        ),
+        ("build_segment_index", lambda: build_segment_index(clusters)),
+        (
+            "centroid_distances",
+            lambda: centroid_distances(
+                pca_df.to_numpy(), compute_centroids(pca_df, clusters), clusters
+            ),
+        ),
+        (
+            "generate_marketing_insights",
+            lambda: generate_marketing_insights(profiles),
+        ),
+        ("classify_customers", lambda: classify_customers(cleaned_df)),
+        ("app_state_pipeline", app_pipeline),
+    ]
+
+
+def time_call(fn: Callable[[], Any], repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run_suite(
+    sizes: list[int],
+    repeat: int = 3,
+    seed: int = 42,
+    k: int = 4,
+    only: list[str] | None = None,
+    no_limits: bool = False,
+) -> list[dict[str, Any]]:
+    results = []
+    for n_rows in sizes:
+        df = generate_customers(n_rows, seed=seed)
+        for name, fn in build_cases(df, k):
+            if only and name not in only:
+                continue
+            limit = MAX_ROWS.get(name)
+            if limit is not None and n_rows > limit and not no_limits:
+                results.append(
+                    {
+                        "benchmark": name,
+                        "rows": n_rows,
+                        "skipped": f"exceeds max_rows={limit}",
+                    }
+                )
+                continue
+            timings = time_call(fn, repeat)
+            results.append(
+                {
+                    "benchmark": name,
+                    "rows": n_rows,
+                    "median_s": statistics.median(timings),
+                    "min_s": min(timings),
+                    "timings_s": timings,
+                }
+            )
+            print(
+                f"{name:<34} rows={n_rows:<10} median={statistics.median(timings):.4f}s"
+            )
+    return results
+
+
+def run_precision_checks(
+    sizes: list[int], seed: int = 42, k: int = 4
+) -> list[dict[str, Any]]:
+    """Compares float32 against float64 clustering of the PCA scores per size."""
+    results = []
+    for n_rows in sizes:
+        cleaned = clean_data(generate_customers(n_rows, seed=seed))[0]
+        scores = perform_pca(cleaned)["pca_result"]
+        check = precision_check(scores, k, random_state=seed)
+        results.append({"rows": n_rows, **check})
+        print(
+            f"{'precision_check':<34} rows={n_rows:<10} "
+            f"centroid_diff={check['centroid_max_abs_diff']:.2e} "
+            f"silhouette_diff={check['silhouette_abs_diff']:.2e}"
+        )
+    return results
+
+
+def measure_import_time(repeat: int = 3) -> dict[str, Any]:
+    """Times a cold `import app.app` in fresh interpreters.
+
+    The framework imports are timed first, so `app_s` is what the app's own
+    modules (and anything they pull in) add to backend start and reload.
+    """
+    runs = []
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-c", IMPORT_PROBE],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    result = {
+        "framework_s": statistics.median(r["framework_s"] for r in runs),
+        "app_s": statistics.median(r["app_s"] for r in runs),
+        "deferred_modules_loaded": runs[0]["loaded"],
+    }
+    print(
+        f"{'import app.app':<34} framework={result['framework_s']:.3f}s "
+        f"app={result['app_s']:.3f}s"
+    )
+    return result
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare_results(
+    baseline: dict, current: dict, threshold: float
+) -> list[dict[str, Any]]:
+    """Lists benchmarks whose median slowed down by more than `threshold`."""
+    base = {
+        (r["benchmark"], r["rows"]): r
+        for r in baseline["results"]
+        if "median_s" in r
+    }
+    regressions = []
+    for r in current["results"]:
+        old = base.get((r["benchmark"], r["rows"]))
+        if old is None or "median_s" not in r:
+            continue
+        ratio = r["median_s"] / old["median_s"] if old["median_s"] > 0 else 1.0
+        if ratio > 1 + threshold:
+            regressions.append(
+                {
+                    "benchmark": r["benchmark"],
+                    "rows": r["rows"],
+                    "baseline_s": old["median_s"],
+                    "current_s": r["median_s"],
+                    "ratio": ratio,
+                }
+            )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Time app/utils stages and the AppState pipeline on synthetic data."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--only", nargs="+", help="Run only these benchmarks.")
+    parser.add_argument(
+        "--no-limits",
+        action="store_true",
+        help="Ignore the per-benchmark row limits for quadratic stages.",
+    )
+    parser.add_argument(
+        "--skip-precision",
+        action="store_true",
+        help="Skip the float32 vs float64 clustering precision check.",
+    )
+    parser.add_argument(
+        "--import-budget",
+        type=float,
+        default=IMPORT_BUDGET_S,
+        help="Seconds `import app.app` may add on top of the framework imports.",
+    )
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="Baseline JSON to check for regressions.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Allowed slowdown ratio before a benchmark counts as a regression.",
+    )
+    args = parser.parse_args()
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "seed": args.seed,
+            "k": args.k,
+            "repeat": args.repeat,
+        },
+        "results": run_suite(
+            args.sizes,
+            repeat=args.repeat,
+            seed=args.seed,
+            k=args.k,
+            only=args.only,
+            no_limits=args.no_limits,
+        ),
+        "import": measure_import_time(args.repeat),
+        "precision": (
+            []
+            if args.skip_precision
+            else run_precision_checks(args.sizes, seed=args.seed, k=args.k)
+        ),
+    }
+    Path(args.output).write_text(json.dumps(report, indent=2))
+    print(f"Results written to {args.output}")
+    imports = report["import"]
+    if imports["app_s"] > args.import_budget or imports["deferred_modules_loaded"]:
+        print(
+            f"IMPORT app.app took {imports['app_s']:.3f}s "
+            f"(budget {args.import_budget:.3f}s), eagerly loaded: "
+            f"{imports['deferred_modules_loaded'] or 'none'}"
+        )
+        return 1
+    failed = [r["rows"] for r in report["precision"] if not r["within_tolerance"]]
+    if failed:
+        print(f"PRECISION float32 results outside tolerance for rows={failed}")
+        return 1
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        regressions = compare_results(baseline, report, args.threshold)
+        for reg in regressions:
+            print(
+                f"REGRESSION {reg['benchmark']} rows={reg['rows']}: "
+                f"{reg['baseline_s']:.4f}s -> {reg['current_s']:.4f}s (x{reg['ratio']:.2f})"
+            )
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+import argparse
+import numpy as np
+import pandas as pd
+
+ROLE_COLUMNS = {
+    "income": "Monthly Income (€)",
+    "savings": "Savings Amount (€)",
+    "credit": "Credit Balance (€)",
+    "spending": "Monthly Card Spending (€)",
+    "age": "Age",
+    "seniority": "Bank Seniority (years)",
+}
+
+# Latent segment prototypes: (weight, mean per role, relative spread per role).
+SEGMENT_PROTOTYPES = [
+    (
+        0.20,
+        {"income": 5200, "savings": 32000, "credit": 1500, "spending": 900, "age": 48, "seniority": 14},
+        {"income": 0.20, "savings": 0.30, "credit": 0.50, "spending": 0.30, "age": 0.15, "seniority": 0.30},
+    ),
+    (
+        0.25,
+        {"income": 3100, "savings": 3500, "credit": 2500, "spending": 1400, "age": 33, "seniority": 5},
+        {"income": 0.25, "savings": 0.40, "credit": 0.40, "spending": 0.25, "age": 0.15, "seniority": 0.40},
+    ),
+    (
+        0.20,
+        {"income": 2600, "savings": 6000, "credit": 1200, "spending": 600, "age": 27, "seniority": 2},
+        {"income": 0.20, "savings": 0.40, "credit": 0.50, "spending": 0.30, "age": 0.10, "seniority": 0.50},
+    ),
+    (
+        0.20,
+        {"income": 3400, "savings": 18000, "credit": 800, "spending": 500, "age": 62, "seniority": 24},
+        {"income": 0.20, "savings": 0.35, "credit": 0.60, "spending": 0.30, "age": 0.08, "seniority": 0.20},
+    ),
+    (
+        0.15,
+        {"income": 2100, "savings": 1500, "credit": 9000, "spending": 800, "age": 41, "seniority": 8},
+        {"income": 0.20, "savings": 0.50, "credit": 0.25, "spending": 0.30, "age": 0.20, "seniority": 0.40},
+    ),
+]
+
+
+def _segment_block(
+    rng: np.random.Generator, n_rows: int, n_segments: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Draws latent segment ids and the six role values for one block of rows."""
+    prototypes = SEGMENT_PROTOTYPES[:n_segments]
+    weights = np.array([p[0] for p in prototypes])
+    weights = weights / weights.sum()
+    segments = rng.choice(len(prototypes), size=n_rows, p=weights)
+    values = np.empty((n_rows, len(ROLE_COLUMNS)), dtype=np.float64)
+    for seg_id, (_, means, spreads) in enumerate(prototypes):
+        mask = segments == seg_id
+        count = int(mask.sum())
+        if count == 0:
+            continue
+        for j, role in enumerate(ROLE_COLUMNS):
+            values[mask, j] = rng.normal(
+                means[role], means[role] * spreads[role], size=count
+            )
+    return (segments, values)
+
+
+def generate_customers(
+    n_rows: int,
+    seed: int = 42,
+    n_segments: int = 5,
+    missing_rate: float = 0.01,
+    outlier_rate: float = 0.005,
+    duplicate_fraction: float = 0.01,
+    return_segments: bool = False,
+) -> pd.DataFrame | tuple[pd.DataFrame, np.ndarray]:
+    """Generates a seeded synthetic bank-customer table with latent segments.
+
+    Rows carry the six profiled roles using the same column names as
+    assets/bank_customers.csv. A `missing_rate` share of cells is blanked,
+    an `outlier_rate` share of cells is pushed 6-10 standard deviations out
+    and a `duplicate_fraction` share of rows are exact copies of other rows.
+    """
+    if not 1 <= n_segments <= len(SEGMENT_PROTOTYPES):
+        raise ValueError(
+            f"n_segments must be between 1 and {len(SEGMENT_PROTOTYPES)}, got {n_segments}."
+        )
+    rng = np.random.default_rng(seed)
+    n_duplicates = int(n_rows * duplicate_fraction)
+    n_unique = n_rows - n_duplicates
+    segments, values = _segment_block(rng, n_unique, n_segments)
+    col_std = values.std(axis=0)
+    outlier_mask = rng.random(values.shape) < outlier_rate
+    if outlier_mask.any():
+        signs = rng.choice([-1.0, 1.0], size=int(outlier_mask.sum()))
+        scale = rng.uniform(6, 10, size=int(outlier_mask.sum()))
+        cols = np.nonzero(outlier_mask)[1]
+        values[outlier_mask] += signs * scale * col_std[cols]
+    values[:, :4] = np.abs(values[:, :4]).round(2)
+    values[:, 4] = np.clip(values[:, 4], 18, 95).round()
+    values[:, 5] = np.clip(values[:, 5], 0, 60).round()
+    if n_duplicates > 0:
+        source_rows = rng.integers(0, n_unique, size=n_duplicates)
+        values = np.vstack([values, values[source_rows]])
+        segments = np.concatenate([segments, segments[source_rows]])
+        order = rng.permutation(n_rows)
+        values = values[order]
+        segments = segments[order]
+    values[rng.random(values.shape) < missing_rate] = np.nan
+    df = pd.DataFrame(values, columns=list(ROLE_COLUMNS.values()))
+    if return_segments:
+        return (df, segments)
+    return df
+
+
+def write_customers_csv(
+    path: str,
+    n_rows: int,
+    seed: int = 42,
+    chunk_size: int = 1_000_000,
+    **kwargs,
+) -> int:
+    """Writes `n_rows` synthetic customers to CSV in bounded-memory chunks.
+
+    Each chunk is generated from its own child seed, so files of 50M rows
+    never need to fit in memory and the output is reproducible for a seed.
+    """
+    seeds = np.random.SeedSequence(seed).spawn((n_rows + chunk_size - 1) // chunk_size)
+    written = 0
+    for i, child in enumerate(seeds):
+        rows = min(chunk_size, n_rows - written)
+        chunk = generate_customers(
+            rows, seed=int(child.generate_state(1)[0]), **kwargs
+        )
+        chunk.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+        written += rows
+    return written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic bank-customer CSV."
+    )
+    parser.add_argument("output", help="Path of the CSV file to write.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--segments", type=int, default=5)
+    parser.add_argument("--missing-rate", type=float, default=0.01)
+    parser.add_argument("--outlier-rate", type=float, default=0.005)
+    parser.add_argument("--duplicate-fraction", type=float, default=0.01)
+    parser.add_argument("--chunk-size", type=int, default=1_000_000)
+    args = parser.parse_args()
+    written = write_customers_csv(
+        args.output,
+        args.rows,
+        seed=args.seed,
+        chunk_size=args.chunk_size,
+        n_segments=args.segments,
+        missing_rate=args.missing_rate,
+        outlier_rate=args.outlier_rate,
+        duplicate_fraction=args.duplicate_fraction,
+    )
+    print(f"Wrote {written} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
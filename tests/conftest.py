@@ -0,0 +1,31 @@
+import pandas as pd
+import pytest
+from app.utils.cleaning_pipeline import clean_data
+from app.utils.clustering_utils import (
+    compute_centroids,
+    generate_cluster_profiles,
+    perform_clustering,
+    resolve_column_roles,
+)
+from app.utils.model_store import build_model
+from app.utils.pca_utils import perform_pca
+
+SAMPLE = "assets/bank_customers.csv"
+
+
+@pytest.fixture(scope="session")
+def fitted():
+    """Cleaned sample rows, their K-Means labels (k=3) and the model bundle."""
+    raw = pd.read_csv(SAMPLE)
+    cleaned, _, _, params = clean_data(raw, return_params=True)
+    pca = perform_pca(cleaned)
+    pca_df = pd.DataFrame(pca["pca_result"]).add_prefix("PC")
+    labels = perform_clustering(pca_df, 3)
+    model = build_model(
+        pca,
+        compute_centroids(pca_df, labels),
+        resolve_column_roles(cleaned),
+        generate_cluster_profiles(cleaned, labels),
+        params,
+    )
+    return cleaned, labels, model
@@ -0,0 +1,107 @@
+import io
+import numpy as np
+import pandas as pd
+import pytest
+from starlette.testclient import TestClient
+from app import api as scoring_api
+from app.api import ANONYMOUS_ENV_VAR, API_KEY_ENV_VAR, api
+from app.utils.model_store import MODEL_DIR_ENV_VAR, pinned_versions, save_model
+
+
+@pytest.fixture
+def version(fitted, tmp_path, monkeypatch):
+    """Version of the fitted model, saved as the only bundle."""
+    monkeypatch.setenv(MODEL_DIR_ENV_VAR, str(tmp_path))
+    monkeypatch.setenv(API_KEY_ENV_VAR, "secret")
+    monkeypatch.delenv(ANONYMOUS_ENV_VAR, raising=False)
+    return save_model(dict(fitted[2]))
+
+
+@pytest.fixture
+def client(version):
+    return TestClient(api, headers={"X-API-Key": "secret"})
+
+
+def _csv(df: pd.DataFrame) -> bytes:
+    return df.to_csv(index=False).encode("utf-8")
+
+
+def test_csv_round_trip_matches_the_training_labels(fitted, client, version):
+    cleaned, labels, _ = fitted
+    customers = cleaned.assign(customer_id=np.arange(len(cleaned)) + 1000)
+    response = client.post(
+        "/api/score?id_column=customer_id",
+        content=_csv(customers),
+        headers={"Content-Type": "text/csv"},
+    )
+    assert response.status_code == 200
+    assert response.headers["x-model-version"] == version
+    scored = pd.read_csv(io.StringIO(response.text))
+    assert list(scored.columns) == ["customer_id", "cluster", "segment_name"]
+    assert scored["customer_id"].tolist() == customers["customer_id"].tolist()
+    np.testing.assert_array_equal(scored["cluster"].to_numpy(), labels)
+
+
+def test_rows_are_numbered_without_an_id_column(fitted, client):
+    cleaned = fitted[0]
+    response = client.post("/api/score", content=_csv(cleaned.head(5)))
+    assert pd.read_csv(io.StringIO(response.text))["row"].tolist() == [0, 1, 2, 3, 4]
+
+
+def test_unsupported_format_is_rejected(fitted, client):
+    response = client.post("/api/score?format=xlsx", content=_csv(fitted[0]))
+    assert response.status_code == 400
+
+
+def test_requested_versions_are_pinned(fitted, client, version):
+    assert client.post("/api/score", content=_csv(fitted[0])).status_code == 200
+    assert pinned_versions() == set()
+    response = client.post(f"/api/score?model={version}", content=_csv(fitted[0]))
+    assert response.status_code == 200
+    assert pinned_versions() == {version}
+
+
+def test_unknown_model_is_not_found(fitted, client):
+    response = client.post("/api/score?model=missing", content=_csv(fitted[0]))
+    assert response.status_code == 404
+
+
+def test_input_the_model_cannot_score_is_rejected(fitted, client):
+    cleaned = fitted[0]
+    response = client.post(
+        "/api/score", content=_csv(cleaned.drop(columns=cleaned.columns[1]))
+    )
+    assert response.status_code == 400
+    bad_id = client.post("/api/score?id_column=nope", content=_csv(cleaned))
+    assert bad_id.status_code == 400
+
+
+def test_api_key_is_checked(fitted, client):
+    body = _csv(fitted[0].head(5))
+    assert client.post("/api/score", content=body).status_code == 200
+    wrong = client.post("/api/score", content=body, headers={"X-API-Key": "nope"})
+    assert wrong.status_code == 401
+    anonymous = TestClient(api).post("/api/score", content=body)
+    assert anonymous.status_code == 401
+
+
+def test_scoring_is_disabled_without_a_configured_key(fitted, version, monkeypatch):
+    monkeypatch.delenv(API_KEY_ENV_VAR)
+    body = _csv(fitted[0].head(5))
+    assert TestClient(api).post("/api/score", content=body).status_code == 503
+    monkeypatch.setenv(ANONYMOUS_ENV_VAR, "1")
+    assert TestClient(api).post("/api/score", content=body).status_code == 200
+
+
+def test_oversized_bodies_are_refused(fitted, client, monkeypatch):
+    monkeypatch.setattr(scoring_api, "SCORING_MAX_BYTES", 1024)
+    response = client.post("/api/score", content=_csv(fitted[0]))
+    assert response.status_code == 413
+
+    def chunks():
+        body = _csv(fitted[0])
+        for start in range(0, len(body), 512):
+            yield body[start : start + 512]
+
+    # Without a Content-Length header the limit is enforced while streaming.
+    assert client.post("/api/score", content=chunks()).status_code == 413
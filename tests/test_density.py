@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+from app.utils import clustering_utils
+from app.utils.clustering_utils import (
+    NOISE_LABEL,
+    compute_centroids,
+    generate_cluster_profiles,
+    perform_density_clustering,
+    silhouette,
+)
+
+SAMPLE = "assets/bank_customers.csv"
+
+
+def _blobs_with_outliers(seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    centers = np.array([[0.0, 0.0], [8.0, 0.0], [0.0, 8.0]])
+    blobs = [rng.normal(c, 0.3, size=(100, 2)) for c in centers]
+    outliers = np.array([[40.0, 0.0], [0.0, 40.0], [-30.0, -30.0]])
+    return pd.DataFrame(np.vstack(blobs + [outliers]), columns=["PC1", "PC2"])
+
+
+@pytest.mark.parametrize("exact_max_rows", [20_000, 100])
+def test_blobs_become_segments_and_outliers_noise(exact_max_rows, monkeypatch):
+    # A low row limit sends the run through the kNN-graph path.
+    monkeypatch.setattr(clustering_utils, "EXACT_DENSITY_MAX_ROWS", exact_max_rows)
+    result = perform_density_clustering(_blobs_with_outliers(), min_cluster_size=20)
+    labels = result["labels"]
+    assert result["method"] == ("exact" if exact_max_rows > 303 else "knn_graph")
+    assert result["n_clusters"] == 3
+    assert (labels[-3:] == NOISE_LABEL).all()
+    assert all(len(set(labels[i : i + 100])) == 1 for i in (0, 100, 200))
+
+
+def test_noise_profile_is_listed_last():
+    df = pd.read_csv(SAMPLE).dropna()
+    labels = np.arange(len(df)) % 3 - 1
+    profiles = generate_cluster_profiles(df, labels)
+    assert [p["cluster_id"] for p in profiles] == [0, 1, NOISE_LABEL]
+    assert sum(p["size"] for p in profiles) == len(df)
+
+
+def test_noise_rows_are_left_out_of_centroids_and_silhouette():
+    points = pd.DataFrame({"PC1": [0.0, 1.0, 10.0, 11.0, 100.0]})
+    labels = np.array([0, 0, 1, 1, NOISE_LABEL])
+    np.testing.assert_allclose(compute_centroids(points, labels), [[0.5], [10.5]])
+    assert silhouette(points, labels) == silhouette(points[:4], labels[:4])
+    assert silhouette(points, np.array([0, 0, 0, 0, NOISE_LABEL])) == 0.0
@@ -0,0 +1,67 @@
+import copy
+import pickle
+import numpy as np
+import pytest
+from app.utils import session_store
+from app.utils.derived import DerivedCache, derived
+from app.utils.session_store import put_dataset
+
+
+class Holder:
+    """Minimal stand-in for AppState: a session key, a cache and one var."""
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.scale = 1
+        self.calls = 0
+        self._derived = DerivedCache()
+
+    def _session_key(self) -> str:
+        return self.session_id
+
+    @derived("values", params=("scale",))
+    def total(self) -> float:
+        self.calls += 1
+        values = session_store.get_dataset(self.session_id, "values")
+        return float(values.sum()) * self.scale
+
+
+@pytest.fixture(autouse=True)
+def store(monkeypatch, tmp_path):
+    monkeypatch.setenv(session_store.SPILL_DIR_ENV_VAR, str(tmp_path))
+    monkeypatch.setattr(session_store, "_sessions", {})
+    yield
+    session_store.wait_for_spills()
+
+
+def test_value_is_reused_until_a_dataset_is_replaced():
+    holder = Holder("a")
+    put_dataset("a", "values", np.arange(4))
+    assert holder.total == holder.total == 6.0
+    assert holder.calls == 1
+    put_dataset("a", "values", np.arange(5))
+    assert holder.total == 10.0
+    assert holder.calls == 2
+
+
+def test_value_is_recomputed_when_a_param_changes():
+    holder = Holder("a")
+    put_dataset("a", "values", np.arange(4))
+    assert holder.total == 6.0
+    holder.scale = 2
+    assert holder.total == 12.0
+    assert holder.calls == 2
+
+
+def test_sessions_do_not_share_entries():
+    first, second = Holder("a"), Holder("b")
+    put_dataset("a", "values", np.arange(4))
+    put_dataset("b", "values", np.arange(3))
+    assert (first.total, second.total) == (6.0, 3.0)
+
+
+def test_cache_is_dropped_on_copy_and_pickle():
+    cache = DerivedCache()
+    cache.get("x", (1,), lambda: "value")
+    assert copy.deepcopy(cache)._entries == {}
+    assert pickle.loads(pickle.dumps(cache))._entries == {}
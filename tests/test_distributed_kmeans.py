@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans
+from app.utils.distributed_kmeans import (
+    LocalTransport,
+    perform_distributed_clustering,
+    write_shards,
+)
+
+
+def _blobs(n_per_blob: int = 300, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    centers = np.array([[0.0, 0.0], [6.0, 0.0], [0.0, 6.0]])
+    points = np.vstack([rng.normal(c, 0.3, size=(n_per_blob, 2)) for c in centers])
+    return pd.DataFrame(points.astype(np.float32), columns=["PC1", "PC2"])
+
+
+def test_write_shards_splits_rows_contiguously(tmp_path):
+    df = _blobs(10)
+    paths = write_shards(df, 4, tmp_path)
+    shards = [np.load(path) for path in paths]
+    assert [len(s) for s in shards] == [7, 8, 7, 8]
+    assert all(s.dtype == np.float64 for s in shards)
+    np.testing.assert_allclose(np.vstack(shards), df.to_numpy())
+
+
+def _agree(a: np.ndarray, b: np.ndarray) -> bool:
+    """Same partition up to a relabelling."""
+    pairs = set(zip(a.tolist(), b.tolist()))
+    return len(pairs) == len(set(a.tolist())) == len(set(b.tolist()))
+
+
+def test_memory_mapped_and_sent_shards_give_the_same_segments(tmp_path):
+    df = _blobs()
+    mapped = perform_distributed_clustering(df, 3, n_shards=2)
+    with LocalTransport(2) as transport:
+        sent = perform_distributed_clustering(df, 3, transport)
+    with LocalTransport(2) as transport:
+        shared = perform_distributed_clustering(df, 3, transport, shard_dir=tmp_path)
+    assert len(mapped["labels"]) == len(df)
+    assert _agree(mapped["labels"], sent["labels"])
+    assert _agree(mapped["labels"], shared["labels"])
+    assert list(tmp_path.iterdir()) == []
+    # Each blob is one segment.
+    assert all(len(set(mapped["labels"][i : i + 300])) == 1 for i in (0, 300, 600))
+
+
+def test_sharded_kmeans_matches_single_process_kmeans():
+    df = _blobs()
+    with LocalTransport(2) as transport:
+        result = perform_distributed_clustering(df, 3, transport)
+    reference = KMeans(n_clusters=3, n_init=10, random_state=0).fit(df).labels_
+    assert _agree(result["labels"], reference)
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+from app.utils.dtypes import compact_frame, label_array, precision_check
+
+
+def test_compact_frame_downcasts_integers_and_keeps_currency_exact():
+    df = pd.DataFrame(
+        {
+            "age": np.arange(100, dtype=np.int64),
+            "income": np.full(100, 131_072.37),
+            "city": ["Paris", "Lyon"] * 50,
+            "customer": [f"c{i}" for i in range(100)],
+        }
+    )
+    compact = compact_frame(df)
+    assert compact["age"].dtype == np.int8
+    assert compact["income"].dtype == np.float64
+    assert compact["city"].dtype == "category"
+    # Mostly distinct strings are not worth a category.
+    assert compact["customer"].dtype == df["customer"].dtype
+    pd.testing.assert_frame_equal(compact.astype(df.dtypes.to_dict()), df)
+
+
+def test_label_array_picks_the_smallest_type():
+    assert label_array([]).dtype == np.int8
+    assert label_array([-1, 0, 5]).dtype == np.int8
+    assert label_array([0, 300]).dtype == np.int16
+
+
+def test_float32_clustering_stays_within_tolerance():
+    rng = np.random.default_rng(0)
+    points = rng.normal(size=(2_000, 4))
+    assert precision_check(points, 4)["within_tolerance"]
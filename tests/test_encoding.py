@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import sparse
+from app.utils.encoding import (
+    MAX_CATEGORIES,
+    detect_categorical_columns,
+    encode,
+    encoded_feature_names,
+    fit_encoding,
+)
+from app.utils.ingest import SOURCE_FILE_COLUMN
+from app.utils.pca_utils import perform_pca, project
+
+
+def _customers(n_rows: int = 120, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "income": rng.normal(3000, 500, n_rows),
+            "age": rng.integers(18, 80, n_rows),
+            "region": rng.choice(["north", "south", "east"], n_rows),
+            "product": rng.choice(["basic", "gold"], n_rows, p=[0.8, 0.2]),
+        }
+    )
+
+
+def test_detection_stops_at_the_category_limit():
+    n_rows = 2 * MAX_CATEGORIES
+    df = pd.DataFrame(
+        {
+            "amount": np.arange(n_rows, dtype=float),
+            "branch": [f"b{i % MAX_CATEGORIES}" for i in range(n_rows)],
+            "customer_id": [f"c{i % (MAX_CATEGORIES + 1)}" for i in range(n_rows)],
+            SOURCE_FILE_COLUMN: ["a.csv"] * n_rows,
+        }
+    )
+    assert detect_categorical_columns(df) == ["branch"]
+
+
+def test_one_hot_marks_missing_and_unseen_values_with_empty_rows():
+    encoding = fit_encoding(
+        pd.DataFrame({"region": ["north", "north", "south"]}), ["region"], "onehot"
+    )
+    assert encoded_feature_names(encoding) == ["region=north", "region=south"]
+    matrix = encode(pd.DataFrame({"region": ["south", None, "west"]}), encoding)
+    assert sparse.issparse(matrix)
+    np.testing.assert_array_equal(matrix.toarray(), [[0, 1], [0, 0], [0, 0]])
+
+
+def test_frequency_encoding_of_unseen_values_is_zero():
+    encoding = fit_encoding(
+        pd.DataFrame({"region": ["north", "north", "south", "east"]}),
+        ["region"],
+        "frequency",
+    )
+    encoded = encode(pd.DataFrame({"region": ["north", "east", "west"]}), encoding)
+    np.testing.assert_allclose(encoded[:, 0], [0.5, 0.25, 0.0])
+
+
+@pytest.mark.parametrize("method", ["onehot", "frequency"])
+def test_projecting_the_training_rows_reproduces_their_scores(method):
+    df = _customers()
+    results = perform_pca(df, ["region", "product"], method)
+    numeric = df[results["numeric_features"]].to_numpy(dtype=np.float64)
+    scores = project(
+        numeric,
+        encode(df, results["encoding"]),
+        results["scaler_mean"],
+        results["scaler_scale"],
+        results["pca_mean"],
+        results["components"],
+    )
+    # PCA scores are stored as float32.
+    np.testing.assert_allclose(scores, results["pca_result"], rtol=1e-5, atol=1e-5)
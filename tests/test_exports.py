@@ -0,0 +1,28 @@
+import io
+import numpy as np
+import pandas as pd
+from app.utils.exports import open_export, register_export
+
+
+def test_export_is_loaded_when_it_is_downloaded():
+    frame = pd.DataFrame({"age": [31, 42, 53]})
+    loads = []
+
+    def load():
+        loads.append(1)
+        return frame, {"cluster": np.array([0, 1, 0])}
+
+    token = register_export(load, "customers.csv")
+    assert loads == []
+    filename, _, stream = open_export(token)
+    assert filename == "customers.csv" and loads == [1]
+    exported = pd.read_csv(io.BytesIO(b"".join(stream)))
+    assert exported.to_dict("list") == {"age": [31, 42, 53], "cluster": [0, 1, 0]}
+    assert open_export(token) is None
+
+
+def test_export_of_replaced_data_is_not_found():
+    def load():
+        raise LookupError("replaced")
+
+    assert open_export(register_export(load, "customers.csv")) is None
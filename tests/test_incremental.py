@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+from app.utils.clustering_utils import (
+    align_labels,
+    perform_incremental_clustering,
+    segment_drift,
+)
+
+
+def _blobs(centers: np.ndarray, per_blob: int = 100, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    points = np.vstack([rng.normal(c, 0.1, size=(per_blob, 2)) for c in centers])
+    return pd.DataFrame(points, columns=["PC1", "PC2"])
+
+
+CENTERS = np.array([[0.0, 0.0], [5.0, 0.0], [0.0, 5.0]])
+
+
+def test_align_labels_matches_permuted_centroids():
+    new = CENTERS[[2, 0, 1]] + 0.05
+    np.testing.assert_array_equal(align_labels(CENTERS, new), [2, 0, 1])
+
+
+def test_align_labels_skips_empty_ids_and_numbers_new_clusters_after():
+    previous = np.array([[0.0, 0.0], [np.nan, np.nan], [5.0, 0.0]])
+    new = np.array([[5.1, 0.0], [0.1, 0.0], [9.0, 9.0]])
+    mapping = align_labels(previous, new)
+    assert mapping[0] == 2 and mapping[1] == 0
+    # Only two previous centroids are valid, so the third cluster is new.
+    assert mapping[2] == 3
+
+
+def test_segment_drift_reports_matched_new_and_retired_segments():
+    previous = np.array([[0.0, 0.0], [5.0, 0.0]])
+    centroids = np.array([[0.0, 1.0], [np.nan, np.nan], [9.0, 9.0]])
+    labels = np.array([0, 0, 0, 2])
+    drift = {
+        d["cluster_id"]: d
+        for d in segment_drift(previous, {0: 2, 1: 2}, centroids, labels)
+    }
+    assert drift[0]["status"] == "matched"
+    assert drift[0]["centroid_shift"] == 1.0
+    assert (drift[0]["size"], drift[0]["share"]) == (3, 75.0)
+    assert drift[1]["status"] == "retired" and drift[1]["size"] == 0
+    assert drift[2]["status"] == "new" and drift[2]["previous_size"] == 0
+
+
+def test_incremental_clustering_keeps_previous_ids():
+    data = _blobs(CENTERS, seed=1)
+    previous = CENTERS[[1, 2, 0]]
+    result = perform_incremental_clustering(data, 3, previous)
+    labels = result["labels"]
+    # The blobs around CENTERS[0], [1] and [2] were ids 2, 0 and 1 previously.
+    assert set(labels[:100]) == {2}
+    assert set(labels[100:200]) == {0}
+    assert set(labels[200:]) == {1}
+    np.testing.assert_allclose(result["centroids"], previous, atol=0.05)
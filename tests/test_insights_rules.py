@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+from app.utils.insights_utils import (
+    DEFAULT_RECOMMENDATIONS,
+    SEGMENT_RULES,
+    classify_customers,
+    generate_marketing_insights,
+    match_rules,
+    name_segments,
+)
+
+
+def legacy_segment_name(profile: dict[str, str | int | float]) -> str:
+    """The per-row if/elif chain the rule table replaced."""
+    income = float(profile["avg_income"])
+    savings = float(profile["avg_savings"])
+    spend = float(profile["avg_spend"])
+    age = float(profile["avg_age"])
+    seniority = float(profile["avg_seniority"])
+    if income > 4000 and savings > 20000:
+        return "Premium Savers"
+    if spend > 1000 and savings < 5000:
+        return "Active Spenders"
+    if age < 35 and seniority < 5:
+        return "Young Professionals"
+    if age > 55 and seniority > 15:
+        return "Loyal Veterans"
+    if income < 2500 and float(profile["avg_credit"]) > 7000:
+        return "Credit Dependent"
+    if income > 3500:
+        return "High-Income Earners"
+    if savings > 15000:
+        return "Diligent Savers"
+    return f"Standard Segment {profile['cluster_id']}"
+
+
+def _profiles(n: int, seed: int = 0) -> list[dict[str, str | int | float]]:
+    rng = np.random.default_rng(seed)
+    # Values are drawn from each threshold and its neighbours so that
+    # every rule, every boundary and the fallback are exercised.
+    choices = {
+        "avg_income": [2000, 2500, 3000, 3500, 3600, 4000, 4500],
+        "avg_savings": [1000, 5000, 10000, 15000, 18000, 20000, 25000],
+        "avg_credit": [1000, 7000, 8000],
+        "avg_spend": [500, 1000, 1500],
+        "avg_age": [25, 35, 45, 55, 60],
+        "avg_seniority": [2, 5, 10, 15, 20],
+    }
+    return [
+        {
+            "cluster_id": i,
+            "size": int(rng.integers(1, 100)),
+            **{field: float(rng.choice(values)) for field, values in choices.items()},
+        }
+        for i in range(n)
+    ]
+
+
+def test_rule_table_names_profiles_like_the_legacy_chain():
+    profiles = _profiles(5_000)
+    assert name_segments(profiles) == [legacy_segment_name(p) for p in profiles]
+
+
+def test_every_rule_and_the_fallback_are_exercised():
+    names = set(name_segments(_profiles(5_000)))
+    assert {rule["name"] for rule in SEGMENT_RULES} <= names
+    assert any(name.startswith("Standard Segment") for name in names)
+
+
+def test_profile_values_may_be_formatted_strings():
+    profile = {k: str(v) for k, v in _profiles(1)[0].items()}
+    assert name_segments([profile]) == [legacy_segment_name(profile)]
+
+
+def test_classify_customers_matches_the_legacy_chain_per_row():
+    df = pd.read_csv("assets/bank_customers.csv").dropna()
+    names = classify_customers(df)
+    expected = [
+        legacy_segment_name(
+            {
+                "cluster_id": "",
+                "avg_income": row["Monthly Income (€)"],
+                "avg_savings": row["Savings Amount (€)"],
+                "avg_credit": row["Credit Balance (€)"],
+                "avg_spend": row["Monthly Card Spending (€)"],
+                "avg_age": row["Age"],
+                "avg_seniority": row["Bank Seniority (years)"],
+            }
+        ).strip()
+        for _, row in df.iterrows()
+    ]
+    assert list(names) == expected
+
+
+def test_match_rules_without_rules_matches_nothing():
+    features = {"income": np.array([1.0, 2.0])}
+    np.testing.assert_array_equal(match_rules(features, []), [-1, -1])
+
+
+def test_insights_carry_the_recommendations_of_their_rule():
+    profiles = _profiles(500)
+    by_name = {rule["name"]: rule["recommendations"] for rule in SEGMENT_RULES}
+    insights = generate_marketing_insights(profiles)
+    assert [i["segment_name"] for i in insights] == name_segments(profiles)
+    for insight in insights:
+        expected = by_name.get(insight["segment_name"], DEFAULT_RECOMMENDATIONS)
+        assert insight["recommendations"] == expected
+    assert abs(sum(i["percentage"] for i in insights) - 100) < 1e-9
+    assert generate_marketing_insights([]) == []
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+from app.utils.k_selection import gap_choice, gap_statistic, knee_point
+
+
+def test_knee_of_a_sharp_elbow():
+    ks = list(range(1, 9))
+    k, strength = knee_point(ks, [100, 40, 10, 8, 7, 6, 5.5, 5])
+    assert k == 3
+    assert strength == pytest.approx(90 / 95 - 2 / 7)
+
+
+def test_straight_line_has_no_clear_knee():
+    _, strength = knee_point([2, 3, 4, 5], [40, 30, 20, 10])
+    assert strength == pytest.approx(0.0, abs=1e-12)
+
+
+def _gaps(values: list[float], error: float) -> list[dict[str, int | float]]:
+    return [
+        {"k": k, "gap": gap, "gap_error": error}
+        for k, gap in enumerate(values, start=2)
+    ]
+
+
+def test_gap_choice_takes_the_first_k_within_one_error_of_the_next():
+    assert gap_choice(_gaps([0.1, 0.5, 0.52, 0.6], 0.05)) == 3
+
+
+def test_gap_choice_falls_back_to_the_largest_gap():
+    assert gap_choice(_gaps([0.1, 0.2, 0.3, 0.4], 0.01)) == 5
+
+
+def test_gap_statistic_finds_separated_blobs():
+    rng = np.random.default_rng(0)
+    centers = np.array([[0.0, 0.0], [10.0, 0.0], [0.0, 10.0]])
+    points = np.vstack([rng.normal(c, 0.5, size=(50, 2)) for c in centers])
+    gap_data = gap_statistic(
+        pd.DataFrame(points), [2, 3, 4, 5], n_references=3, max_workers=1
+    )
+    assert [row["k"] for row in gap_data] == [2, 3, 4, 5]
+    assert gap_choice(gap_data) == 3
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.spatial.distance import cdist
+from app.utils import knn_graph as knn
+from app.utils.knn_graph import build_knn_graph, connectivity, knn_consistency
+
+
+@pytest.fixture(autouse=True)
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setenv(knn.KNN_DIR_ENV_VAR, str(tmp_path))
+    monkeypatch.setattr(knn, "_graphs", knn.OrderedDict())
+    return tmp_path
+
+
+def _points(n_rows: int = 200, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).normal(size=(n_rows, 3))
+
+
+def test_graph_holds_each_rows_nearest_other_rows():
+    points = _points()
+    graph = build_knn_graph(points, n_neighbors=5, n_jobs=1)
+    distances = cdist(points, points)
+    np.fill_diagonal(distances, np.inf)
+    expected = np.sort(distances, axis=1)[:, :5]
+    assert (np.diff(graph.indptr) == 5).all()
+    nearest = np.sort(graph.toarray(), axis=1)[:, -5:]
+    np.testing.assert_allclose(nearest, expected, rtol=1e-6)
+
+
+def test_connectivity_is_a_symmetric_zero_one_matrix():
+    adjacency = connectivity(build_knn_graph(_points(), n_neighbors=4, n_jobs=1))
+    assert (adjacency != adjacency.T).nnz == 0
+    assert set(np.unique(adjacency.data)) == {1.0}
+    assert adjacency.diagonal().sum() == 0
+
+
+def test_knn_consistency_counts_neighbour_pairs_in_the_same_cluster():
+    # Two tight pairs far apart: each point's only neighbour is its partner.
+    points = np.array([[0.0], [0.1], [10.0], [10.1]])
+    graph = build_knn_graph(points, n_neighbors=1, n_jobs=1)
+    assert knn_consistency(graph, np.array([0, 0, 1, 1])) == 1.0
+    assert knn_consistency(graph, np.array([0, 1, 1, 0])) == 0.0
+    assert knn_consistency(graph, np.array([0, 0, 0, 1])) == 0.5
+
+
+def test_graph_is_read_back_from_the_disk_cache(cache, monkeypatch):
+    pca_df = pd.DataFrame(_points(), columns=["PC1", "PC2", "PC3"])
+    built = knn.knn_graph(pca_df, n_neighbors=5)
+    assert len(list(cache.glob("*.npz"))) == 1
+    monkeypatch.setattr(knn, "_graphs", knn.OrderedDict())
+
+    def rebuild(*args, **kwargs):
+        raise AssertionError("the cached graph should be reused")
+
+    monkeypatch.setattr(knn, "build_knn_graph", rebuild)
+    loaded = knn.knn_graph(pca_df, n_neighbors=5)
+    assert (loaded != built).nnz == 0
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+from app.utils import model_store
+from app.utils.clustering_utils import compute_centroids
+from app.utils.model_store import (
+    list_models,
+    load_model,
+    pin_models,
+    pinned_versions,
+    save_model,
+    score_frame,
+)
+
+
+def test_compute_centroids_leaves_empty_ids_nan():
+    points = pd.DataFrame({"PC1": [0.0, 2.0, 10.0], "PC2": [0.0, 2.0, 10.0]})
+    centroids = compute_centroids(points, np.array([0, 0, 2]))
+    np.testing.assert_allclose(centroids[[0, 2]], [[1.0, 1.0], [10.0, 10.0]])
+    assert np.isnan(centroids[1]).all()
+
+
+def test_compute_centroids_without_rows():
+    points = pd.DataFrame({"PC1": [], "PC2": []})
+    assert compute_centroids(points, np.array([], dtype=int)).shape == (0, 2)
+
+
+def test_save_and_load_round_trip(fitted, tmp_path):
+    _, _, model = fitted
+    version = save_model(dict(model), tmp_path)
+    loaded = load_model(version, tmp_path)
+    assert loaded["version"] == version
+    assert loaded["k"] == 3
+    assert loaded["feature_names"] == model["feature_names"]
+    for name in model_store.MODEL_ARRAYS:
+        np.testing.assert_allclose(loaded[name], model[name])
+    assert load_model(None, tmp_path)["version"] == version
+
+
+def test_load_rejects_paths_as_versions(tmp_path):
+    with pytest.raises(ValueError):
+        load_model("../elsewhere", tmp_path)
+
+
+def test_scoring_the_training_rows_reproduces_their_labels(fitted, tmp_path):
+    cleaned, labels, model = fitted
+    loaded = load_model(save_model(dict(model), tmp_path), tmp_path)
+    scored = score_frame(loaded, cleaned)
+    np.testing.assert_array_equal(scored["cluster"].to_numpy(), labels)
+    assert scored["segment_name"].notna().all()
+
+
+def test_scoring_resolves_renamed_columns(fitted):
+    cleaned, labels, model = fitted
+    renamed = cleaned.rename(columns={"Monthly Income (€)": "monthly_income"})
+    scored = score_frame(model, renamed)
+    np.testing.assert_array_equal(scored["cluster"].to_numpy(), labels)
+
+
+def test_old_bundles_are_pruned(fitted, tmp_path, monkeypatch):
+    _, _, model = fitted
+    monkeypatch.setattr(model_store, "MAX_MODELS", 3)
+    versions = [
+        save_model(dict(model, version=f"20260101-00000{i}-test"), tmp_path)
+        for i in range(5)
+    ]
+    assert [m["version"] for m in list_models(tmp_path)] == versions[:1:-1]
+    assert len(list(tmp_path.glob("*.npz"))) == 3
+
+
+def _save_versions(model, directory, start, count):
+    return [
+        save_model(dict(model, version=f"20260101-{i:06d}-test"), directory)
+        for i in range(start, start + count)
+    ]
+
+
+def test_pinned_bundles_survive_pruning(fitted, tmp_path, monkeypatch):
+    _, _, model = fitted
+    monkeypatch.setattr(model_store, "MAX_MODELS", 3)
+    (pinned,) = _save_versions(model, tmp_path, 0, 1)
+    pin_models("api-client", [pinned], tmp_path)
+    newest = _save_versions(model, tmp_path, 1, 6)
+    saved = [m["version"] for m in list_models(tmp_path)]
+    assert saved == newest[:2:-1] + [pinned]
+    assert load_model(pinned, tmp_path)["k"] == 3
+    pin_models("api-client", [], tmp_path)
+    _save_versions(model, tmp_path, 7, 1)
+    assert pinned not in [m["version"] for m in list_models(tmp_path)]
+
+
+def test_lapsed_pins_are_released(tmp_path):
+    pin_models("session", ["a", "b"], tmp_path, ttl_s=60)
+    pin_models("expired", ["c"], tmp_path, ttl_s=-1)
+    assert pinned_versions(tmp_path) == {"a", "b"}
+    assert not (tmp_path / model_store.PINS_DIR / "expired.json").exists()
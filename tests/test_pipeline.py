@@ -0,0 +1,44 @@
+import json
+import pandas as pd
+from app.cli import main
+from app.pipeline import process_file
+
+SAMPLE = "assets/bank_customers.csv"
+
+
+def test_summary_counts_every_customer_once(tmp_path):
+    summary = process_file(SAMPLE, tmp_path, k=4, elbow=False)
+    assert summary["status"] == "ok"
+    segments = summary["segments"]
+    assert sorted(s["cluster_id"] for s in segments) == [0, 1, 2, 3]
+    assert sum(s["size"] for s in segments) == summary["rows"]
+    written = json.loads((tmp_path / "bank_customers" / "run_summary.json").read_text())
+    assert written == summary
+
+
+def test_artifacts_match_the_summary(tmp_path):
+    summary = process_file(SAMPLE, tmp_path, k=3, elbow=True)
+    artifacts = summary["artifacts"]
+    assert set(artifacts) >= {"cleaning_log", "profiles", "insights", "elbow", "model"}
+    labelled = pd.read_csv(artifacts["labelled"])
+    assert len(labelled) == summary["rows"]
+    sizes = labelled["cluster"].value_counts().to_dict()
+    assert sizes == {s["cluster_id"]: s["size"] for s in summary["segments"]}
+
+
+def test_failures_are_reported_not_raised(tmp_path):
+    bad = tmp_path / "bad.csv"
+    bad.write_text("a,b\n1,2\n")
+    summary = process_file(bad, tmp_path / "out")
+    assert summary["status"] == "failed"
+    assert summary["error"]
+
+
+def test_cli_exit_status_and_summary(tmp_path):
+    bad = tmp_path / "bad.csv"
+    bad.write_text("a,b\n1,2\n")
+    out = tmp_path / "out"
+    assert main([SAMPLE, "-o", str(out), "--skip-elbow", "--workers", "1"]) == 0
+    assert main([SAMPLE, str(bad), "-o", str(out), "--skip-elbow"]) == 1
+    statuses = [s["status"] for s in json.loads((out / "run_summary.json").read_text())]
+    assert statuses == ["ok", "failed"]
@@ -0,0 +1,45 @@
+import asyncio
+import pstats
+import pytest
+from app.utils import profiling
+from app.utils.profiling import profiled
+
+
+class Handler:
+    profiling_enabled = True
+    profile_captures: list = []
+
+    @profiled("async_stage")
+    async def run(self):
+        await asyncio.sleep(0.05)
+        yield "done"
+
+
+def _other_session_work():
+    return sum(i * i for i in range(20_000))
+
+
+async def _busy():
+    for _ in range(20):
+        _other_session_work()
+        await asyncio.sleep(0)
+
+
+@pytest.fixture(autouse=True)
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv(profiling.PROFILE_DIR_ENV_VAR, str(tmp_path))
+    return tmp_path
+
+
+def test_async_handlers_are_profiled_only_while_they_run(profile_dir):
+    async def main():
+        busy = asyncio.create_task(_busy())
+        events = [event async for event in Handler().run()]
+        await busy
+        return events
+
+    assert asyncio.run(main()) == ["done"]
+    (capture,) = profile_dir.glob("*.pstats")
+    functions = {name for _, _, name in pstats.Stats(str(capture)).stats}
+    assert "run" in functions
+    assert "_other_session_work" not in functions
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+from scipy.spatial.distance import cdist
+from app.utils.clustering_utils import (
+    centroid_distances,
+    compute_centroids,
+    representative_customers,
+)
+from app.utils.segment_index import build_segment_index
+
+
+def test_centroid_distances_match_a_full_distance_matrix():
+    rng = np.random.default_rng(0)
+    points = rng.normal(size=(500, 3))
+    labels = rng.integers(0, 4, len(points))
+    centroids = compute_centroids(pd.DataFrame(points), labels)
+    own, second = centroid_distances(points, centroids, labels, chunk_rows=64)
+    distances = cdist(points, centroids)
+    np.testing.assert_allclose(own, distances[np.arange(len(points)), labels])
+    others = distances.copy()
+    others[np.arange(len(points)), labels] = np.inf
+    np.testing.assert_allclose(second, others.min(axis=1))
+
+
+def test_typical_and_borderline_customers_per_segment():
+    frame = pd.DataFrame({"Age": [31, 42, 53, 64]})
+    index = build_segment_index(np.array([0, 0, 1, 1]))
+    own = np.array([1.0, 2.0, 3.0, 4.0])
+    second = np.array([2.0, 2.5, 4.0, 4.5])
+    records = representative_customers(frame, index, own, second, n=1)
+    typical = [r for r in records if r["kind"] == "typical"]
+    assert [(r["cluster_id"], r["row"], r["Age"]) for r in typical] == [
+        (0, 1, 31),
+        (1, 3, 53),
+    ]
+    borderline = [r for r in records if r["kind"] == "borderline"]
+    assert [r["row"] for r in borderline] == [2, 4]
+
+
+def test_representatives_keep_their_computed_fields():
+    frame = pd.DataFrame(
+        {"row": [9, 8, 7, 6], "distance": [0, 0, 0, 0], "Age": [1, 2, 3, 4]}
+    )
+    index = build_segment_index(np.array([0, 0, 1, 1]))
+    own = np.array([1.0, 2.0, 3.0, 4.0])
+    second = np.array([2.0, 2.5, 4.0, 4.5])
+    records = representative_customers(frame, index, own, second, n=1)
+    typical = [r for r in records if r["kind"] == "typical"]
+    assert [(r["cluster_id"], r["row"], r["distance"]) for r in typical] == [
+        (0, 1, 1.0),
+        (1, 3, 3.0),
+    ]
+    assert typical[0]["customer_row"] == 9 and typical[0]["customer_distance"] == 0
+    borderline = [r for r in records if r["kind"] == "borderline"]
+    assert [r["row"] for r in borderline] == [2, 4]
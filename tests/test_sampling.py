@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+from app.utils.clustering_utils import (
+    nearest_centroid,
+    perform_sampled_clustering,
+    stratified_sample,
+)
+
+
+def _scores(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(rng.normal(size=(n_rows, 3)), columns=["PC1", "PC2", "PC3"])
+
+
+def test_sample_has_the_requested_size_and_unique_sorted_rows():
+    sample = stratified_sample(_scores(10_003), 1_000)
+    assert len(sample) == 1_000
+    assert len(np.unique(sample)) == 1_000
+    assert np.all(np.diff(sample) > 0)
+
+
+def test_sample_is_proportional_across_pc1_bins():
+    df = _scores(10_000)
+    sample = stratified_sample(df, 1_000, strata=10)
+    bins = pd.qcut(df["PC1"], q=10, labels=False).to_numpy()
+    counts = np.bincount(bins[sample], minlength=10)
+    assert counts.min() >= 99 and counts.max() <= 101
+
+
+def test_sample_keeps_a_small_group_at_the_end_of_pc1():
+    df = _scores(10_000)
+    df.loc[:49, "PC1"] += 50.0  # 0.5% outlying customers
+    # With 200 strata the outliers fill the top bin and get its quota.
+    sample = stratified_sample(df, 500, strata=200)
+    assert np.isin(np.arange(50), sample).sum() >= 2
+
+
+def test_sample_is_seeded_and_returns_all_rows_when_large_enough():
+    df = _scores(2_000)
+    np.testing.assert_array_equal(
+        stratified_sample(df, 200, random_state=7),
+        stratified_sample(df, 200, random_state=7),
+    )
+    np.testing.assert_array_equal(stratified_sample(df, 5_000), np.arange(2_000))
+
+
+def test_sampled_clustering_assigns_every_row_to_its_nearest_centroid():
+    df = _scores(5_000)
+    result = perform_sampled_clustering(df, 4, 500)
+    assert result["sample_size"] == 500
+    assert len(result["labels"]) == len(df)
+    np.testing.assert_array_equal(
+        result["labels"], nearest_centroid(df.to_numpy(), result["centroids"])
+    )
+    assert result["full_inertia"] > 0 and result["sample_inertia"] > 0
@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+from app.utils.clustering_utils import NOISE_LABEL
+from app.utils.segment_index import build_segment_index, segment_members, segment_page
+
+
+def test_segment_index_groups_rows_in_original_order():
+    labels = np.array([2, 0, 2, -1, 0, 2])
+    index = build_segment_index(labels)
+    np.testing.assert_array_equal(index["cluster_ids"], [-1, 0, 2])
+    np.testing.assert_array_equal(segment_members(index, 2), [0, 2, 5])
+    np.testing.assert_array_equal(segment_members(index, NOISE_LABEL), [3])
+    assert len(segment_members(index, 7)) == 0
+
+
+def test_segment_page_sorts_within_the_segment():
+    frame = pd.DataFrame({"Age": [50, 20, 40, np.nan, 30], "Name": list("edcba")})
+    members = np.array([0, 1, 2, 3, 4])
+    np.testing.assert_array_equal(segment_page(frame, members, 0, 2, "Age"), [1, 4])
+    np.testing.assert_array_equal(segment_page(frame, members, 2, 2, "Age"), [3])
+    np.testing.assert_array_equal(
+        segment_page(frame, members, 0, 2, "Age", descending=True), [0, 2]
+    )
+    np.testing.assert_array_equal(segment_page(frame, members, 0, 2, "Name"), [4, 3])
+    assert len(segment_page(frame, members, 5, 2)) == 0
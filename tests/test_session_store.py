@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+import pytest
+from app.utils import session_store
+from app.utils.session_store import (
+    drop_session,
+    get_dataset,
+    has_session,
+    put_dataset,
+    store_footprint,
+    wait_for_spills,
+)
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Empty store with a 1 MB session budget and a 3 MB total budget."""
+    monkeypatch.setenv(session_store.SPILL_DIR_ENV_VAR, str(tmp_path))
+    monkeypatch.setenv(session_store.SESSION_BUDGET_ENV_VAR, "1")
+    monkeypatch.setenv(session_store.TOTAL_BUDGET_ENV_VAR, "3")
+    monkeypatch.setattr(session_store, "_sessions", {})
+    yield tmp_path
+    wait_for_spills()
+
+
+def _frame(mb: float = 0.6) -> pd.DataFrame:
+    return pd.DataFrame({"x": np.arange(int(mb * 2**20 / 8), dtype=np.float64)})
+
+
+def _locations(session_id: str) -> dict[str, str]:
+    wait_for_spills()
+    sessions = store_footprint()["sessions"]
+    summary = next(s for s in sessions if s["session"] == session_id)
+    return {d["name"]: d["location"] for d in summary["datasets"]}
+
+
+def test_datasets_within_budget_stay_in_memory(store):
+    put_dataset("a", "raw", _frame(0.3))
+    put_dataset("a", "pca", _frame(0.3))
+    assert _locations("a") == {"raw": "memory", "pca": "memory"}
+    assert not any(store.rglob("*.pkl"))
+
+
+def test_least_recently_used_dataset_spills_and_reloads(store):
+    raw, cleaned = _frame(), _frame()
+    put_dataset("a", "raw", raw)
+    put_dataset("a", "cleaned", cleaned)
+    assert _locations("a") == {"raw": "disk", "cleaned": "memory"}
+    assert len(list((store / "a").glob("raw.*.pkl"))) == 1
+    pd.testing.assert_frame_equal(get_dataset("a", "raw"), raw)
+    # Reading raw makes cleaned the least recently used one.
+    assert _locations("a") == {"raw": "memory", "cleaned": "disk"}
+
+
+def test_a_dataset_larger_than_the_budget_stays_in_memory(store):
+    put_dataset("a", "raw", _frame(1.5))
+    assert _locations("a") == {"raw": "memory"}
+
+
+def test_other_sessions_give_way_under_the_total_budget(store):
+    for session_id in ("a", "b", "c", "d"):
+        put_dataset(session_id, "raw", _frame(0.9))
+    assert _locations("a") == {"raw": "disk"}
+    for session_id in ("b", "c", "d"):
+        assert _locations(session_id) == {"raw": "memory"}
+    footprint = store_footprint()
+    assert footprint["memory_bytes"] <= footprint["total_budget_bytes"]
+
+
+def test_replacing_a_spilled_dataset_deletes_its_file(store):
+    put_dataset("a", "raw", _frame())
+    put_dataset("a", "cleaned", _frame())
+    wait_for_spills()
+    assert any((store / "a").glob("raw.*.pkl"))
+    replacement = _frame(0.1)
+    put_dataset("a", "raw", replacement)
+    wait_for_spills()
+    assert not any((store / "a").glob("raw.*.pkl"))
+    assert get_dataset("a", "raw") is replacement
+
+
+def test_reading_a_dataset_cancels_its_pending_spill(store):
+    raw = _frame()
+    put_dataset("a", "raw", raw)
+    put_dataset("a", "cleaned", _frame())
+    assert get_dataset("a", "raw") is raw
+    assert _locations("a")["raw"] == "memory"
+
+
+def test_dropped_sessions_lose_their_files_and_datasets(store):
+    put_dataset("a", "raw", _frame())
+    put_dataset("a", "cleaned", _frame())
+    wait_for_spills()
+    drop_session("a")
+    wait_for_spills()
+    assert get_dataset("a", "raw", "missing") == "missing"
+    assert list(store.iterdir()) == []
+
+
+def test_dataset_version_changes_on_every_put(store):
+    assert session_store.dataset_version("a", "raw") == 0
+    put_dataset("a", "raw", _frame(0.1))
+    first = session_store.dataset_version("a", "raw")
+    get_dataset("a", "raw")
+    assert session_store.dataset_version("a", "raw") == first
+    put_dataset("a", "raw", _frame(0.1))
+    assert session_store.dataset_version("a", "raw") > first
+
+
+def test_sessions_unused_past_the_ttl_are_dropped(store, monkeypatch):
+    put_dataset("a", "raw", _frame(0.1))
+    assert has_session("a")
+    later = session_store._sessions["a"]["used"] + session_store.SPILL_TTL_S + 1
+    monkeypatch.setattr(session_store, "_last_sweep", 0.0)
+    with session_store._lock:
+        session_store._sweep(later)
+    assert not has_session("a")
+    assert session_store.dataset_version("a", "raw") == 0
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+from app.utils.stability import MIN_BOOTSTRAPS, cluster_jaccard, iter_bootstrap_stability
+
+
+def test_jaccard_ignores_how_clusters_are_numbered():
+    reference = np.array([0, 0, 1, 1, 2, 2])
+    assert cluster_jaccard(reference, np.array([5, 5, 3, 3, 4, 4])) == {
+        0: 1.0,
+        1: 1.0,
+        2: 1.0,
+    }
+
+
+def test_jaccard_of_a_split_and_a_merged_cluster():
+    reference = np.array([0, 0, 0, 0, 1, 1])
+    labels = np.array([0, 0, 1, 1, 1, 1])
+    # Cluster 0 best matches half of itself; cluster 1 lies inside a
+    # resampled cluster twice its size.
+    assert cluster_jaccard(reference, labels) == {0: 0.5, 1: 0.5}
+
+
+def test_separated_blobs_converge_after_the_minimum_number_of_runs():
+    rng = np.random.default_rng(0)
+    centers = np.array([[0.0, 0.0], [8.0, 0.0], [0.0, 8.0]])
+    points = np.vstack([rng.normal(c, 0.2, size=(40, 2)) for c in centers])
+    labels = np.repeat([0, 1, 2], 40)
+    summaries = list(
+        iter_bootstrap_stability(
+            pd.DataFrame(points), 3, labels, labels, n_bootstraps=20, max_workers=1
+        )
+    )
+    # One worker submits one resample per batch, so every run is reported.
+    assert [s["runs"] for s in summaries] == list(range(1, MIN_BOOTSTRAPS + 1))
+    final = summaries[-1]
+    assert final["converged"] and final["target_runs"] == 20
+    assert [m["ari_mean"] for m in final["methods"]] == [1.0, 1.0, 1.0]
+    assert all(row["kmeans_jaccard"] == 1.0 for row in final["clusters"])
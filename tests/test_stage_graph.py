@@ -0,0 +1,117 @@
+from app.utils.stage_graph import (
+    STAGE_PARAMS,
+    STAGES,
+    source_fingerprint,
+    stage_fingerprint,
+    stage_status,
+    stale_stages,
+)
+
+PARAMS = {
+    "categorical_encoding": "none",
+    "k_min": 2,
+    "k_max": 10,
+    "num_clusters": 3,
+    "clustering_sample_size": 0,
+    "incremental_mode": False,
+    "warm_start_version": "",
+    "density_min_cluster_size": 0,
+    "segmentation_method": "K-Means",
+}
+
+
+def _run(stages: list[str], params: dict, recorded: dict | None = None) -> dict:
+    """Record `stages` in order, as the handlers do after each run."""
+    recorded = dict(recorded or {"upload": source_fingerprint([("a.csv", b"1,2")])})
+    for stage in stages:
+        recorded[stage] = stage_fingerprint(stage, recorded, params)
+    return recorded
+
+
+PIPELINE = ["cleaning", "pca", "elbow", "clustering", "profiles", "insights"]
+
+
+def test_params_cover_every_stage_parameter():
+    assert set(PARAMS) == set(STAGE_PARAMS)
+
+
+def test_source_fingerprint_ignores_the_name_of_a_single_file():
+    assert source_fingerprint([("a.csv", b"x")]) == source_fingerprint(
+        [("b.csv", b"x")]
+    )
+    assert source_fingerprint([("a.csv", b"x")]) != source_fingerprint(
+        [("a.csv", b"y")]
+    )
+    merged = [("a.csv", b"x"), ("b.csv", b"y")]
+    assert source_fingerprint(merged) != source_fingerprint(merged[::-1])
+
+
+def test_a_full_run_is_fresh_and_unrun_stages_are_missing():
+    status = stage_status(_run(PIPELINE, PARAMS), PARAMS)
+    assert {s for s, v in status.items() if v == "fresh"} == {"upload", *PIPELINE}
+    assert status["hierarchical"] == status["density"] == "missing"
+    assert stale_stages(_run(PIPELINE, PARAMS), PARAMS) == []
+
+
+def test_stage_without_upstream_run_has_no_fingerprint():
+    assert stage_fingerprint("pca", {"upload": "u"}, PARAMS) is None
+
+
+def test_changing_k_stales_only_clustering_and_downstream():
+    recorded = _run(PIPELINE + ["hierarchical"], PARAMS)
+    changed = {**PARAMS, "num_clusters": 5}
+    assert stale_stages(recorded, changed) == [
+        "hierarchical",
+        "clustering",
+        "profiles",
+        "insights",
+    ]
+    assert stage_status(recorded, changed)["elbow"] == "fresh"
+
+
+def test_a_different_warm_start_model_stales_clustering():
+    incremental = {**PARAMS, "incremental_mode": True, "warm_start_version": "v1"}
+    recorded = _run(PIPELINE, incremental)
+    changed = {**incremental, "warm_start_version": "v2"}
+    assert stale_stages(recorded, changed) == ["clustering", "profiles", "insights"]
+
+
+def test_a_new_upload_stales_everything_that_ran():
+    recorded = _run(PIPELINE, PARAMS)
+    recorded["upload"] = source_fingerprint([("a.csv", b"3,4")])
+    assert stale_stages(recorded, PARAMS) == PIPELINE
+
+
+def test_rerunning_a_stale_stage_keeps_downstream_stale_until_it_reruns():
+    recorded = _run(PIPELINE, PARAMS)
+    changed = {**PARAMS, "categorical_encoding": "onehot"}
+    recorded = _run(["cleaning", "pca"], changed, recorded)
+    downstream = ["elbow", "clustering", "profiles", "insights"]
+    assert stale_stages(recorded, changed) == downstream
+    recorded = _run(downstream, changed, recorded)
+    assert stale_stages(recorded, changed) == []
+
+
+def test_profiles_follow_the_active_segmentation():
+    recorded = _run(PIPELINE + ["density"], PARAMS)
+    hdbscan = {**PARAMS, "segmentation_method": "HDBSCAN"}
+    # The profiles were built from K-Means, not from the density run.
+    assert stage_status(recorded, hdbscan)["profiles"] == "stale"
+    recorded = _run(["profiles", "insights"], hdbscan, recorded)
+    assert stale_stages(recorded, hdbscan) == []
+    changed = {**hdbscan, "density_min_cluster_size": 50, "num_clusters": 4}
+    # The active segmentation re-runs last, so it stays the active one.
+    assert stale_stages(recorded, changed) == [
+        "clustering",
+        "density",
+        "profiles",
+        "insights",
+    ]
+
+
+def test_stages_are_listed_in_dependency_order():
+    order = list(STAGES)
+    for stage, spec in STAGES.items():
+        for upstream in spec["after"]:
+            if upstream != "segmentation":
+                assert order.index(upstream) < order.index(stage)
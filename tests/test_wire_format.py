@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+from app.utils.wire_format import (
+    columnar_series,
+    columnar_series_by_label,
+    fingerprint,
+    round_records,
+)
+
+
+def _scores(n_rows: int = 500) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(rng.normal(size=(n_rows, 3)), columns=["PC1", "PC2", "PC3"])
+
+
+def test_columnar_series_round_trip():
+    df = _scores()
+    series = columnar_series(df, ["PC1", "PC2"], decimals=4)
+    assert list(series) == ["PC1", "PC2"]
+    restored = pd.DataFrame(series)
+    np.testing.assert_allclose(restored, df[["PC1", "PC2"]], atol=1e-4)
+
+
+def test_columnar_series_by_label_keeps_every_row_in_order():
+    df = _scores()
+    labels = np.random.default_rng(1).integers(0, 4, len(df))
+    series = columnar_series_by_label(df, labels, ["PC1", "PC2"], decimals=4)
+    assert sorted(series) == [0, 1, 2, 3]
+    for label, columns in series.items():
+        expected = df.loc[labels == label, ["PC1", "PC2"]]
+        np.testing.assert_allclose(pd.DataFrame(columns), expected, atol=1e-4)
+    assert sum(len(c["PC1"]) for c in series.values()) == len(df)
+
+
+def test_fingerprint_tracks_content_dtype_and_shape():
+    values = np.arange(6, dtype=np.float64)
+    assert fingerprint(values) == fingerprint(values.copy())
+    assert fingerprint(values) != fingerprint(values.astype(np.float32))
+    assert fingerprint(values) != fingerprint(values.reshape(2, 3))
+    changed = values.copy()
+    changed[0] = 1.0
+    assert fingerprint(values) != fingerprint(changed)
+
+
+def test_round_records_only_rounds_floats():
+    records = [{"component": "PC1", "Age": 0.123456789, "rank": 3}]
+    assert round_records(records, decimals=3) == [
+        {"component": "PC1", "Age": 0.123, "rank": 3}
+    ]